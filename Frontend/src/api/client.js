@@ -12,4 +12,63 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Access tokens are short-lived: on 401, exchange the refresh token once
+// (shared by every request that failed meanwhile) and retry. Tabs share the
+// tokens in localStorage, so a token another tab already rotated is not sent
+// again: its successor is picked up instead.
+let refreshing = null;
+
+const refreshTokens = async (failedToken) => {
+  const storedToken = localStorage.getItem("token");
+  if (storedToken && storedToken !== failedToken) return storedToken;
+
+  const refreshToken = localStorage.getItem("refresh_token");
+  if (!refreshToken) throw new Error("No refresh token");
+  try {
+    const { data } = await axios.post(`${api.defaults.baseURL}/auth/refresh`, {
+      refresh_token: refreshToken,
+    });
+    localStorage.setItem("token", data.access_token);
+    localStorage.setItem("refresh_token", data.refresh_token);
+    api.defaults.headers.common["Authorization"] = `Bearer ${data.access_token}`;
+    return data.access_token;
+  } catch (error) {
+    // Another tab rotated the token while this request was in flight
+    if (localStorage.getItem("refresh_token") !== refreshToken) {
+      return localStorage.getItem("token");
+    }
+    throw error;
+  }
+};
+
+api.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const original = error.config;
+    if (
+      error.response?.status !== 401 ||
+      !original ||
+      original._retried ||
+      original.url?.startsWith("/auth/")
+    ) {
+      return Promise.reject(error);
+    }
+    original._retried = true;
+    try {
+      const failedToken = original.headers.Authorization?.replace("Bearer ", "");
+      refreshing = refreshing || refreshTokens(failedToken);
+      const token = await refreshing;
+      original.headers.Authorization = `Bearer ${token}`;
+      return api(original);
+    } catch {
+      localStorage.removeItem("token");
+      localStorage.removeItem("refresh_token");
+      delete api.defaults.headers.common["Authorization"];
+      return Promise.reject(error);
+    } finally {
+      refreshing = null;
+    }
+  }
+);
+
 export default api;
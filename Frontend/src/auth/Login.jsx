@@ -49,7 +49,7 @@ export default function Login() {
       api.defaults.headers.common["Authorization"] = `Bearer ${token}`;
 
       const userRes = await api.get("/users/me");
-      login(token, userRes.data);
+      login(token, userRes.data, res.data.refresh_token);
     } catch (err) {
       setError(err.response?.data?.detail || "Invalid credentials. Please try again.");
     } finally {
@@ -72,7 +72,7 @@ export default function Register() {
 
             api.defaults.headers.common["Authorization"] = `Bearer ${token}`;
             const userRes = await api.get("/users/me");
-            login(token, userRes.data);
+            login(token, userRes.data, loginRes.data.refresh_token);
 
             // Navigate to dashboard will happen automatically via App.jsx
         } catch (err) {
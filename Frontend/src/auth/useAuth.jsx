@@ -19,6 +19,7 @@ export const AuthProvider = ({ children }) => {
         } catch (error) {
           console.error("Failed to fetch user", error);
           localStorage.removeItem("token");
+          localStorage.removeItem("refresh_token");
           delete api.defaults.headers.common["Authorization"];
         }
       }
@@ -27,14 +28,20 @@ export const AuthProvider = ({ children }) => {
     checkUser();
   }, []);
 
-  const login = (token, userData) => {
+  const login = (token, userData, refreshToken) => {
     localStorage.setItem("token", token);
+    if (refreshToken) localStorage.setItem("refresh_token", refreshToken);
     api.defaults.headers.common["Authorization"] = `Bearer ${token}`;
     setUser(userData);
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (refreshToken) {
+      api.post("/auth/logout", { refresh_token: refreshToken }).catch(() => {});
+    }
     localStorage.removeItem("token");
+    localStorage.removeItem("refresh_token");
     delete api.defaults.headers.common["Authorization"];
     setUser(null);
   };
@@ -118,7 +118,8 @@ export default function CharacterPage() {
                 visual_style: visualStyle,
                 language: language,
                 total_duration: totalDuration,
-                custom_dialogues: customDialogues.trim() || null  // NEW: Send custom dialogues if provided
+                custom_dialogues: customDialogues.trim() || null,  // NEW: Send custom dialogues if provided
+                fresh: brokenScenes.length > 0  // Regenerating: ask for a new variant, not the pre-generated one
             });
 
             const scenes = response.data.scenes || [];
@@ -4,6 +4,8 @@ import { useNavigate } from "react-router-dom";
 import api from "../api/client";
 import Navbar from "../components/Navbar";
 
+const PAGE_SIZE = 24;
+
 export default function Dashboard() {
   const { user, logout } = useAuth();
   const navigate = useNavigate();
@@ -13,6 +15,8 @@ export default function Dashboard() {
     videoType: ""
   });
   const [projects, setProjects] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [creating, setCreating] = useState(false);
@@ -34,35 +38,11 @@ export default function Dashboard() {
     try {
       setLoading(true);
 
-      // Fetch both storytelling and character projects
-      const [storytellingResponse, characterResponse] = await Promise.all([
-        api.get("/projects").catch(() => ({ data: [] })),
-        api.get("/gemini/projects").catch(() => ({ data: { projects: [] } }))
-      ]);
-
-      // Combine and mark project types
-      const storytellingProjects = (storytellingResponse.data || []).map(p => ({
-        ...p,
-        project_type: p.project_type || "storytelling"
-      }));
-
-      const characterProjects = (characterResponse.data.projects || []).map(p => ({
-        ...p,
-        _id: p._id,
-        project_name: p.project_name,
-        project_type: "character",
-        last_updated: p.last_updated || p.created_at,
-        created_at: p.created_at
-      }));
-
-      // Combine and sort by last_updated
-      const allProjects = [...storytellingProjects, ...characterProjects].sort((a, b) => {
-        const dateA = new Date(a.last_updated || a.created_at);
-        const dateB = new Date(b.last_updated || b.created_at);
-        return dateB - dateA; // Most recent first
-      });
+      // Storytelling and character projects come merged and sorted (most recent first)
+      const response = await api.get("/projects/all", { params: { limit: PAGE_SIZE } });
 
-      setProjects(allProjects);
+      setProjects(response.data.projects || []);
+      setNextCursor(response.data.next_cursor);
       setError("");
     } catch (err) {
       console.error("Failed to fetch projects:", err);
@@ -72,6 +52,21 @@ export default function Dashboard() {
     }
   };
 
+  const loadMoreProjects = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await api.get("/projects/all", { params: { limit: PAGE_SIZE, cursor: nextCursor } });
+      setProjects(prev => [...prev, ...(response.data.projects || [])]);
+      setNextCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error("Failed to fetch projects:", err);
+      setError("Failed to load projects. Please try again.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCreateProject = async () => {
     if (!newProject.name || !newProject.videoType) return;
 
@@ -146,6 +141,7 @@ export default function Dashboard() {
     setDeleteConfirmation({
       id: project._id,
       type: project.project_type,
+      source: project.source,
       name: project.project_name
     });
   };
@@ -154,9 +150,9 @@ export default function Dashboard() {
     if (!deleteConfirmation) return;
 
     try {
-      const { id, type } = deleteConfirmation;
+      const { id, type, source } = deleteConfirmation;
 
-      if (type === "storytelling") {
+      if (source ? source === "projects" : type === "storytelling") {
         await api.delete(`/projects/${id}`);
       } else {
         // Character projects
@@ -266,10 +262,19 @@ export default function Dashboard() {
                       <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16" />
                     </svg>
                   </button>
-                  <svg className="w-16 h-16 text-purple-300 relative z-10" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                    <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={1.5} d="M14.752 11.168l-3.197-2.132A1 1 0 0010 9.87v4.263a1 1 0 001.555.832l3.197-2.132a1 1 0 000-1.664z" />
-                    <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={1.5} d="M21 12a9 9 0 11-18 0 9 9 0 0118 0z" />
-                  </svg>
+                  {project.thumbnail_url ? (
+                    <img
+                      src={`${api.defaults.baseURL}${project.thumbnail_url}`}
+                      alt=""
+                      loading="lazy"
+                      className="absolute inset-0 w-full h-full object-cover"
+                    />
+                  ) : (
+                    <svg className="w-16 h-16 text-purple-300 relative z-10" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                      <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={1.5} d="M14.752 11.168l-3.197-2.132A1 1 0 0010 9.87v4.263a1 1 0 001.555.832l3.197-2.132a1 1 0 000-1.664z" />
+                      <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={1.5} d="M21 12a9 9 0 11-18 0 9 9 0 0118 0z" />
+                    </svg>
+                  )}
                 </div>
                 <div className="p-5">
                   <h3 className="text-lg font-semibold mb-1 text-white truncate">{project.project_name}</h3>
@@ -277,6 +282,11 @@ export default function Dashboard() {
                     <span className="text-purple-400 font-medium">{getProjectTypeLabel(project.project_type)}</span>
                     <span className="text-slate-500">{formatDate(project.created_at)}</span>
                   </div>
+                  {project.total_scenes > 0 && (
+                    <p className="mt-1 text-xs text-slate-500">
+                      {project.total_scenes} scenes · {Math.round(project.scenes_duration || 0)}s
+                    </p>
+                  )}
                   <button
                     onClick={() => handleOpenProject(project)}
                     className="mt-4 w-full py-2 bg-slate-800/50 hover:bg-purple-600 rounded-lg transition-all duration-300 text-sm font-medium border border-slate-700/50 hover:border-purple-500"
@@ -288,6 +298,18 @@ export default function Dashboard() {
             ))}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div className="mt-8 flex justify-center">
+            <button
+              onClick={loadMoreProjects}
+              disabled={loadingMore}
+              className="px-6 py-2 bg-slate-800/50 hover:bg-purple-600 rounded-lg transition-all duration-300 text-sm font-medium border border-slate-700/50 hover:border-purple-500 disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </main>
 
       {/* New Project Modal */}
@@ -53,7 +53,8 @@ export default function StorytellingPage() {
             if (response.data.characters) {
                 const charArray = Object.entries(response.data.characters).map(([role, data]) => ({
                     role,
-                    ...data
+                    ...data,
+                    image: (data.thumbnail_urls?.sm || data.image_url) ? `${api.defaults.baseURL}${data.thumbnail_urls?.sm || data.image_url}` : null
                 }));
                 setCharacters(charArray);
             }
@@ -109,6 +110,26 @@ export default function StorytellingPage() {
         }
     };
 
+    const handleExport = async (format) => {
+        try {
+            const response = await api.get(`/projects/${projectId}/export`, {
+                params: { format },
+                responseType: "blob"
+            });
+            const disposition = response.headers["content-disposition"] || "";
+            const filename = disposition.match(/filename="([^"]+)"/)?.[1] || `project.${format}`;
+            const url = URL.createObjectURL(response.data);
+            const link = document.createElement("a");
+            link.href = url;
+            link.download = filename;
+            link.click();
+            URL.revokeObjectURL(url);
+        } catch (err) {
+            console.error("Failed to export project:", err);
+            alert("Failed to export project. Please try again.");
+        }
+    };
+
     const handleAddCharacter = async () => {
         if (!newCharacter.role || !newCharacter.name) {
             alert("Please fill in role and name");
@@ -134,7 +155,7 @@ export default function StorytellingPage() {
                     role: newCharacter.role, // Use the display role for now
                     voiceType: addedChar.voice_type,
                     voiceTone: addedChar.voice_tone,
-                    image: addedChar.image_base64
+                    image: (addedChar.thumbnail_urls?.sm || addedChar.image_url) ? `${api.defaults.baseURL}${addedChar.thumbnail_urls?.sm || addedChar.image_url}` : null
                 }]);
 
                 setNewCharacter({
@@ -264,6 +285,20 @@ export default function StorytellingPage() {
                                             <p className="text-sm text-slate-400">{scenes.length} scenes created</p>
                                         </div>
                                     </div>
+                                    <div className="flex items-center space-x-2">
+                                        <button
+                                            onClick={() => handleExport("txt")}
+                                            className="px-3 py-2 text-sm bg-slate-800/50 hover:bg-slate-700/50 rounded-lg border border-slate-700/50 transition-colors"
+                                        >
+                                            Export prompts
+                                        </button>
+                                        <button
+                                            onClick={() => handleExport("zip")}
+                                            className="px-3 py-2 text-sm bg-slate-800/50 hover:bg-purple-600 rounded-lg border border-slate-700/50 hover:border-purple-500 transition-colors"
+                                        >
+                                            Export ZIP
+                                        </button>
+                                    </div>
                                 </div>
 
                                 <div className="space-y-3">
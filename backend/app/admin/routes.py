@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from app.auth.dependencies import get_admin_user
+from app.loop_monitor import loop_monitor
+from app.users.models import User
+
+router = APIRouter()
+
+@router.get("/event-loop")
+async def event_loop_report(
+    top: int = Query(20, ge=1, le=100),
+    reset: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Event-loop lag percentiles and the code paths that blocked it the longest
+
+    Requires LOOP_MONITOR_ENABLED. Pass reset=true to start a fresh
+    measurement after reading the report.
+    """
+    report = loop_monitor.report(top)
+    if reset:
+        loop_monitor.reset()
+    return report
@@ -0,0 +1,195 @@
+# app/admission.py
+# Admission control for LLM generation endpoints
+#
+# Every generation request used to start its Gemini calls immediately, so a
+# spike made all of them slow together and many timed out. Generations now
+# need one of ADMISSION_MAX_CONCURRENT slots (per worker). Requests beyond that
+# wait in a bounded FIFO queue; a request is turned away with 503 and a
+# Retry-After hint when the queue is full, when its expected queue time is
+# above ADMISSION_MAX_QUEUE_SECONDS (see expected_wait()), or when it waited
+# that long without getting a slot. A user can have at most ADMISSION_PER_USER generations
+# running or queued (429 beyond that), so one client cannot fill the queue.
+# Admitted generations are registered with the task registry, which drains
+# them at shutdown.
+
+import asyncio
+import heapq
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.lifecycle import task_registry
+
+# Weight of the newest sample in the moving averages
+_EWMA_ALPHA = 0.2
+
+
+class AdmissionController:
+    """
+    Bounded slots + bounded queue with queue-time load shedding
+
+    Use `async with admission.slot(user_id):` around a generation, or
+    `await admission.run(user_id, handler)`.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, per_user: int, max_queue_seconds: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.per_user = max(1, per_user)
+        self.max_queue_seconds = max_queue_seconds
+
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._users: Dict[str, int] = {}
+        self.in_flight = 0
+        self._started: Dict[object, float] = {}  # Start time per running generation
+        self.queued = 0
+        self.max_queued = 0
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "overloaded": 0, "queue_timeout": 0, "per_user": 0, "draining": 0}
+        # Seeded with a typical generation so the first estimates are sane
+        self.avg_service_seconds = 20.0
+        self.avg_queue_seconds = 0.0
+
+    def expected_wait(self) -> float:
+        """
+        Queue time a request arriving now can expect, in seconds
+
+        Running generations are expected to take avg_service_seconds in
+        total, so one that started 15s ago frees its slot in ~5s; each slot
+        then serves the queue in order.
+        """
+        if self.in_flight < self.max_concurrent and self.queued == 0:
+            return 0.0
+        now = time.monotonic()
+        free_at = [max(0.0, self.avg_service_seconds - (now - started)) for started in self._started.values()]
+        free_at += [0.0] * (self.max_concurrent - len(free_at))
+        heapq.heapify(free_at)
+        for _ in range(self.queued):
+            heapq.heappush(free_at, heapq.heappop(free_at) + self.avg_service_seconds)
+        return free_at[0]
+
+    def _reject(self, reason: str, status_code: int, detail: str, retry_after: float):
+        self.rejected[reason] += 1
+        retry_after = max(1, math.ceil(retry_after))
+        print(f"🚦 Generation rejected ({reason}): {self.in_flight} running, {self.queued} queued, retry in {retry_after}s")
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    @asynccontextmanager
+    async def slot(self, user_id: str):
+        """
+        Hold a generation slot for the duration of the block
+
+        Raises:
+            HTTPException 429: If the user already has ADMISSION_PER_USER generations running or queued
+            HTTPException 503: If the server is overloaded or shutting down (with Retry-After)
+        """
+        user_id = str(user_id)
+        if not task_registry.accepting:
+            self._reject(
+                "draining", status.HTTP_503_SERVICE_UNAVAILABLE,
+                "Server is restarting, please retry",
+                settings.SHUTDOWN_RETRY_AFTER_SECONDS
+            )
+        if self._users.get(user_id, 0) >= self.per_user:
+            self._reject(
+                "per_user", status.HTTP_429_TOO_MANY_REQUESTS,
+                f"You already have {self.per_user} generations in progress, please wait for them to finish",
+                self.avg_service_seconds
+            )
+
+        must_queue = self.in_flight >= self.max_concurrent or self.queued > 0
+        if must_queue:
+            if self.queued >= self.max_queue:
+                self._reject(
+                    "queue_full", status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Too many generations in progress, please retry shortly",
+                    self.expected_wait()
+                )
+            if self.expected_wait() > self.max_queue_seconds:
+                self._reject(
+                    "overloaded", status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Too many generations in progress, please retry shortly",
+                    self.expected_wait()
+                )
+
+        self._users[user_id] = self._users.get(user_id, 0) + 1
+        try:
+            queued_at = time.monotonic()
+            if must_queue:
+                self.queued += 1
+                self.max_queued = max(self.max_queued, self.queued)
+                try:
+                    # Not wait_for: on Python 3.11 it can drop a slot acquired as the timeout fires
+                    async with asyncio.timeout(self.max_queue_seconds):
+                        await self._slots.acquire()
+                except TimeoutError:
+                    self._reject(
+                        "queue_timeout", status.HTTP_503_SERVICE_UNAVAILABLE,
+                        "Generation queue is too long, please retry shortly",
+                        self.expected_wait()
+                    )
+                finally:
+                    self.queued -= 1
+            else:
+                await self._slots.acquire()  # A slot is free: returns without suspending
+
+            waited = time.monotonic() - queued_at
+            self.avg_queue_seconds += _EWMA_ALPHA * (waited - self.avg_queue_seconds)
+            self.admitted += 1
+            self.in_flight += 1
+            started_at = time.monotonic()
+            token = object()
+            self._started[token] = started_at
+            try:
+                async with task_registry.generation():
+                    yield
+            finally:
+                self.in_flight -= 1
+                del self._started[token]
+                self._slots.release()
+                elapsed = time.monotonic() - started_at
+                self.avg_service_seconds += _EWMA_ALPHA * (elapsed - self.avg_service_seconds)
+        finally:
+            remaining = self._users[user_id] - 1
+            if remaining:
+                self._users[user_id] = remaining
+            else:
+                del self._users[user_id]
+
+    async def run(self, user_id: str, handler: Callable[[], Awaitable[Any]]) -> Any:
+        """Run handler inside a generation slot (see slot())"""
+        async with self.slot(user_id):
+            return await handler()
+
+    def metrics(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "per_user": self.per_user,
+            "active_users": len(self._users),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "expected_wait_seconds": round(self.expected_wait(), 2),
+            "avg_queue_seconds": round(self.avg_queue_seconds, 2),
+            "avg_service_seconds": round(self.avg_service_seconds, 2)
+        }
+
+
+# Create singleton instance
+admission = AdmissionController(
+    max_concurrent=settings.ADMISSION_MAX_CONCURRENT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    per_user=settings.ADMISSION_PER_USER,
+    max_queue_seconds=settings.ADMISSION_MAX_QUEUE_SECONDS
+)
@@ -0,0 +1,90 @@
+# app/auth/benchmark.py
+# Login throughput benchmark for password hashing
+#
+# Simulates a login storm: N concurrent password checks, first verified
+# inline on the event loop, then through the hashing pool. Reports logins per
+# second and how late a 10ms heartbeat ran meanwhile (the delay every other
+# request would see). No database is needed.
+#
+# Usage: python -m app.auth.benchmark [--logins 200] [--concurrency 50] [--rounds 12] [--workers 4]
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from app.auth import utils
+from app.config import settings
+
+_HEARTBEAT = 0.01
+
+
+async def _heartbeat(lags: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        expected = time.monotonic() + _HEARTBEAT
+        await asyncio.sleep(_HEARTBEAT)
+        lags.append(max(0.0, time.monotonic() - expected))
+
+
+async def _storm(check: Callable[[], Awaitable[bool]], logins: int, concurrency: int) -> Dict:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(lags, stop))
+    limit = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with limit:
+            assert await check()
+
+    started = time.monotonic()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.monotonic() - started
+    stop.set()
+    await heartbeat
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "logins_per_second": logins / elapsed,
+        "loop_lag_p99_ms": lags_ms[min(len(lags_ms) - 1, int(0.99 * len(lags_ms)))],
+        "loop_lag_max_ms": lags_ms[-1]
+    }
+
+
+async def run(logins: int, concurrency: int):
+    password = "correct horse battery staple"
+    stored = await utils.get_password_hash(password)
+    print(f"🔐 {utils.pwd_context.identify(stored)}, bcrypt rounds {settings.PASSWORD_BCRYPT_ROUNDS}, "
+          f"{settings.PASSWORD_HASH_WORKERS} hashing threads, {logins} logins x {concurrency} concurrent")
+
+    async def inline():
+        return utils.pwd_context.verify(password, stored)
+
+    async def pooled():
+        valid, _ = await utils.verify_and_update(password, stored)
+        return valid
+
+    for name, check in (("inline (on the loop)", inline), ("hashing pool", pooled)):
+        result = await _storm(check, logins, concurrency)
+        print(f"  {name:22} {result['logins_per_second']:7.1f} logins/s   "
+              f"loop lag p99 {result['loop_lag_p99_ms']:7.1f}ms   max {result['loop_lag_max_ms']:7.1f}ms")
+    utils.shutdown_hash_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login password checks")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt rounds (default PASSWORD_BCRYPT_ROUNDS)")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing threads (default PASSWORD_HASH_WORKERS)")
+    args = parser.parse_args()
+
+    if args.rounds is not None:
+        settings.PASSWORD_BCRYPT_ROUNDS = args.rounds
+        utils.pwd_context = utils._build_context()
+    if args.workers is not None:
+        settings.PASSWORD_HASH_WORKERS = args.workers
+    asyncio.run(run(args.logins, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
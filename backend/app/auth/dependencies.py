@@ -21,8 +21,25 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
     
+    # Access tokens carry the user's claims: no database read per request
+    if payload.get("uid"):
+        if payload.get("type") != "access" or not payload.get("active", True):
+            raise credentials_exception
+        return User(_id=payload["uid"], email=email, name=payload.get("name", ""), is_active=True)
+    
+    # Tokens issued before claims were added (expire within ACCESS_TOKEN_EXPIRE_MINUTES)
     user = await db.users.find_one({"email": email})
     if user is None:
         raise credentials_exception
     
     return User(**user)
+
+async def get_admin_user(current_user: User = Depends(get_current_user)):
+    """Current user, if listed in ADMIN_EMAILS"""
+    admins = {email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()}
+    if current_user.email.lower() not in admins:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
@@ -12,3 +12,25 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+def access_token_claims(user: dict) -> dict:
+    """
+    Claims that let get_current_user build the User without a database read
+
+    `ver` is the user's token_version at issue time; bumping it (logout
+    everywhere) stops refresh tokens from issuing new access tokens.
+    """
+    return {
+        "sub": user["email"],
+        "uid": str(user["_id"]),
+        "name": user.get("name", ""),
+        "active": user.get("is_active", True),
+        "ver": user.get("token_version", 0),
+        "type": "access"
+    }
+
+def create_user_access_token(user: dict) -> str:
+    return create_access_token(
+        access_token_claims(user),
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
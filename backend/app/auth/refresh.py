@@ -0,0 +1,99 @@
+# app/auth/refresh.py
+# Rotating refresh tokens
+#
+# Access tokens are short-lived and stateless (see app.auth.jwt). A login
+# also issues an opaque refresh token; only its SHA-256 is stored, in
+# `refresh_tokens` (TTL index on expires_at). Every refresh consumes the token
+# and issues a new one in the same family. Presenting an already consumed
+# token means it was copied: the whole family is revoked, logging out both
+# the thief and the user, who has to log in again. Tabs share one token, so
+# a reuse within REFRESH_REUSE_GRACE_SECONDS of the rotation is only refused
+# (the tab picks up the new token its sibling stored).
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from bson import ObjectId
+
+from app.config import settings
+from app.database import db
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token is unknown, expired, reused or revoked"""
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def issue(user: Dict, family: Optional[str] = None) -> str:
+    """
+    New refresh token for a user
+
+    Args:
+        user: User document
+        family: Rotation family of the token being replaced (None starts a new one at login)
+    """
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    await db.refresh_tokens.insert_one({
+        "_id": _hash(token),
+        "user_id": user["_id"],
+        "family": family or secrets.token_hex(16),
+        "token_version": user.get("token_version", 0),
+        "created_at": now,
+        "used_at": None,
+        "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    })
+    return token
+
+
+async def rotate(token: str) -> Tuple[Dict, str]:
+    """
+    Consume a refresh token and issue its successor
+
+    Returns:
+        (user document, new refresh token)
+
+    Raises:
+        RefreshTokenError: If the token is invalid; a reused token also revokes its family
+    """
+    now = datetime.utcnow()
+    record = await db.refresh_tokens.find_one_and_update(
+        {"_id": _hash(token), "used_at": None, "expires_at": {"$gt": now}},
+        {"$set": {"used_at": now}}
+    )
+    if record is None:
+        reused = await db.refresh_tokens.find_one({"_id": _hash(token), "used_at": {"$ne": None}})
+        grace = timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS)
+        if reused is not None and reused["used_at"] >= now - grace:
+            # Another tab sharing the token refreshed a moment ago, not a stolen token
+            raise RefreshTokenError("Refresh token was already rotated")
+        if reused is not None:
+            revoked = await db.refresh_tokens.delete_many({"family": reused["family"]})
+            print(f"🚨 Refresh token reuse for user {reused['user_id']}: revoked {revoked.deleted_count} tokens")
+        raise RefreshTokenError("Invalid refresh token")
+
+    user = await db.users.find_one({"_id": record["user_id"]})
+    if user is None or not user.get("is_active", True):
+        raise RefreshTokenError("User is no longer active")
+    if user.get("token_version", 0) != record["token_version"]:
+        raise RefreshTokenError("Refresh token was revoked")
+
+    return user, await issue(user, family=record["family"])
+
+
+async def revoke(token: str):
+    """Log out one session: drop the token's whole family"""
+    record = await db.refresh_tokens.find_one({"_id": _hash(token)}, {"family": 1})
+    if record is not None:
+        await db.refresh_tokens.delete_many({"family": record["family"]})
+
+
+async def revoke_user(user_id: str):
+    """Log out everywhere: bump the token version and drop every refresh token"""
+    await db.users.update_one({"_id": ObjectId(user_id)}, {"$inc": {"token_version": 1}})
+    await db.refresh_tokens.delete_many({"user_id": ObjectId(user_id)})
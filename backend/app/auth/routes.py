@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from app.database import db
-from app.auth.models import UserLogin, Token
-from app.auth.utils import verify_password, get_password_hash
-from app.auth.jwt import create_access_token
-from datetime import timedelta
+from app.auth.models import UserLogin, Token, RefreshRequest
+from app.auth.utils import verify_and_update, get_password_hash
+from app.auth.jwt import create_user_access_token
+from app.auth import refresh as refresh_tokens
+from app.auth.refresh import RefreshTokenError
+from app.auth.dependencies import get_current_user
 from app.config import settings
 from app.users.models import UserCreate, User
 
@@ -21,7 +23,7 @@ async def register(user: UserCreate):
     
     # Create user dict and hash password
     user_dict = user.model_dump()
-    user_dict["hashed_password"] = get_password_hash(user_dict.pop("password"))
+    user_dict["hashed_password"] = await get_password_hash(user_dict.pop("password"))
     
     # Insert new user
     new_user = await db.users.insert_one(user_dict)
@@ -33,28 +35,69 @@ async def register(user: UserCreate):
 async def login(user_credentials: UserLogin):
     user = await db.users.find_one({"email": user_credentials.email})
     
-    if not user:
+    # Unknown emails get a dummy check too, so response time does not reveal them
+    valid, new_hash = await verify_and_update(
+        user_credentials.password, user["hashed_password"] if user else None
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not verify_password(user_credentials.password, user["hashed_password"]):
+    # Outdated cost parameters / legacy plain-text password: store the new hash
+    if new_hash:
+        await db.users.update_one(
+            {"_id": user["_id"], "hashed_password": user["hashed_password"]},
+            {"$set": {"hashed_password": new_hash}}
+        )
+    
+    if not user.get("is_active", True):
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is disabled"
         )
     
-    # Create access token
-    access_token_expires = timedelta(minutes=getattr(settings, "ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-    access_token = create_access_token(
-        data={"sub": user["email"]}, expires_delta=access_token_expires
-    )
+    return _token_pair(user, await refresh_tokens.issue(user))
+
+def _token_pair(user: dict, refresh_token: str) -> dict:
+    return {
+        "access_token": create_user_access_token(user),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+@router.post("/refresh", response_model=Token)
+async def refresh_token(request: RefreshRequest):
+    """
+    Exchange a refresh token for a new access token and refresh token
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    The presented refresh token is consumed. Presenting it again revokes
+    every token of its login session.
+    """
+    try:
+        user, new_refresh_token = await refresh_tokens.rotate(request.refresh_token)
+    except RefreshTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return _token_pair(user, new_refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshRequest):
+    """Revoke the refresh tokens of this login session"""
+    await refresh_tokens.revoke(request.refresh_token)
 
-@router.post("/refresh")
-async def refresh_token():
-    return {"token": "new-token"}
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(current_user: User = Depends(get_current_user)):
+    """
+    Revoke every refresh token of the user
+    
+    Access tokens already issued stay valid until they expire
+    (ACCESS_TOKEN_EXPIRE_MINUTES).
+    """
+    await refresh_tokens.revoke_user(current_user.id)
@@ -1,5 +1,99 @@
-def verify_password(plain_password, hashed_password):
-    return plain_password == hashed_password
+# app/auth/utils.py
+# Password hashing
+#
+# Passwords are hashed with bcrypt (or argon2, if argon2-cffi is installed and
+# PASSWORD_SCHEME asks for it). A hash costs ~100ms of CPU by design, so it
+# runs in a small dedicated thread pool (PASSWORD_HASH_WORKERS; both backends
+# release the GIL) instead of on the event loop: a login storm queues up
+# behind the pool while every other request keeps being served.
+#
+# Hashes made with other cost parameters, another scheme or stored as plain
+# text by earlier versions still verify, and are re-hashed with the current
+# parameters on the next successful login (see verify_and_update()).
 
-def get_password_hash(password):
-    return password
+import asyncio
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+from passlib.hash import argon2
+
+from app.config import settings
+
+
+def _build_context() -> CryptContext:
+    scheme = settings.PASSWORD_SCHEME
+    if scheme == "argon2" and not argon2.has_backend():
+        print("⚠️ PASSWORD_SCHEME=argon2 but argon2-cffi is not installed, using bcrypt")
+        scheme = "bcrypt"
+    schemes = [scheme] + [other for other in ("bcrypt", "argon2") if other != scheme]
+    return CryptContext(
+        schemes=schemes,
+        default=scheme,
+        deprecated="auto",  # Every scheme but the default is re-hashed on login
+        bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+        argon2__time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+        argon2__memory_cost=settings.PASSWORD_ARGON2_MEMORY_KB
+    )
+
+
+pwd_context = _build_context()
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    return _executor
+
+
+def shutdown_hash_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    if not pwd_context.identify(hashed_password):
+        # Stored as plain text by earlier versions
+        if hmac.compare_digest(plain_password.encode("utf-8"), hashed_password.encode("utf-8")):
+            return True, pwd_context.hash(plain_password)
+        return False, None
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def verify_and_update(plain_password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password against its stored hash (in the hashing pool)
+
+    Args:
+        plain_password: Password from the login form
+        hashed_password: Stored hash; None runs a dummy check (unknown users
+            take as long as known ones)
+
+    Returns:
+        (valid, new_hash): new_hash is set when the stored hash should be
+        replaced (outdated parameters or scheme, or legacy plain text)
+    """
+    if hashed_password is None:
+        await _run(pwd_context.dummy_verify)
+        return False, None
+    return await _run(_verify_and_update, plain_password, hashed_password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    valid, _ = await verify_and_update(plain_password, hashed_password)
+    return valid
+
+
+async def get_password_hash(password: str) -> str:
+    """Hash a password with the current scheme and cost (in the hashing pool)"""
+    return await _run(pwd_context.hash, password)
@@ -5,10 +5,13 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from typing import Dict, Optional
 from app.config import settings
+from app.services.usage import record_usage
 import re
 
 # Voice descriptions are imported from service.py
-from app.character.service import VOICE_DESCRIPTIONS
+from app.character.voices import voice_registry
+from app.character.pacing import rebalance_dialogues, score_scenes
+from app.character.multilingual import render_dialogues
 
 
 class EducationalCharacterGenerator:
@@ -198,34 +201,20 @@ class EducationalCharacterGenerator:
             # Priority: explicit custom_voice_description > voice extracted from outfit field
             if custom_voice_description:
                 # Use the custom voice description provided by user
-                master_voice_description = self._create_custom_voice_prompt(custom_voice_description)
+                master_voice_description = voice_registry.custom_prompt(custom_voice_description)
                 print(f"✅ Using Custom Voice (from voice field): {master_voice_description[:100]}...")
             elif voice_from_outfit:
                 # User put voice description in outfit field
-                master_voice_description = self._create_custom_voice_prompt(voice_from_outfit)
+                master_voice_description = voice_registry.custom_prompt(voice_from_outfit)
                 print(f"✅ Using Custom Voice (from outfit field): {master_voice_description[:100]}...")
             else:
                 # Fallback: use friendly male voice
                 print(f"⚠️ Custom voice selected but no description provided, using default")
-                voice_info = VOICE_DESCRIPTIONS.get("male_friendly", VOICE_DESCRIPTIONS["adult_male"])
-                master_voice_description = voice_info.get("master_voice_prompt", voice_info["anchor_block"])
+                master_voice_description = voice_registry.get("male_friendly")["master_prompt"]
         else:
-            # Use predefined voice from VOICE_DESCRIPTIONS
-            voice_info = VOICE_DESCRIPTIONS.get(voice_tone)
-            if not voice_info:
-                print(f"⚠️ Voice '{voice_tone}' not found, falling back")
-                # Smart fallback based on voice_tone name
-                if "female" in voice_tone.lower():
-                    voice_info = VOICE_DESCRIPTIONS.get("female_friendly", VOICE_DESCRIPTIONS["adult_female"])
-                elif "male" in voice_tone.lower():
-                    voice_info = VOICE_DESCRIPTIONS.get("male_friendly", VOICE_DESCRIPTIONS["adult_male"])
-                elif "child" in voice_tone.lower():
-                    voice_info = VOICE_DESCRIPTIONS.get("child_happy", VOICE_DESCRIPTIONS["adult_male"])
-                else:
-                    voice_info = VOICE_DESCRIPTIONS["adult_male"]
-            
+            # Predefined voice; unknown or free-form names are resolved by the registry
             # USE MASTER VOICE PROMPT - This is the detailed, technical description
-            master_voice_description = voice_info.get("master_voice_prompt", voice_info["anchor_block"])
+            master_voice_description = voice_registry.get(voice_tone)["master_prompt"]
             print(f"✅ Using Predefined Voice: {master_voice_description[:100]}...")
         
         if outfit_description:
@@ -396,14 +385,12 @@ Generate {num_total_scenes} scenes following this exact format:"""
         
         # Call Gemini
         try:
-            messages = [{"role": "user", "content": system_prompt}]
-            response = await self.llm.ainvoke(messages)
-            gemini_output = response.content
+            gemini_output = await self._invoke([{"role": "user", "content": system_prompt}])
             
             print(f"\n🤖 Gemini Response:\n{gemini_output[:200]}...")
             
             # Parse scenes - pass master_voice_description instead of anchor_block
-            scenes = self._parse_scenes(
+            scenes, plan = self._parse_scenes(
                 gemini_output, 
                 character_name, 
                 voice_tone, 
@@ -411,18 +398,63 @@ Generate {num_total_scenes} scenes following this exact format:"""
                 visual_style, 
                 language
             )
+            pacing = score_scenes(scenes)
+            if pacing["scenes_long"] or pacing["scenes_short"]:
+                print(f"⏱️ Pacing off target - long: {pacing['scenes_long']}, short: {pacing['scenes_short']}")
             
             return {
                 "scenes": scenes,
                 "total_scenes": len(scenes),
                 "character_name": character_name,
-                "topic": "educational"
+                "topic": "educational",
+                "pacing": pacing,
+                # Shared across scenes - stored once per project by the route
+                "fragments": {
+                    "character_look": outfit_description,
+                    "style": visual_style,
+                    "voice_anchor": master_voice_description
+                },
+                # Language-neutral scene plan for render_language()
+                "plan": {
+                    "language": language,
+                    "scenes": plan,
+                    "context": {
+                        "character_name": character_name,
+                        "voice_tone": voice_tone,
+                        "master_voice_description": master_voice_description,
+                        "visual_style": visual_style
+                    }
+                }
             }
             
         except Exception as e:
             print(f"❌ Gemini API Error: {str(e)}")
             raise Exception(f"Failed to generate educational character dialogue: {str(e)}")
     
+    async def render_language(self, plan: Dict, language: str) -> Dict:
+        """
+        Scenes of an existing plan with their dialogue in another language
+
+        Only the dialogue is generated (one short LLM call); scene types,
+        visuals and teaching points are reused from the plan.
+        """
+        dialogues = await render_dialogues(
+            self._invoke, plan["context"]["character_name"], plan["language"], language, plan["scenes"]
+        )
+        scenes = [
+            self._build_scene(
+                i, scene["scene_type"], scene["visual_prompt"], dialogue, scene["teaching_point"],
+                language=language, **plan["context"]
+            )
+            for i, (scene, dialogue) in enumerate(zip(plan["scenes"], dialogues), 1)
+        ]
+        return {"language": language, "scenes": scenes, "pacing": score_scenes(scenes)}
+    
+    async def _invoke(self, messages: list) -> str:
+        response = await self.llm.ainvoke(messages)
+        record_usage(response, self.llm.model)
+        return response.content
+    
     def _parse_scenes(
         self, 
         gemini_output: str, 
@@ -431,12 +463,17 @@ Generate {num_total_scenes} scenes following this exact format:"""
         master_voice_description: str,
         visual_style: str, 
         language: str
-    ) -> list:
-        """Parse Gemini output into structured scenes with CHARACTER (ON/OFF SCREEN) types"""
-        scenes = []
+    ) -> tuple[list, list]:
+        """
+        Parse Gemini output into structured scenes with CHARACTER (ON/OFF SCREEN) types
+        
+        Returns:
+            (scenes, plan) - plan keeps each scene's parts for render_language()
+        """
+        parsed = []
         scene_blocks = re.split(r'===SCENE \d+', gemini_output)[1:]
         
-        for i, block in enumerate(scene_blocks, 1):
+        for block in scene_blocks:
             if '===END SCENE' not in block:
                 continue
             
@@ -449,9 +486,6 @@ Generate {num_total_scenes} scenes following this exact format:"""
             elif "OFF-SCREEN" in block:
                 scene_type = "CHARACTER (OFF-SCREEN)"
             
-            # Determine duration (All 8 seconds)
-            duration = 8
-            
             # Extract sections with updated regex for new headers
             visual_match = re.search(r'VISUAL \(VEO 3\).*?:\s*(.*?)(?=DIALOGUE|$)', block, re.DOTALL | re.IGNORECASE)
             # Match Dialogue with variable header
@@ -465,8 +499,54 @@ Generate {num_total_scenes} scenes following this exact format:"""
             # Clean up headers from dialogue text if caught
             dialogue = re.sub(r'\(.*?\)', '', dialogue).strip()  # Remove parenthetical notes inside dialogue if any
             
-            # Build complete prompt with voice description in SPEAKER section only
-            complete_prompt = f"""===== SCENE {i} ({duration} SECONDS – {scene_type}) =====
+            parsed.append((scene_type, visual_prompt, dialogue, teaching_point))
+        
+        # Fix pacing locally instead of regenerating the whole set
+        dialogues = [item[2] for item in parsed]
+        if settings.PACING_REBALANCE:
+            dialogues = rebalance_dialogues(dialogues)
+        
+        scenes = []
+        plan = []
+        for i, ((scene_type, visual_prompt, _, teaching_point), dialogue) in enumerate(zip(parsed, dialogues), 1):
+            scenes.append(self._build_scene(
+                i, scene_type, visual_prompt, dialogue, teaching_point,
+                character_name, voice_tone, master_voice_description, visual_style, language
+            ))
+            plan.append({
+                "scene_type": scene_type,
+                "visual_prompt": visual_prompt,
+                "teaching_point": teaching_point,
+                "dialogue": dialogue
+            })
+        
+        print(f"✅ Parsed {len(scenes)} educational scenes")
+        on_screen_scenes = [s for s in scenes if "ON-SCREEN" in s["scene_type"]]
+        off_screen_scenes = [s for s in scenes if "OFF-SCREEN" in s["scene_type"]]
+        print(f"👤 ON-SCREEN scenes: {len(on_screen_scenes)}")
+        print(f"🎨 OFF-SCREEN scenes: {len(off_screen_scenes)}")
+        print(f"🎙️ Voice Continuity: ENFORCED (Same Caller Mic)")
+        return scenes, plan
+    
+    def _build_scene(
+        self,
+        i: int,
+        scene_type: str,
+        visual_prompt: str,
+        dialogue: str,
+        teaching_point: str,
+        character_name: str,
+        voice_tone: str,
+        master_voice_description: str,
+        visual_style: str,
+        language: str
+    ) -> dict:
+        """Assemble a scene dict with its complete Veo prompt"""
+        # Determine duration (All 8 seconds)
+        duration = 8
+        
+        # Build complete prompt with voice description in SPEAKER section only
+        complete_prompt = f"""===== SCENE {i} ({duration} SECONDS – {scene_type}) =====
 
 SCENE TYPE:
 {scene_type}
@@ -507,41 +587,17 @@ ID: {character_name.lower().replace(' ', '_')}_{voice_tone.replace(' ', '_')}
 Voice: {master_voice_description}
 Source: Same caller microphone as Scene 1
 Text: "{dialogue}" """
-            
-            scenes.append({
-                "scene_number": i,
-                "scene_type": scene_type,
-                "duration": duration,
-                "dialogue": dialogue,
-                "emotion": "engaging" if "ON-SCREEN" in scene_type else "informative",
-                "teaching_point": teaching_point,
-                "prompt": complete_prompt,
-                "voice_description": master_voice_description
-            })
         
-        print(f"✅ Parsed {len(scenes)} educational scenes")
-        on_screen_scenes = [s for s in scenes if "ON-SCREEN" in s["scene_type"]]
-        off_screen_scenes = [s for s in scenes if "OFF-SCREEN" in s["scene_type"]]
-        print(f"👤 ON-SCREEN scenes: {len(on_screen_scenes)}")
-        print(f"🎨 OFF-SCREEN scenes: {len(off_screen_scenes)}")
-        print(f"🎙️ Voice Continuity: ENFORCED (Same Caller Mic)")
-        return scenes
-    
-    def _create_custom_voice_prompt(self, custom_description: str) -> str:
-        """
-        Convert user's custom voice description into a structured voice prompt
-        
-        This method creates a clean, direct voice prompt similar to predefined voices
-        """
-        # Clean up the description
-        custom_description = custom_description.strip()
-        
-        # Create a simple, direct prompt similar to predefined voice prompts
-        # This format works better with TTS systems
-        custom_prompt = f"{custom_description}. Clean audio, professional recording quality."
-        
-        return custom_prompt
-
+        return {
+            "scene_number": i,
+            "scene_type": scene_type,
+            "duration": duration,
+            "dialogue": dialogue,
+            "emotion": "engaging" if "ON-SCREEN" in scene_type else "informative",
+            "teaching_point": teaching_point,
+            "prompt": complete_prompt,
+            "voice_description": master_voice_description
+        }
     
     def _extract_voice_description(self, description: str) -> str:
         """Extract voice characteristics from user description"""
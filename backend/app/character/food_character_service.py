@@ -3,12 +3,16 @@
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
-from typing import Dict
+from typing import Dict, List, Optional
 from app.config import settings
+from app.services.usage import record_usage
+import asyncio
 import re
 
 # Voice descriptions are imported from service.py
-from app.character.service import VOICE_DESCRIPTIONS
+from app.character.voices import voice_registry
+from app.character.pacing import add_pauses, rebalance_dialogues, score_scenes, split_into_scenes
+from app.character.multilingual import render_dialogues
 
 
 class FoodCharacterGenerator:
@@ -32,7 +36,8 @@ class FoodCharacterGenerator:
         visual_style: str,
         language: str,
         total_duration: int,
-        custom_dialogues: str = None  # NEW: User-provided dialogues
+        custom_dialogues: str = None,  # NEW: User-provided dialogues
+        generate_visuals: bool = True  # Custom dialogues only: ask Gemini for visual prompts
     ) -> Dict:
         """Generate food character dialogue with STRICT 8-second pacing"""
         
@@ -43,15 +48,8 @@ class FoodCharacterGenerator:
         print(f"Topic: {topic_mode}")
         print(f"Language: {language}")
         
-        # Get voice info
-        voice_info = VOICE_DESCRIPTIONS.get(voice_tone)
-        if not voice_info:
-            print(f"⚠️ Voice '{voice_tone}' not found, falling back")
-            voice_info = VOICE_DESCRIPTIONS.get("adult_male", VOICE_DESCRIPTIONS["child_happy"])
-            if "female" in voice_tone:
-                voice_info = VOICE_DESCRIPTIONS.get("adult_female", voice_info)
-        
-        voice_anchor = voice_info["anchor_block"]
+        # Get voice info (precomputed; unknown names resolved by the registry)
+        voice_anchor = voice_registry.get(voice_tone)["anchor_block"]
         
         # Calculate scenes
         num_scenes = max(1, total_duration // 8)
@@ -66,7 +64,7 @@ class FoodCharacterGenerator:
         lang_display = "HINDI (Devanagari + English Terms)" if language == "hindi" else "ENGLISH"
         
         # ✨ NEW: Define global audio signature (like commercial prompt)
-        audio_signature = self._get_audio_signature(voice_tone, topic_mode)
+        audio_signature = voice_registry.audio_signature(voice_tone, topic_mode)
         
         # Build scenario context if provided
         scenario_context = ""
@@ -83,84 +81,57 @@ class FoodCharacterGenerator:
 """
             print(f"🎬 Using scenario: {scenario[:50]}...")
         
+        # The character look is described once and shared by all scenes (stored as a prompt fragment)
+        look_instruction = f"""FIRST, describe the character ONCE - it is reused in every scene, do NOT repeat it in Visual Prompts:
+===CHARACTER LOOK===
+Anthropomorphic {character_name}, {visual_style} style. [Detailed appearance - shape, size, color, texture, facial features - 40+ words]
+===END CHARACTER LOOK===
+"""
+        
         # Build food-specific prompt - TWO MODES
+        dialogue_parts = None
         if custom_dialogues and custom_dialogues.strip():
-            # MODE 1: User provided dialogues - break them into scenes
+            # MODE 1: User provided dialogues - split locally, Gemini only writes the visuals
             print(f"💬 Using custom dialogues ({len(custom_dialogues)} chars)")
-            system_prompt = f"""You MUST create EXACTLY {num_scenes} scenes by breaking these dialogues.
+            # CPU-bound partition search: kept off the event loop
+            dialogue_parts = await asyncio.to_thread(split_into_scenes, custom_dialogues, num_scenes)
+            dialogue_parts = [add_pauses(part) for part in dialogue_parts]
+            numbered_dialogues = "\n".join(f"Scene {i}: {part}" for i, part in enumerate(dialogue_parts, 1))
+            
+            system_prompt = None
+            if generate_visuals:
+                system_prompt = f"""You MUST create EXACTLY {num_scenes} scenes for a talking {character_name} video.
+The dialogue of every scene is FIXED and already written - do NOT write, translate or change any dialogue.
 
-USER PROVIDED DIALOGUES:
-\"\"\"{custom_dialogues.strip()}\"\"\"
+FIXED SCENE DIALOGUES:
+{numbered_dialogues}
 {scenario_context}
 🎤 GLOBAL AUDIO SIGNATURE (MAINTAIN ACROSS ALL SCENES):
 {audio_signature}
 
-🚨 CRITICAL VOICE CONSISTENCY RULES 🚨:
-✅ Scene 1: Include FULL audio signature in Audio Descriptor + "Clear, steady voice at consistent volume level"
-✅ Scene 2: "Same voice as Scene 1 - {audio_signature} - maintaining identical volume"
-✅ Scene 3+: "CRITICAL: Exact same voice from Scene 1 - {audio_signature} - no volume drop, no tone shift"
-✅ ALL scenes must reference the SAME audio signature explicitly
-✅ This prevents voice suppression/degradation in later scenes
-
-🚨 CRITICAL REQUIREMENT 🚨:
-You MUST generate EXACTLY {num_scenes} scenes. Do NOT generate just 1 scene!
-Break the user's dialogues into {num_scenes} equal parts and create one scene for each part.
-
-INSTRUCTIONS:
-1. Read ALL the user's dialogues above
-2. Divide them into {num_scenes} roughly equal portions
-3. Create EXACTLY {num_scenes} scenes (===SCENE 1===, ===SCENE 2===, ===SCENE 3===, etc.)
-4. Each scene gets one portion of the dialogues
-5. Use the EXACT words from user (no translation, no changes)
-6. ADD COMMAS for natural pauses to reach 8-second duration
-
-FORMAT FOR EACH SCENE:
+{look_instruction}
+THEN, FORMAT FOR EACH SCENE:
 ===SCENE X===
 Visual Prompt (Veo 3 Format):
-Anthropomorphic {character_name}, {visual_style} style. [Detailed appearance - shape, size, color, facial features]. {visual_tone}. [Action/gesture]. [Setting description - kitchen, garden, studio]. [Camera angle]. [Lighting]. No subtitles.
+{visual_tone}. [Action/gesture matching this scene's dialogue]. [Setting description - kitchen, garden, studio]. [Camera angle]. [Lighting]. No subtitles.
 
 Audio Descriptor:
 [Scene 1: "{audio_signature}. Clear, steady voice at consistent volume level."]
 [Scene 2: "Same voice as Scene 1 - {audio_signature} - maintaining identical volume and tone."]
 [Scene 3+: "CRITICAL: Exact same voice from Scene 1 - {audio_signature} - consistent audio throughout."]
 
-Dialogue ({lang_display}):
-[Portion of user's dialogues with COMMAS added for pacing - 25 words for Scene 1, 20 words for other scenes]
-
 Teaching Point:
-[What this portion is teaching]
+[What this scene's dialogue is teaching]
 ===END SCENE X===
 
-🎤 PACING RULES FOR 8-SECOND DURATION:
-✅ Add commas (,) after every 4-6 words to create natural pauses
-✅ This ensures the dialogue takes FULL 8 seconds (not 7 seconds)
-✅ Commas create ~0.3-0.5 second pauses in speech synthesis
-✅ Total: 25 words + 4-5 pauses = exactly 8 seconds
-✅ DO NOT rush - comfortable, natural speaking pace
-
-PACING EXAMPLES:
-❌ WRONG (7 seconds - too fast):
-मैं Apple हूँ और मुझमें Vitamin C है जो आपकी immunity को मजबूत बनाकर शरीर को healthy रखता है।
-
-✅ CORRECT (8 seconds - proper pacing):
-मैं Apple हूँ, और मुझमें Vitamin C है, जो आपकी immunity को मजबूत बनाकर, शरीर को healthy रखता है।
-
-🚨 SCENE LIMIT ENFORCEMENT 🚨:
-✅ Scene 1: Extract first 25 words from user's dialogues + add commas
-✅ Scene 2: Next 20 words from remaining dialogues + add commas
-✅ Scene 3: Next 20 words from remaining dialogues + add commas
-✅ Continue until ALL {num_scenes} scenes are created
-✅ Use ALL of the user's dialogues across all scenes
-
-🎨 VISUAL REQUIREMENTS (80+ words per prompt):
-✅ Anthropomorphic {character_name} character
-✅ {visual_style} animation style
+🎨 VISUAL REQUIREMENTS (50+ words per prompt, scene-specific details only):
 ✅ {visual_tone}
-✅ Detailed facial features, expressions, gestures
+✅ Expressions and gestures
 ✅ Rich environment description
 ✅ Camera work and lighting details
+✅ DO NOT include dialogue, voice anchor or audio descriptions in Visual Prompt
 
-NOW CREATE ALL {num_scenes} SCENES WITH PROPER 8-SECOND PACING:"""
+NOW CREATE ALL {num_scenes} SCENES:"""
         else:
             # MODE 2: Auto-generate dialogues (original behavior)
             system_prompt = f"""Create {num_scenes} 8-SECOND video scenes about {character_name} ({topic_mode}).
@@ -216,10 +187,11 @@ LANGUAGE: {lang_display}
 - DRAMATIC: "*Epic voice* मुझमें Antioxidants हैं जो body को बीमारी से बचाते हैं!"
 - RELATABLE: "3 बजे hunger लगती है ना? That's where I come in, boss!"
 
-For each scene:
+{look_instruction}
+Then for each scene:
 ===SCENE X===
 Visual Prompt (Veo 3 Format):
-[Anthropomorphic {character_name}, {visual_style} style]. [Detailed appearance - shape, size, color, facial features]. [{visual_tone}]. [Action/gesture]. [Setting]. [Camera/lighting]. No subtitles.
+[{visual_tone}]. [Action/gesture]. [Setting]. [Camera/lighting]. No subtitles.
 
 Audio Descriptor:
 [Scene 1: "{audio_signature}. Clear, steady voice at consistent volume level."]
@@ -272,21 +244,12 @@ Teaching Point:
 
 ❌ मुझमें powerful Antioxidants होते हैं, जो body को रोगों से बचाते हैं, और आपकी Immunity को, बहुत boost करते हैं। (28 words - TOO LONG, will cut off!)
 
-🎤 LONG WORD EXAMPLES (3+ syllables - use FEWER total words):
-- Antioxidants (5 syllables) = 1.5 words
-- Immunity (4 syllables) = 1.5 words  
-- Magnesium (4 syllables) = 1.5 words
-- Cholesterol (4 syllables) = 1.5 words
-- Cardiovascular (5 syllables) = 2 words
-
-RULE: If dialogue has 2+ long words, MAX 18 words total!
-
 🎨 VISUAL RULES:
 ✅ Anthropomorphic food character (round apple with face, orange carrot)
 ✅ 3D animation style
 ✅ {"Concerned/serious/warning facial expressions" if topic_mode == "side_effects" else "Happy/friendly facial expressions (big eyes, friendly smile)"}
-✅ Detailed facial features
-✅ 80+ words per visual prompt
+✅ Detailed facial features in the CHARACTER LOOK
+✅ 50+ words per visual prompt (scene-specific details only)
 
 🎤 AUDIO CONSISTENCY EXAMPLES (CRITICAL FOR VEO):
 
@@ -314,9 +277,13 @@ SCENE 4+ Audio Descriptor:
 
 CORRECT EXAMPLES:
 
+===CHARACTER LOOK===
+Anthropomorphic Apple character, rendered in charming 3D animated style. Vibrant red, perfectly round with glossy texture, small brown stem, two bright green leaves. Large expressive cartoon eyes with sparkles, thick eyelashes.
+===END CHARACTER LOOK===
+
 ===SCENE 1===
 Visual Prompt:
-Anthropomorphic Apple character, rendered in charming 3D animated style. Vibrant red, perfectly round with glossy texture, small brown stem, two bright green leaves. Large expressive cartoon eyes with sparkles, thick eyelashes, wide friendly smile. Standing on white marble kitchen counter, body bouncing enthusiastically. Animated sparkles around suggesting freshness. Bright modern kitchen, soft natural sunlight through window, warm glow. Medium shot at eye level, personable and approachable. Soft lighting highlights glossy surface. No subtitles.
+Wide friendly smile. Standing on white marble kitchen counter, body bouncing enthusiastically. Animated sparkles around suggesting freshness. Bright modern kitchen, soft natural sunlight through window, warm glow. Medium shot at eye level, personable and approachable. Soft lighting highlights glossy surface. No subtitles.
 
 Audio Descriptor:
 {audio_signature}. Clear, steady voice at consistent volume level.
@@ -365,81 +332,135 @@ Generate {num_scenes} scenes in HINDI (Devanagari + English) with COMMAS for 8-s
         
         # Call Gemini
         try:
-            messages = [{"role": "user", "content": system_prompt}]
-            # Call Gemini with fallback strategy
-            try:
-                # Try with primary model (gemini-2.5-flash)
-                response = await self.llm.ainvoke(messages)
-                gemini_output = response.content
-            except Exception as e:
-                error_str = str(e).lower()
-                if "429" in error_str or "resource_exhausted" in error_str:
-                    print(f"⚠️ Quota exceeded for gemini-2.5-flash in Food Service. Falling back to gemini-1.5-flash...")
-                    # Fallback model
-                    fallback_llm = ChatGoogleGenerativeAI(
-                        model="gemini-1.5-flash",
-                        google_api_key=self.api_key,
-                        temperature=0.7,
-                        max_output_tokens=8192
-                    )
-                    try:
-                        response = await fallback_llm.ainvoke(messages)
-                        gemini_output = response.content
-                        print(f"✅ Successfully generated using fallback model gemini-1.5-flash")
-                    except Exception as fallback_error:
-                        raise Exception(f"Fallback model also failed: {str(fallback_error)}")
-                else:
-                    raise e
+            if system_prompt is None:
+                print(f"⚡ Visual prompts built locally - no Gemini call")
+                gemini_output = ""
+            else:
+                gemini_output = await self._invoke([{"role": "user", "content": system_prompt}])
+                print(f"\n🤖 Gemini Response:\n{gemini_output[:200]}...")
             
-            print(f"\n🤖 Gemini Response:\n{gemini_output[:200]}...")
+            look_match = re.search(r'===CHARACTER LOOK===\s*(.*?)\s*===END CHARACTER LOOK===', gemini_output, re.DOTALL)
+            character_look = look_match.group(1).strip() if look_match else ""
             
             # Parse scenes
-            scenes = self._parse_scenes(gemini_output, character_name, voice_tone, voice_anchor, visual_style, language, audio_signature)
+            default_visual = (
+                f"Anthropomorphic {character_name}, {visual_style} style. {visual_tone}. "
+                f"Speaking directly to camera{' - ' + scenario.strip() if scenario and scenario.strip() else ''}. "
+                f"Medium shot at eye level, soft natural lighting. No subtitles."
+            )
+            scenes, plan = self._parse_scenes(
+                gemini_output, character_name, voice_tone, voice_anchor, visual_style, language, audio_signature,
+                dialogues=dialogue_parts, default_visual=default_visual, character_look=character_look
+            )
+            pacing = score_scenes(scenes)
+            if pacing["scenes_long"] or pacing["scenes_short"]:
+                print(f"⏱️ Pacing off target - long: {pacing['scenes_long']}, short: {pacing['scenes_short']}")
             
             return {
                 "scenes": scenes,
                 "total_scenes": len(scenes),
                 "character_name": character_name,
                 "topic": topic_mode,
-                "audio_signature": audio_signature  # ✨ NEW
+                "audio_signature": audio_signature,  # ✨ NEW
+                "pacing": pacing,
+                # Shared across scenes - stored once per project by the route
+                "fragments": {
+                    "character_look": character_look,
+                    "style": visual_style,
+                    "voice_anchor": voice_anchor,
+                    "audio_signature": audio_signature
+                },
+                # Language-neutral scene plan for render_language()
+                "plan": {
+                    "language": language,
+                    "scenes": plan,
+                    "context": {
+                        "character_name": character_name,
+                        "voice_tone": voice_tone,
+                        "voice_anchor": voice_anchor,
+                        "visual_style": visual_style,
+                        "audio_signature": audio_signature,
+                        "character_look": character_look
+                    }
+                }
             }
             
         except Exception as e:
             print(f"❌ Gemini API Error: {str(e)}")
             raise Exception(f"Failed to generate food character dialogue: {str(e)}")
     
-    # ✨ NEW: Get audio signature based on voice and topic
-    def _get_audio_signature(self, voice_tone: str, topic_mode: str) -> str:
-        """Define consistent audio signature for all scenes"""
-        
-        # Base voice characteristics
-        if "child" in voice_tone:
-            base_voice = "bright, youthful voice with playful energy"
-            pitch = "higher pitch range"
-        elif "female" in voice_tone:
-            base_voice = "clear, warm female voice"
-            pitch = "medium-high pitch"
-        else:
-            base_voice = "confident, steady male voice"
-            pitch = "medium pitch"
+    async def render_language(self, plan: Dict, language: str) -> Dict:
+        """
+        Scenes of an existing plan with their dialogue in another language
+
+        Only the dialogue is generated (one short LLM call); visuals, audio
+        descriptors and teaching points are reused from the plan.
+        """
+        dialogues = await render_dialogues(
+            self._invoke, plan["context"]["character_name"], plan["language"], language, plan["scenes"]
+        )
+        scenes = [
+            self._build_scene(
+                i, scene["visual_prompt"], scene["audio_descriptor"], dialogue, scene["teaching_point"],
+                language=language, **plan["context"]
+            )
+            for i, (scene, dialogue) in enumerate(zip(plan["scenes"], dialogues), 1)
+        ]
+        return {"language": language, "scenes": scenes, "pacing": score_scenes(scenes)}
+    
+    async def _invoke(self, messages: list) -> str:
+        """Call Gemini, falling back to gemini-1.5-flash when the primary model's quota is exhausted"""
+        try:
+            # Try with primary model (gemini-2.5-flash)
+            response = await self.llm.ainvoke(messages)
+            record_usage(response, self.llm.model)
+            return response.content
+        except Exception as e:
+            error_str = str(e).lower()
+            if "429" in error_str or "resource_exhausted" in error_str:
+                print(f"⚠️ Quota exceeded for gemini-2.5-flash in Food Service. Falling back to gemini-1.5-flash...")
+                # Fallback model
+                fallback_llm = ChatGoogleGenerativeAI(
+                    model="gemini-1.5-flash",
+                    google_api_key=self.api_key,
+                    temperature=0.7,
+                    max_output_tokens=8192
+                )
+                try:
+                    response = await fallback_llm.ainvoke(messages)
+                    record_usage(response, fallback_llm.model)
+                    print(f"✅ Successfully generated using fallback model gemini-1.5-flash")
+                    return response.content
+                except Exception as fallback_error:
+                    raise Exception(f"Fallback model also failed: {str(fallback_error)}")
+            raise e
+    
+    def _parse_scenes(
+        self,
+        gemini_output: str,
+        character_name: str,
+        voice_tone: str,
+        voice_anchor: str,
+        visual_style: str,
+        language: str,
+        audio_signature: str,
+        dialogues: Optional[List[str]] = None,
+        default_visual: str = "",
+        character_look: str = ""
+    ) -> tuple[list, list]:
+        """
+        Parse Gemini output into structured scenes
         
-        # Emotional tone based on topic
-        if topic_mode == "side_effects":
-            emotion = "concerned, cautionary tone with gentle warning"
-            pace = "measured, 95 BPM speaking pace"
-        else:
-            emotion = "enthusiastic, friendly tone with encouraging inflection"
-            pace = "upbeat, 105 BPM speaking pace"
+        When dialogues are given (custom dialogue mode) they replace any parsed
+        dialogue, and scenes Gemini did not return get default_visual.
         
-        # Combine into signature (like "120 BPM, sub-bass swells")
-        return f"{base_voice}, {pitch}, {emotion}, {pace}, natural pauses at commas"
-    
-    def _parse_scenes(self, gemini_output: str, character_name: str, voice_tone: str, voice_anchor: str, visual_style: str, language: str, audio_signature: str) -> list:
-        """Parse Gemini output into structured scenes"""
-        scenes = []
+        Returns:
+            (scenes, plan) - plan keeps each scene's parts for render_language()
+        """
+        parsed = []
         scene_blocks = re.split(r'===SCENE \d+===', gemini_output)[1:]
         
-        for i, block in enumerate(scene_blocks, 1):
+        for block in scene_blocks:
             if '===END SCENE' not in block:
                 continue
             
@@ -447,7 +468,7 @@ Generate {num_scenes} scenes in HINDI (Devanagari + English) with COMMAS for 8-s
             
             # Extract sections
             visual_match = re.search(r'Visual Prompt.*?:\s*(.*?)(?=Audio Descriptor|Dialogue|$)', block, re.DOTALL | re.IGNORECASE)
-            audio_match = re.search(r'Audio Descriptor.*?:\s*(.*?)(?=Dialogue|$)', block, re.DOTALL | re.IGNORECASE)
+            audio_match = re.search(r'Audio Descriptor.*?:\s*(.*?)(?=Dialogue|Teaching Point|$)', block, re.DOTALL | re.IGNORECASE)
             dialogue_match = re.search(r'Dialogue.*?:\s*(.*?)(?=Teaching Point|$)', block, re.DOTALL | re.IGNORECASE)
             teaching_match = re.search(r'Teaching Point.*?:\s*(.*?)(?=$)', block, re.DOTALL | re.IGNORECASE)
             
@@ -460,11 +481,59 @@ Generate {num_scenes} scenes in HINDI (Devanagari + English) with COMMAS for 8-s
             visual_prompt = visual_prompt.replace("(HINDI):", "").replace("(HINGLISH):", "").replace("(ENGLISH):", "").replace("(HINDI - 8 SECONDS):", "").replace("(8 SECONDS):", "").strip()
             dialogue = dialogue.replace("(HINDI):", "").replace("(HINGLISH):", "").replace("(ENGLISH):", "").replace("(HINDI - 8 SECONDS):", "").replace("(8 SECONDS):", "").strip()
             
-            # Build complete prompt with voice in SPEAKER section only
-            complete_prompt = f"""===== SCENE {i} (8 SECONDS) =====
+            parsed.append((visual_prompt, audio_descriptor, dialogue, teaching_point))
+        
+        if dialogues is not None:
+            # Dialogue was split locally; only visuals come from Gemini
+            parsed = parsed[:len(dialogues)]
+            parsed += [(default_visual, "", "", "")] * (len(dialogues) - len(parsed))
+        else:
+            # Fix pacing locally instead of regenerating the whole set
+            dialogues = [item[2] for item in parsed]
+            if settings.PACING_REBALANCE:
+                dialogues = rebalance_dialogues(dialogues)
+        
+        scenes = []
+        plan = []
+        for i, ((visual_prompt, audio_descriptor, _, teaching_point), dialogue) in enumerate(zip(parsed, dialogues), 1):
+            scenes.append(self._build_scene(
+                i, visual_prompt, audio_descriptor, dialogue, teaching_point,
+                character_name, voice_tone, voice_anchor, visual_style, language, audio_signature,
+                character_look
+            ))
+            plan.append({
+                "visual_prompt": visual_prompt,
+                "audio_descriptor": audio_descriptor,
+                "teaching_point": teaching_point,
+                "dialogue": dialogue
+            })
+        
+        print(f"✅ Parsed {len(scenes)} food character scenes with 8-second pacing and voice consistency")
+        return scenes, plan
+    
+    def _build_scene(
+        self,
+        i: int,
+        visual_prompt: str,
+        audio_descriptor: str,
+        dialogue: str,
+        teaching_point: str,
+        character_name: str,
+        voice_tone: str,
+        voice_anchor: str,
+        visual_style: str,
+        language: str,
+        audio_signature: str,
+        character_look: str = ""
+    ) -> dict:
+        """Assemble a scene dict with its complete Veo prompt"""
+        visual = f"{character_look}\n{visual_prompt}" if character_look else visual_prompt
+        
+        # Build complete prompt with voice in SPEAKER section only
+        complete_prompt = f"""===== SCENE {i} (8 SECONDS) =====
 
 VISUAL (VEO 3):
-{visual_prompt}
+{visual}
 
 🎤 AUDIO CONSISTENCY:
 Global Signature: {audio_signature}
@@ -488,20 +557,16 @@ Voice: {voice_anchor}
 Consistency: {"REFERENCE - establish baseline" if i == 1 else f"MATCH Scene 1 exactly - {audio_signature}"}
 Emotion: {"concerned" if "concern" in visual_prompt.lower() else "happy"}
 Text: "{dialogue}" """
-            
-            scenes.append({
-                "scene_number": i,
-                "dialogue": dialogue,
-                "emotion": "concerned" if "concern" in visual_prompt.lower() else "happy",
-                "teaching_point": teaching_point,
-                "audio_signature": audio_signature,  # ✨ NEW
-                "audio_descriptor": audio_descriptor,  # ✨ NEW
-                "prompt": complete_prompt
-            })
         
-        print(f"✅ Parsed {len(scenes)} food character scenes with 8-second pacing and voice consistency")
-        return scenes
-
+        return {
+            "scene_number": i,
+            "dialogue": dialogue,
+            "emotion": "concerned" if "concern" in visual_prompt.lower() else "happy",
+            "teaching_point": teaching_point,
+            "audio_signature": audio_signature,  # ✨ NEW
+            "audio_descriptor": audio_descriptor,  # ✨ NEW
+            "prompt": complete_prompt
+        }
 
 # Create singleton instance
 food_character_generator = FoodCharacterGenerator()
\ No newline at end of file
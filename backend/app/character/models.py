@@ -13,8 +13,11 @@ class CharacterSceneRequest(BaseModel):
     scenario: Optional[str] = Field(None, description="Context/scenario for the character")
     visual_style: str = Field(default="3D Animation Style")
     language: str = Field(default="hindi", description="hindi or english")
+    languages: Optional[List[str]] = Field(None, description="Languages to render from one scene plan; the first is the primary (overrides language)")
     total_duration: int = Field(default=8, description="Total video duration in seconds")
     custom_dialogues: Optional[str] = Field(None, description="User-provided dialogues to break into scenes")  # NEW
+    generate_visuals: bool = Field(default=True, description="With custom_dialogues: use Gemini for visual prompts (False = local templates, no LLM call)")
+    fresh: bool = Field(default=False, description="Generate a new variant instead of serving a pre-generated result")
     project_id: Optional[str] = Field(None, description="Associated project ID")
 
 class CharacterScene(BaseModel):
@@ -70,6 +73,7 @@ class CharacterProjectDB(BaseModel):
     scenario: Optional[str]
     visual_style: str
     language: str
+    languages: List[str] = Field(default_factory=list)  # Dialogue variants stored for the project (primary first)
     total_duration: int
     created_at: datetime = Field(default_factory=datetime.utcnow)
     last_updated: datetime = Field(default_factory=datetime.utcnow)
@@ -86,7 +90,9 @@ class CharacterSceneDB(BaseModel):
     dialogue: str
     emotion: str
     teaching_point: str
-    generated_prompt: str
+    language: Optional[str] = None  # Dialogue variant; None on scenes saved before multilingual projects
+    generated_prompt: Optional[str] = None
+    prompt_template: Optional[str] = None  # generated_prompt with {{fragment:<id>}} placeholders
     duration: int = 8
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,104 @@
+# app/character/multilingual.py
+# Render one scene plan in additional languages
+#
+# A character video is planned once - visuals, teaching points, emotions and
+# the dialogue in its primary language - by the food or educational service.
+# Each extra language then only needs its dialogue: one short LLM call per
+# language rewrites every scene's dialogue at once (same facts, same 8-second
+# pacing), and the calls for all languages run concurrently.
+
+import re
+from typing import Awaitable, Callable, Dict, List
+
+from app.character.pacing import rebalance_dialogues
+from app.config import settings
+
+# Script and vocabulary rules per language (others get plain, natural speech)
+LANGUAGE_RULES = {
+    "hindi": (
+        "Write Hindi words in DEVANAGARI script (मैं, हूँ, है). Keep English for terms without a "
+        "good Hindi equivalent (Vitamin, Protein, Immunity, Digestion, technical terms) and for food "
+        "and brand names (Apple, Carrot). Mix both naturally, like casual Indian conversation. "
+        "NO Roman script for Hindi words."
+    ),
+    "english": "Write natural, conversational English."
+}
+
+
+def language_display(language: str) -> str:
+    if language == "hindi":
+        return "HINDI (Devanagari + English Terms)"
+    return language.upper()
+
+
+def _render_prompt(character_name: str, source_language: str, target_language: str, scenes: List[Dict]) -> str:
+    source = "\n".join(
+        f"Scene {i}: {scene['dialogue']}\n(Teaching point: {scene.get('teaching_point') or '-'})"
+        for i, scene in enumerate(scenes, 1)
+    )
+    rules = LANGUAGE_RULES.get(target_language, f"Write natural, conversational {target_language}.")
+    return f"""Rewrite the dialogue of a {len(scenes)}-scene video spoken by {character_name} in {language_display(target_language)}.
+The visuals are fixed: every scene must make the SAME point as the {source_language} dialogue below.
+
+{source_language.upper()} DIALOGUE:
+{source}
+
+RULES:
+✅ {rules}
+✅ Keep the tone, humor and personality - adapt jokes and idioms, do not translate word for word
+✅ Each scene is spoken in 8 seconds: about 20-25 words, commas every 4-6 words for natural pauses
+✅ One complete thought per scene
+❌ NO visual, audio or stage directions - dialogue text only
+
+FORMAT (exactly {len(scenes)} scenes):
+===SCENE 1===
+[dialogue]
+===SCENE 2===
+[dialogue]
+
+Write all {len(scenes)} scenes:"""
+
+
+def _parse_rendered(output: str, count: int) -> List[str]:
+    dialogues = [""] * count
+    for match in re.finditer(r"===SCENE (\d+)===\s*(.*?)(?====SCENE|\Z)", output, re.DOTALL):
+        index = int(match.group(1)) - 1
+        if 0 <= index < count:
+            dialogues[index] = match.group(2).replace("===END SCENE", "").strip().strip('"')
+    return dialogues
+
+
+async def render_dialogues(
+    invoke: Callable[[list], Awaitable[str]],
+    character_name: str,
+    source_language: str,
+    target_language: str,
+    scenes: List[Dict]
+) -> List[str]:
+    """
+    Dialogue of every planned scene in another language (one LLM call)
+
+    Args:
+        invoke: The service's LLM call (messages -> text)
+        character_name: Speaker, for tone
+        source_language: Language of the planned dialogue
+        target_language: Language to render
+        scenes: Planned scenes ({"dialogue", "teaching_point"})
+
+    Returns:
+        One dialogue per scene; scenes the model skipped keep the source dialogue
+    """
+    output = await invoke([{"role": "user", "content": _render_prompt(
+        character_name, source_language, target_language, scenes
+    )}])
+    dialogues = _parse_rendered(output, len(scenes))
+
+    missing = [i for i, dialogue in enumerate(dialogues, 1) if not dialogue]
+    if missing:
+        print(f"⚠️ No {target_language} dialogue for scenes {missing}, keeping {source_language}")
+    dialogues = [dialogue or scene["dialogue"] for dialogue, scene in zip(dialogues, scenes)]
+
+    if settings.PACING_REBALANCE:
+        dialogues = rebalance_dialogues(dialogues)
+    print(f"🌐 Rendered {len(dialogues)} scenes in {target_language}")
+    return dialogues
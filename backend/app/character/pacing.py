@@ -0,0 +1,293 @@
+# app/character/pacing.py
+# Local speech-duration estimation for 8-second scene pacing
+#
+# Estimates how long a dialogue takes to speak without calling the LLM.
+# Works per word, so Devanagari Hindi, Roman-script Hinglish and English
+# can be mixed freely in one sentence (which is what the prompts ask for).
+
+import re
+from typing import Dict, List
+
+TARGET_SECONDS = 8.0
+MIN_SECONDS = 6.0   # Below this the clip ends with dead air
+MAX_SECONDS = 8.5   # Above this Veo cuts the dialogue off
+
+# Calibrated against the pacing examples in the food character prompt
+# ("मैं Apple हूँ, और मुझमें Vitamin C है, ..." ≈ 8 seconds)
+DEVANAGARI_SYLLABLES_PER_SECOND = 5.8
+LATIN_SYLLABLES_PER_SECOND = 4.2
+COMMA_PAUSE_SECONDS = 0.3
+SENTENCE_PAUSE_SECONDS = 0.45
+
+# split_into_scenes() is O(scenes x units²); longer texts are cut into at most
+# this many units (runs of whole sentences) to keep it under ~50ms
+MAX_SPLIT_UNITS = 120
+
+_WORD_RE = re.compile(r"[\wऀ-ॿ']+")
+_DEVANAGARI_RE = re.compile(r"[ऀ-ॿ]")
+_LATIN_VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+_CLAUSE_RE = re.compile(r"[^,;।.!?]+[,;।.!?]*")
+_SENTENCE_END_RE = re.compile(r"[.!?।]")
+_SENTENCE_RE = re.compile(r"[^.!?।]+[.!?।]*")
+
+_VIRAMA = "्"
+_NUKTA = "़"
+
+
+def _is_consonant(char: str) -> bool:
+    code = ord(char)
+    return 0x0915 <= code <= 0x0939 or 0x0958 <= code <= 0x095F
+
+
+def _is_independent_vowel(char: str) -> bool:
+    return 0x0904 <= ord(char) <= 0x0914
+
+
+def _devanagari_syllables(word: str) -> int:
+    """Count aksharas, dropping the word-final inherent vowel (schwa deletion)"""
+    count = 0
+    length = len(word)
+    for i, char in enumerate(word):
+        if _is_independent_vowel(char):
+            count += 1
+        elif _is_consonant(char):
+            j = i + 1
+            if j < length and word[j] == _NUKTA:
+                j += 1
+            following = word[j] if j < length else ""
+            if following == _VIRAMA:
+                continue
+            if following:
+                count += 1
+            # A bare word-final consonant drops its inherent vowel
+    return max(1, count)
+
+
+def _latin_syllables(word: str) -> int:
+    """Rough English/Hinglish syllable count from vowel groups"""
+    word = word.lower()
+    if word.isdigit():
+        return 2 * len(word)
+    count = len(_LATIN_VOWEL_GROUP_RE.findall(word))
+    if count > 1 and word.endswith("e") and not word.endswith(("le", "ee")):
+        count -= 1  # silent trailing e
+    return max(1, count)
+
+
+def estimate_duration(text: str) -> float:
+    """
+    Estimate how many seconds a dialogue takes to speak
+
+    Args:
+        text: Dialogue in Devanagari, Roman-script Hinglish, English or a mix
+
+    Returns:
+        Estimated duration in seconds (speech plus comma/sentence pauses)
+    """
+    if not text:
+        return 0.0
+
+    seconds = 0.0
+    for word in _WORD_RE.findall(text):
+        if _DEVANAGARI_RE.search(word):
+            seconds += _devanagari_syllables(word) / DEVANAGARI_SYLLABLES_PER_SECOND
+        else:
+            seconds += _latin_syllables(word) / LATIN_SYLLABLES_PER_SECOND
+
+    # Pauses inside the dialogue (the final full stop does not add time)
+    body = text.rstrip(" .!?।\n")
+    seconds += body.count(",") * COMMA_PAUSE_SECONDS
+    seconds += len(_SENTENCE_END_RE.findall(body)) * SENTENCE_PAUSE_SECONDS
+    return round(seconds, 2)
+
+
+def pacing_status(seconds: float) -> str:
+    """Classify an estimated duration as "short", "ok" or "long" for an 8-second scene"""
+    if seconds > MAX_SECONDS:
+        return "long"
+    if seconds < MIN_SECONDS:
+        return "short"
+    return "ok"
+
+
+def split_clauses(text: str) -> List[str]:
+    """Split dialogue after commas, semicolons and sentence endings (। . ! ?)"""
+    return [clause.strip() for clause in _CLAUSE_RE.findall(text) if clause.strip()]
+
+
+def _split_units(text: str, num_scenes: int) -> List[str]:
+    """
+    Sentences, refined to clauses and then words until there are enough units
+
+    Beyond MAX_SPLIT_UNITS, consecutive sentences are joined into equal-sized
+    runs (still cut only at sentence ends).
+    """
+    units = [u.strip() for u in _SENTENCE_RE.findall(text) if u.strip()]
+    if len(units) < num_scenes * 2:
+        units = [clause for unit in units for clause in split_clauses(unit)]
+    if len(units) < num_scenes:
+        units = text.split()
+    limit = max(MAX_SPLIT_UNITS, num_scenes)
+    if len(units) > limit:
+        size = -(-len(units) // limit)
+        units = [" ".join(units[i:i + size]) for i in range(0, len(units), size)]
+    return units
+
+
+def split_into_scenes(text: str, num_scenes: int) -> List[str]:
+    """
+    Split user-written dialogue into pacing-balanced scene chunks
+
+    Cuts only at sentence (। . ! ?) or clause (, ;) boundaries - falling back
+    to word boundaries for very short text - and picks the contiguous
+    partition whose per-scene spoken durations are closest to equal.
+    Deterministic, but the partition is O(num_scenes x units²) CPU work
+    (units capped at MAX_SPLIT_UNITS): a few milliseconds for a typical
+    dialogue, up to ~50ms for long texts split into many scenes. Call it
+    via asyncio.to_thread from request handlers.
+
+    Args:
+        text: The user's dialogue text
+        num_scenes: Number of scenes to produce
+
+    Returns:
+        List of exactly num_scenes dialogue chunks (trailing chunks may be
+        empty when the text has fewer words than scenes)
+    """
+    text = " ".join(text.split())
+    if num_scenes <= 1 or not text:
+        return [text] + [""] * max(0, num_scenes - 1)
+
+    units = _split_units(text, num_scenes)
+    n = len(units)
+    if n <= num_scenes:
+        return units + [""] * (num_scenes - n)
+
+    durations = [estimate_duration(unit) for unit in units]
+    prefix = [0.0]
+    for seconds in durations:
+        prefix.append(prefix[-1] + seconds)
+    share = prefix[-1] / num_scenes
+
+    # cost[k][j]: best cost of splitting units[:j] into k chunks (squared deviation from equal share)
+    inf = float("inf")
+    cost = [[inf] * (n + 1) for _ in range(num_scenes + 1)]
+    cut = [[0] * (n + 1) for _ in range(num_scenes + 1)]
+    cost[0][0] = 0.0
+    for k in range(1, num_scenes + 1):
+        for j in range(k, n - (num_scenes - k) + 1):
+            for i in range(k - 1, j):
+                if cost[k - 1][i] == inf:
+                    continue
+                candidate = cost[k - 1][i] + (prefix[j] - prefix[i] - share) ** 2
+                if candidate < cost[k][j]:
+                    cost[k][j] = candidate
+                    cut[k][j] = i
+
+    bounds = []
+    j = n
+    for k in range(num_scenes, 0, -1):
+        i = cut[k][j]
+        bounds.append((i, j))
+        j = i
+    return [" ".join(units[i:j]) for i, j in reversed(bounds)]
+
+
+def add_pauses(text: str, words_per_pause: int = 5) -> str:
+    """
+    Insert commas into long unpunctuated runs so the dialogue fills 8 seconds
+
+    Only runs longer than words_per_pause + 1 words are touched, and a
+    chunk already estimated at or above the target is returned unchanged.
+    """
+    if estimate_duration(text) >= TARGET_SECONDS:
+        return text
+
+    result = []
+    run = 0
+    words = text.split()
+    for index, word in enumerate(words):
+        result.append(word)
+        run += 1
+        if word[-1] in ",;।.!?":
+            run = 0
+        elif run >= words_per_pause and len(words) - index - 1 > 1:
+            result[-1] = word + ","
+            run = 0
+    return " ".join(result)
+
+
+def _penalty(seconds: float) -> float:
+    # Running long is worse than running short: long dialogue gets cut off
+    return max(0.0, seconds - MAX_SECONDS) * 3 + max(0.0, MIN_SECONDS - seconds)
+
+
+def rebalance_dialogues(dialogues: List[str]) -> List[str]:
+    """
+    Deterministically move clauses between adjacent scenes to fit 8-second pacing
+
+    A clause is moved across a scene boundary only when it lowers the combined
+    pacing penalty of the two scenes, and every scene keeps at least one clause,
+    so scene count and dialogue order never change.
+
+    Args:
+        dialogues: Dialogue text per scene, in scene order
+
+    Returns:
+        Rebalanced dialogue text per scene
+    """
+    clauses = [split_clauses(dialogue) for dialogue in dialogues]
+    if len(clauses) < 2 or any(not parts for parts in clauses):
+        return list(dialogues)
+
+    def duration(parts: List[str]) -> float:
+        return estimate_duration(" ".join(parts))
+
+    # Every accepted move strictly lowers the total penalty, so this terminates;
+    # the bound just keeps worst-case work predictable.
+    for _ in range(4 * len(clauses)):
+        changed = False
+        for i in range(len(clauses) - 1):
+            left, right = clauses[i], clauses[i + 1]
+            current = _penalty(duration(left)) + _penalty(duration(right))
+
+            candidates = []
+            if len(left) > 1:  # push last clause of left into right
+                candidates.append((left[:-1], [left[-1]] + right))
+            if len(right) > 1:  # pull first clause of right into left
+                candidates.append((left + [right[0]], right[1:]))
+
+            for new_left, new_right in candidates:
+                if _penalty(duration(new_left)) + _penalty(duration(new_right)) < current - 0.01:
+                    clauses[i], clauses[i + 1] = new_left, new_right
+                    changed = True
+                    break
+        if not changed:
+            break
+
+    return [" ".join(parts) for parts in clauses]
+
+
+def score_scenes(scenes: List[Dict]) -> Dict:
+    """
+    Annotate parsed scenes with estimated duration and pacing status
+
+    Adds "estimated_duration" and "pacing" ("short" | "ok" | "long") to every
+    scene dict in place.
+
+    Returns:
+        Summary with total estimated duration and the scene numbers off target
+    """
+    summary = {"total_estimated_duration": 0.0, "scenes_long": [], "scenes_short": []}
+    for scene in scenes:
+        seconds = estimate_duration(scene.get("dialogue", ""))
+        status = pacing_status(seconds)
+        scene["estimated_duration"] = seconds
+        scene["pacing"] = status
+        summary["total_estimated_duration"] += seconds
+        if status == "long":
+            summary["scenes_long"].append(scene["scene_number"])
+        elif status == "short":
+            summary["scenes_short"].append(scene["scene_number"])
+    summary["total_estimated_duration"] = round(summary["total_estimated_duration"], 2)
+    return summary
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query, Request, status
+from typing import List, Optional
 from app.character.models import (
     CharacterSceneRequest,
     CharacterDialogueResponse,
@@ -8,16 +8,41 @@ from app.character.models import (
     CharacterSceneDB
 )
 from app.character.service import character_dialogue_generator
+from app.character import warm_cache
+from app.idempotency import idempotent
+from app.admission import admission
+from app.rate_limit import enforce_rate_limit
+from app.lifecycle import task_registry
+from app.prompts.fragments import save_fragments, templatize, render_scenes, delete_project_fragments
+from app.prompts.store import prompt_store
+from app.services.usage import track_usage, usage_increments
+from app.projects.summary import index_fields, index_project, update_project_index, unindex_project, CHARACTER_SOURCE
+from app.scenes.generations import character_scene_versions, SceneSetConflict, SceneVersionNotFound
 from app.auth.dependencies import get_current_user
 from app.database import db
+from app.http_cache import ETAG_PROJECTION, project_etag, if_none_match, not_modified, etag_headers
+from app.responses import FastJSONResponse
+from app.scenes.export import export_response
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 
 router = APIRouter()
 
+# Fields returned by the project list, including the summary written with the scenes
+CHARACTER_LIST_PROJECTION = {
+    field: 1 for field in (
+        "project_name", "project_type", "character_name", "content_type", "topic_mode", "language",
+        "languages", "total_duration", "created_at", "last_updated",
+        "total_scenes", "scenes_duration", "estimated_speech_seconds", "last_model", "token_usage"
+    )
+}
+
 @router.post("/generate-character-dialogue")
 async def generate_character_dialogue(
     request: CharacterSceneRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -28,93 +53,69 @@ async def generate_character_dialogue(
     2. Uses Gemini AI to generate educational dialogue
     3. Breaks it into 8-second scenes automatically
     4. Returns all scenes with complete Veo prompts
+    
+    Send an Idempotency-Key header to make retries safe: a retry gets the
+    first request's response (and project) instead of generating again.
+    Under load the request may be rejected with 503 (or 429 per user) and a
+    Retry-After header.
     """
-    try:
-        # Generate dialogue using Gemini
-        result = await character_dialogue_generator.generate_character_dialogue(
-            character_name=request.character_name,
-            content_type=getattr(request, 'content_type', 'food'),  # food or educational
-            voice_tone=request.voice_tone,
-            custom_voice_description=getattr(request, 'custom_voice_description', None),
-            topic_mode=request.topic_mode or "",  # For food: benefits, side_effects (empty for educational)
-            scenario=request.scenario or "",  # For educational: teaching topic with optional outfit
-            visual_style=request.visual_style,
-            language=request.language,
-            total_duration=request.total_duration,
-            custom_dialogues=getattr(request, 'custom_dialogues', None)  # NEW: Custom dialogues
+    async def generate():
+        # Popular food combinations may already be pre-generated (see warm_cache);
+        # serving one makes no LLM call, so it needs no slot and no generation quota
+        languages = list(dict.fromkeys(request.languages or [request.language]))
+        warm_params = warm_cache.params_for(request, languages)
+        if warm_params:
+            await warm_cache.record(warm_params)
+            warm_result = None if request.fresh else await warm_cache.get(warm_params)
+            if warm_result is not None:
+                return await _generate_character_dialogue(request, background_tasks, current_user, warm_result)
+
+        # Charged only here: Idempotency-Key replays do not count against the limit
+        await enforce_rate_limit(http_request, current_user.id, "generation")
+        return await admission.run(
+            current_user.id, lambda: _generate_character_dialogue(request, background_tasks, current_user)
         )
+
+    return await idempotent(
+        http_request, current_user.id, "generate_character_dialogue", request.model_dump(), generate
+    )
+
+async def _generate_character_dialogue(
+    request: CharacterSceneRequest,
+    background_tasks: BackgroundTasks,
+    current_user,
+    result: Optional[dict] = None
+):
+    """Generate (or take the pre-generated `result`) and save it as a new scene version"""
+    try:
+        # Several languages: one scene plan, dialogue rendered per language
+        languages = list(dict.fromkeys(request.languages or [request.language]))
+        primary_language = languages[0]
         
-        # Always save to database (create new project if project_id not provided)
-        try:
-            # Generate new project_id if not provided
-            project_id = request.project_id
-            user_id = str(current_user.id)
-            if not project_id:
-                # Create new project
-                project_doc = {
-                    "user_id": user_id,
-                    "project_name": f"{request.character_name} - {request.topic_mode}",
-                    "character_name": request.character_name,
-                    "content_type": getattr(request, 'content_type', 'food'),  # Store content type
-                    "voice_tone": request.voice_tone,
-                    "topic_mode": request.topic_mode,
-                    "scenario": request.scenario,
-                    "visual_style": request.visual_style,
-                    "language": request.language,
-                    "total_duration": request.total_duration,
-                    "created_at": datetime.utcnow(),
-                    "last_updated": datetime.utcnow()
-                }
-                insert_result = await db.character_projects.insert_one(project_doc)
-                project_id = str(insert_result.inserted_id)
-            else:
-                # Update existing project
-                project_data = CharacterProjectDB(
-                    user_id=user_id,
-                    project_name=f"{request.character_name} - {request.topic_mode}",
+        # Generate dialogue using Gemini
+        with track_usage() as usage:
+            if result is None:
+                result = await character_dialogue_generator.generate_character_dialogue(
                     character_name=request.character_name,
+                    content_type=getattr(request, 'content_type', 'food'),  # food or educational
                     voice_tone=request.voice_tone,
-                    topic_mode=request.topic_mode,
-                    scenario=request.scenario,
+                    custom_voice_description=getattr(request, 'custom_voice_description', None),
+                    topic_mode=request.topic_mode or "",  # For food: benefits, side_effects (empty for educational)
+                    scenario=request.scenario or "",  # For educational: teaching topic with optional outfit
                     visual_style=request.visual_style,
-                    language=request.language,
+                    language=primary_language,
                     total_duration=request.total_duration,
-                    last_updated=datetime.utcnow()
-                )
-                
-                await db.character_projects.update_one(
-                    {"_id": ObjectId(project_id)},
-                    {"$set": project_data.dict()},
-                    upsert=True
-                )
-            
-            # Save individual scenes
-            for scene_data in result["scenes"]:
-                scene_db = CharacterSceneDB(
-                    project_id=project_id,
-                    user_id=user_id,
-                    scene_number=scene_data["scene_number"],
-                    dialogue=scene_data["dialogue"],
-                    emotion=scene_data["emotion"],
-                    teaching_point=scene_data["teaching_point"],
-                    generated_prompt=scene_data["prompt"],
-                    updated_at=datetime.utcnow()
-                )
-                
-                # Upsert scene
-                await db.character_scenes.update_one(
-                    {
-                        "project_id": project_id,
-                        "scene_number": scene_data["scene_number"]
-                    },
-                    {"$set": scene_db.dict()},
-                    upsert=True
+                    custom_dialogues=getattr(request, 'custom_dialogues', None),  # NEW: Custom dialogues
+                    generate_visuals=request.generate_visuals,
+                    languages=languages
                 )
-            
-            # Add project_id to response
-            result["project_id"] = project_id
-            result["message"] = "Scenes generated and saved successfully"
-            
+        
+        # Always save to database (create new project if project_id not provided);
+        # a shutdown never cuts the write short (see app.lifecycle)
+        try:
+            await task_registry.persist(_save_character_generation(
+                request, result, usage, primary_language, background_tasks, current_user
+            ))
         except Exception as db_error:
                 print(f"Database save error: {str(db_error)}")
                 # Continue even if DB save fails
@@ -131,22 +132,139 @@ async def generate_character_dialogue(
             detail=f"Failed to generate character dialogue: {str(e)}"
         )
 
+async def _save_character_generation(
+    request: CharacterSceneRequest,
+    result: dict,
+    usage: dict,
+    primary_language: str,
+    background_tasks: BackgroundTasks,
+    current_user
+):
+    """Save a generation as a new scene version (adds project_id and generation to result)"""
+    # Generate new project_id if not provided
+    project_id = request.project_id
+    user_id = str(current_user.id)
+    if not project_id:
+        # Create new project
+        project_doc = {
+            "user_id": user_id,
+            "project_name": f"{request.character_name} - {request.topic_mode}",
+            "character_name": request.character_name,
+            "content_type": getattr(request, 'content_type', 'food'),  # Store content type
+            "voice_tone": request.voice_tone,
+            "topic_mode": request.topic_mode,
+            "scenario": request.scenario,
+            "visual_style": request.visual_style,
+            "language": primary_language,
+            "languages": result["languages"],
+            "total_duration": request.total_duration,
+            "created_at": datetime.utcnow(),
+            "last_updated": datetime.utcnow()
+        }
+        insert_result = await db.character_projects.insert_one(project_doc)
+        project_id = str(insert_result.inserted_id)
+        project = project_doc
+        index_data = index_fields(CHARACTER_SOURCE, project_doc)
+    else:
+        # Update existing project
+        project_data = CharacterProjectDB(
+            user_id=user_id,
+            project_name=f"{request.character_name} - {request.topic_mode}",
+            character_name=request.character_name,
+            voice_tone=request.voice_tone,
+            topic_mode=request.topic_mode,
+            scenario=request.scenario,
+            visual_style=request.visual_style,
+            language=primary_language,
+            languages=result["languages"],
+            total_duration=request.total_duration,
+            last_updated=datetime.utcnow()
+        )
+
+        project = await db.character_projects.find_one_and_update(
+            {"_id": ObjectId(project_id)},
+            {"$set": project_data.dict()},
+            projection={"active_generation": 1, "scene_versions": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        index_data = index_fields(CHARACTER_SOURCE, project_data.dict(exclude={"created_at"}))
+
+    # Shared fragments are stored once; scenes keep only a template
+    fragments = result.get("fragments", {})
+    fragment_ids = await save_fragments(project_id, fragments)
+
+    # Save individual scenes; every language variant belongs to the same version
+    scene_sets = [(primary_language, result["scenes"])] + [
+        (language, variant["scenes"]) for language, variant in result.get("variants", {}).items()
+    ]
+    scene_docs = []
+    for language, scenes in scene_sets:
+        for scene_data in scenes:
+            scene_db = CharacterSceneDB(
+                project_id=project_id,
+                user_id=user_id,
+                scene_number=scene_data["scene_number"],
+                dialogue=scene_data["dialogue"],
+                emotion=scene_data["emotion"],
+                teaching_point=scene_data["teaching_point"],
+                language=language,
+                prompt_template=templatize(scene_data["prompt"], fragments, fragment_ids),
+                updated_at=datetime.utcnow()
+            )
+            scene_docs.append(scene_db.dict())
+
+    # New version of the project's scenes; unchanged scenes are shared with
+    # earlier versions and prompt text goes to the deduplicated blob store.
+    # The summary describes the primary language. scenes_duration is clip
+    # seconds like every other project type; the pacing estimate of the
+    # spoken dialogue is kept separately.
+    summary = {
+        "total_scenes": len(result["scenes"]),
+        "scenes_duration": sum(scene_doc["duration"] for scene_doc in scene_docs[:len(result["scenes"])]),
+        "last_model": usage["model"] or (result.get("warm") or {}).get("model")
+    }
+    speech_seconds = (result.get("pacing") or {}).get("total_estimated_duration")
+    if speech_seconds is not None:
+        summary["estimated_speech_seconds"] = speech_seconds
+    version = await character_scene_versions.replace(
+        project, scene_docs, source="generate", prompt_field="prompt_template",
+        summary=summary, project_inc=usage_increments(usage)
+    )
+    await update_project_index(
+        CHARACTER_SOURCE, project["_id"], {**index_data, **index_fields(CHARACTER_SOURCE, summary)},
+        inc=usage_increments(usage), upsert=True
+    )
+    background_tasks.add_task(character_scene_versions.collect, project["_id"], version["dropped"])
+    result["generation"] = str(version["generation"])
+
+    # Add project_id to response
+    result["project_id"] = project_id
+    result["message"] = "Scenes generated and saved successfully"
+
 @router.get("/projects/{project_id}/scenes")
 async def get_character_project_scenes(
     project_id: str,
+    request: Request,
+    language: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all scenes for a character project"""
+    """
+    Get all scenes for a character project (supports If-None-Match)
+    
+    Multilingual projects return one language variant: `language`, or the
+    project's primary language by default.
+    """
     try:
         # Convert current_user to dict for easier access
         user_id = str(current_user.id)
         print(f"🔍 Loading project: {project_id} for user: {user_id}")
         
         # Verify project belongs to user
-        project = await db.character_projects.find_one({
-            "_id": ObjectId(project_id),
-            "user_id": user_id
-        })
+        project = await db.character_projects.find_one(
+            {"_id": ObjectId(project_id), "user_id": user_id},
+            {**ETAG_PROJECTION, "project_name": 1, "character_name": 1, "total_duration": 1, "language": 1, "languages": 1}
+        )
         
         print(f"📦 Project found: {project is not None}")
         
@@ -157,29 +275,43 @@ async def get_character_project_scenes(
                 detail="Project not found"
             )
         
-        # Get all scenes
-        scenes = await db.character_scenes.find({
-            "project_id": project_id
-        }).sort("scene_number", 1).to_list(100)
+        # Scenes are immutable per generation: unchanged projects skip loading them
+        primary_language = project.get("language")
+        language = language or primary_language
+        etag = project_etag(project, f"character_scenes:{language}")
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        
+        # Get all scenes of the language; scenes saved before variants have none
+        scene_filter = character_scene_versions.active_filter(project)
+        scene_filter["language"] = {"$in": [language, None]} if language == primary_language else language
+        scenes = await db.character_scenes.find(
+            scene_filter,
+            {"generations": 0, "content_hash": 0}
+        ).sort("scene_number", 1).to_list(None)
         
         print(f"🎬 Found {len(scenes)} scenes")
         
-        # Convert ObjectId to string
-        for scene in scenes:
-            scene["_id"] = str(scene["_id"])
+        # Assemble full prompts from the blob store and the project's fragment library
+        await prompt_store.unpack(scenes, "prompt_template")
+        await prompt_store.unpack(scenes, "generated_prompt")  # Scenes saved before fragment templates
+        scenes = await render_scenes(scenes)
         
         result = {
             "project": {
-                "_id": str(project["_id"]),
+                "_id": project["_id"],
                 "project_name": project.get("project_name", "Untitled"),
                 "character_name": project.get("character_name", ""),
-                "total_duration": project.get("total_duration", 0)
+                "total_duration": project.get("total_duration", 0),
+                "language": language,
+                "languages": project.get("languages") or [lang for lang in [primary_language] if lang]
             },
             "scenes": scenes
         }
         
         print(f"✅ Returning {len(scenes)} scenes for project")
-        return result
+        # Raw documents straight to JSON (ObjectIds/datetimes handled by the encoder)
+        return FastJSONResponse(result, headers=etag_headers(etag))
         
     except HTTPException as e:
         raise e
@@ -205,7 +337,9 @@ async def create_character_project(
             **project_data
         )
         
-        result = await db.character_projects.insert_one(project.dict())
+        project_doc = project.dict()
+        result = await db.character_projects.insert_one(project_doc)
+        await index_project(CHARACTER_SOURCE, project_doc)
         
         return {
             "project_id": str(result.inserted_id),
@@ -227,21 +361,16 @@ async def get_user_character_projects(
         user_id = str(current_user.id)
         print(f"🔍 Fetching projects for user: {user_id}")
         
-        projects = await db.character_projects.find({
-            "user_id": user_id
-        }).sort("last_updated", -1).to_list(100)
+        projects = await db.character_projects.find(
+            {"user_id": user_id},
+            CHARACTER_LIST_PROJECTION
+        ).sort("last_updated", -1).to_list(100)
         
         print(f"📦 Found {len(projects)} character projects")
         for p in projects:
             print(f"  - {p.get('project_name')} (ID: {p.get('_id')})")
         
-        # Convert ObjectId to string
-        for project in projects:
-            project["_id"] = str(project["_id"])
-            project["created_at"] = project["created_at"].isoformat()
-            project["last_updated"] = project["last_updated"].isoformat()
-        
-        return {"projects": projects}
+        return FastJSONResponse({"projects": projects})
         
     except Exception as e:
         raise HTTPException(
@@ -282,10 +411,14 @@ async def delete_character_project(
         
         # Delete all scenes for this project
         # Note: project_id in scenes is stored as string in character_scenes (based on line 94)
+        prompt_blocks = await prompt_store.referenced_blocks("character_scenes", {"project_id": project_id})
         await db.character_scenes.delete_many({"project_id": project_id})
+        await prompt_store.release(prompt_blocks)  # Blocks no other scene uses
+        await delete_project_fragments(project_id)
         
         # Delete the project
         await db.character_projects.delete_one({"_id": ObjectId(project_id)})
+        await unindex_project(CHARACTER_SOURCE, project_id)
         
         return None
     except HTTPException:
@@ -301,3 +434,102 @@ async def delete_character_project(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete project: {str(e)}"
         )
+
+@router.get("/projects/{project_id}/export")
+async def export_character_project(
+    project_id: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|txt|zip)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Download the project's scenes as NDJSON, a plain-text prompt sheet, or a ZIP (streamed)"""
+    project = await db.character_projects.find_one(
+        {"_id": ObjectId(project_id), "user_id": str(current_user.id)},
+        {"scene_versions": 0}
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    return export_response(
+        character_scene_versions, project, "character", export_format,
+        prompt_fields=["prompt_template", "generated_prompt"],
+        header_fields=[
+            "project_name", "character_name", "content_type", "voice_tone", "topic_mode", "scenario",
+            "visual_style", "language", "languages", "total_duration", "total_scenes", "created_at", "last_updated"
+        ]
+    )
+
+async def _get_owned_character_project(project_id: str, current_user) -> dict:
+    project = await db.character_projects.find_one({
+        "_id": ObjectId(project_id),
+        "user_id": str(current_user.id)
+    })
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    return project
+
+@router.get("/projects/{project_id}/versions")
+async def get_character_scene_versions(
+    project_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """List the retained scene versions of a character project, newest first"""
+    project = await _get_owned_character_project(project_id, current_user)
+    return {
+        "project_id": project_id,
+        "active_generation": str(project["active_generation"]) if project.get("active_generation") else None,
+        "versions": character_scene_versions.list_versions(project)
+    }
+
+@router.get("/projects/{project_id}/versions/diff")
+async def diff_character_scene_versions(
+    project_id: str,
+    base: str,
+    target: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Compare two scene versions of a character project"""
+    project = await _get_owned_character_project(project_id, current_user)
+    try:
+        return await character_scene_versions.diff(project, base, target)
+    except SceneVersionNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+@router.post("/projects/{project_id}/versions/{generation}/rollback")
+async def rollback_character_scene_version(
+    project_id: str,
+    generation: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Make a previous scene version active again instead of regenerating"""
+    project = await _get_owned_character_project(project_id, current_user)
+    try:
+        entry = await character_scene_versions.rollback(project, generation)
+    except SceneVersionNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except SceneSetConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    await update_project_index(
+        CHARACTER_SOURCE, project["_id"],
+        {**index_fields(CHARACTER_SOURCE, entry.get("summary", {})), "last_updated": datetime.utcnow()}
+    )
+    
+    return {
+        "success": True,
+        "project_id": project_id,
+        "active_generation": generation,
+        "total_scenes": entry["scene_count"]
+    }
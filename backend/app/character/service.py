@@ -1,7 +1,8 @@
 # app/character/service.py - DISPATCHER SERVICE
 # Routes to food or educational character services
 
-from typing import Dict
+import asyncio
+from typing import Dict, List, Optional
 
 # ========================================
 # SHARED VOICE DESCRIPTIONS WITH MASTER PROMPTS
@@ -143,10 +144,16 @@ class CharacterDialogueGenerator:
         visual_style: str = "Realistic Character",
         language: str = "hindi",
         total_duration: int = 8,
-        custom_dialogues: str = None  # NEW: Custom dialogues for food
+        custom_dialogues: str = None,  # NEW: Custom dialogues for food
+        generate_visuals: bool = True,
+        languages: Optional[List[str]] = None
     ) -> Dict:
         """
         Dispatcher: Routes to food or educational character service
+        
+        With extra `languages`, the scenes are planned once in `language` and
+        only the dialogue is rendered for the others (concurrently); those
+        are returned under "variants", keyed by language.
         """
         print(f"\n{'='*60}")
         print(f"🎯 DISPATCHER: Routing to {content_type} service")
@@ -156,9 +163,12 @@ class CharacterDialogueGenerator:
         from app.character.food_character_service import food_character_generator
         from app.character.educational_character_service import educational_character_generator
         
+        extra_languages = [lang for lang in dict.fromkeys(languages or []) if lang != language]
+        
         # Route based on content type
         if content_type == "food":
-            return await food_character_generator.generate_dialogue(
+            generator = food_character_generator
+            result = await food_character_generator.generate_dialogue(
                 character_name=character_name,
                 voice_tone=voice_tone,
                 topic_mode=topic_mode,
@@ -166,10 +176,12 @@ class CharacterDialogueGenerator:
                 visual_style=visual_style,
                 language=language,
                 total_duration=total_duration,
-                custom_dialogues=custom_dialogues  # NEW: Pass custom dialogues
+                custom_dialogues=custom_dialogues,  # NEW: Pass custom dialogues
+                generate_visuals=generate_visuals
             )
         else:  # educational
-            return await educational_character_generator.generate_dialogue(
+            generator = educational_character_generator
+            result = await educational_character_generator.generate_dialogue(
                 character_name=character_name,
                 voice_tone=voice_tone,
                 custom_voice_description=custom_voice_description,  # NEW: Pass custom voice
@@ -178,6 +190,14 @@ class CharacterDialogueGenerator:
                 language=language,
                 total_duration=total_duration
             )
+        
+        plan = result.pop("plan", None)
+        if extra_languages and plan and plan["scenes"]:
+            print(f"🌐 Rendering {len(plan['scenes'])} planned scenes in: {', '.join(extra_languages)}")
+            variants = await asyncio.gather(*(generator.render_language(plan, lang) for lang in extra_languages))
+            result["variants"] = {variant["language"]: variant for variant in variants}
+        result["languages"] = [language, *result.get("variants", {})]
+        return result
 
 
 # Create singleton instance
@@ -0,0 +1,140 @@
+# app/character/voices.py
+# Voice profile registry shared by the food and educational services
+#
+# Built once, at import, from VOICE_DESCRIPTIONS: every voice gets its anchor
+# block, master prompt and the audio signature for each topic mode
+# precomputed, so requests only do dictionary lookups. Voice names that are
+# not registry keys ("Female", "deep male voice", "femal_soft") are resolved
+# through a token index over the voice keys and descriptions; resolutions and
+# custom voice prompts are cached.
+
+import re
+from difflib import get_close_matches
+from functools import lru_cache
+from typing import Dict, List
+
+from app.character.service import VOICE_DESCRIPTIONS
+
+# Voice used when nothing in the name matches
+DEFAULT_VOICE = "adult_male"
+
+# Preferred voice when several match equally well (e.g. plain "female")
+_PREFERRED = ["female_friendly", "male_friendly", "child_happy", DEFAULT_VOICE]
+
+# Free-form words mapped onto index vocabulary
+_SYNONYMS = {
+    "woman": "female", "women": "female", "lady": "female", "girl": "female",
+    "man": "male", "men": "male", "guy": "male", "boy": "male",
+    "kid": "child", "kids": "child", "young": "youthful"
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+TOPIC_MODES = ("benefits", "side_effects")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _audio_signature(voice_key: str, topic_mode: str) -> str:
+    """Consistent audio signature for all scenes of a voice and topic"""
+    # Base voice characteristics
+    if "child" in voice_key:
+        base_voice = "bright, youthful voice with playful energy"
+        pitch = "higher pitch range"
+    elif "female" in voice_key:
+        base_voice = "clear, warm female voice"
+        pitch = "medium-high pitch"
+    else:
+        base_voice = "confident, steady male voice"
+        pitch = "medium pitch"
+
+    # Emotional tone based on topic
+    if topic_mode == "side_effects":
+        emotion = "concerned, cautionary tone with gentle warning"
+        pace = "measured, 95 BPM speaking pace"
+    else:
+        emotion = "enthusiastic, friendly tone with encouraging inflection"
+        pace = "upbeat, 105 BPM speaking pace"
+
+    return f"{base_voice}, {pitch}, {emotion}, {pace}, natural pauses at commas"
+
+
+class VoiceRegistry:
+    """
+    Precomputed voice profiles with fuzzy name resolution
+
+    A profile is a dict: {"key", "description", "anchor_block", "master_prompt",
+    "audio_signatures": {topic_mode: signature}}.
+    """
+
+    def __init__(self, descriptions: Dict[str, Dict]):
+        self.profiles: Dict[str, Dict] = {}
+        self._index: Dict[str, set] = {}
+
+        for key, info in descriptions.items():
+            anchor = info["anchor_block"]
+            self.profiles[key] = {
+                "key": key,
+                "description": info.get("description", ""),
+                "anchor_block": anchor,
+                "master_prompt": info.get("master_voice_prompt", anchor),
+                "audio_signatures": {mode: _audio_signature(key, mode) for mode in TOPIC_MODES}
+            }
+            for token in {*key.split("_"), *_tokens(info.get("description", ""))}:
+                self._index.setdefault(token, set()).add(key)
+
+        self._vocabulary = list(self._index)
+        self.resolve = lru_cache(maxsize=1024)(self._resolve)
+        self.custom_prompt = lru_cache(maxsize=1024)(self._custom_prompt)
+
+    def get(self, voice_name: str) -> Dict:
+        """Profile for a voice name, resolving unknown names (see resolve())"""
+        return self.profiles[self.resolve(voice_name or "")]
+
+    def audio_signature(self, voice_name: str, topic_mode: str) -> str:
+        mode = "side_effects" if topic_mode == "side_effects" else "benefits"
+        return self.get(voice_name)["audio_signatures"][mode]
+
+    def _resolve(self, voice_name: str) -> str:
+        """
+        Registry key for a voice name
+
+        Exact keys resolve directly. Otherwise each word of the name (typos
+        corrected against the index vocabulary) votes for the voices it
+        appears in, weighted by how specific it is; ties go to _PREFERRED.
+        """
+        normalized = "_".join(_tokens(voice_name))
+        if normalized in self.profiles:
+            return normalized
+
+        scores: Dict[str, float] = {}
+        for token in _tokens(voice_name):
+            token = _SYNONYMS.get(token, token)
+            if token not in self._index:
+                close = get_close_matches(token, self._vocabulary, n=1, cutoff=0.8)
+                if not close:
+                    continue
+                token = close[0]
+            postings = self._index[token]
+            for key in postings:
+                scores[key] = scores.get(key, 0) + 1 / len(postings)
+
+        if not scores:
+            resolved = DEFAULT_VOICE
+        else:
+            resolved = max(
+                scores,
+                key=lambda key: (scores[key], -_PREFERRED.index(key) if key in _PREFERRED else -len(_PREFERRED))
+            )
+        print(f"⚠️ Voice '{voice_name}' not found, using '{resolved}'")
+        return resolved
+
+    def _custom_prompt(self, custom_description: str) -> str:
+        """Voice prompt for a user's own description, in the style of the predefined ones"""
+        return f"{custom_description.strip()}. Clean audio, professional recording quality."
+
+
+# Create singleton instance
+voice_registry = VoiceRegistry(VOICE_DESCRIPTIONS)
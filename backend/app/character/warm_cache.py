@@ -0,0 +1,235 @@
+# app/character/warm_cache.py
+# Pre-generated results for popular food character requests
+#
+# Most food-character traffic asks for the same few combinations (Apple /
+# benefits / 32s ...). Every eligible request bumps a popularity score for its
+# parameter tuple in `generation_stats`; during the off-peak window the warmer
+# generates the hottest combinations that have no fresh result yet and stores
+# them in `warm_results`. Matching requests are then answered from the cache
+# without an LLM call (and without a generation slot or generation quota) -
+# unless they ask for a fresh variant.
+#
+# Popularity decays with a half-life of WARM_POPULARITY_HALF_LIFE_HOURS, so
+# last month's favourites stop being pre-generated. It uses forward decay: a
+# request adds 2^(t / half-life) instead of 1, which keeps the update a plain
+# $inc and the ranking a plain indexed sort; dividing by the current weight
+# gives the decayed request count.
+#
+# Eligible: food content with generated dialogue and no scenario (custom
+# dialogues and scenarios are one-off by nature).
+
+import asyncio
+import copy
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.character.voices import voice_registry
+from app.config import settings
+from app.database import db
+from app.lifecycle import task_registry
+from app.services.usage import track_usage
+
+
+def params_for(request, languages: List[str]) -> Optional[Dict]:
+    """
+    Canonical generation parameters of a request, or None if it is not cacheable
+
+    Args:
+        request: CharacterSceneRequest
+        languages: Requested languages, primary first
+    """
+    if (request.content_type or "food") != "food":
+        return None
+    if (request.custom_dialogues or "").strip() or (request.scenario or "").strip():
+        return None
+    return {
+        "content_type": "food",
+        "character_name": request.character_name.strip().title(),
+        "voice_tone": voice_registry.resolve(request.voice_tone),
+        "topic_mode": request.topic_mode or "",
+        "visual_style": request.visual_style,
+        "languages": list(languages),
+        "total_duration": request.total_duration
+    }
+
+
+# Forward-decay origin; weights grow 2^(elapsed / half-life) from here
+_DECAY_EPOCH = datetime(2025, 1, 1)
+
+
+def _weight(now: datetime) -> float:
+    """Score one request adds at `now` (also the divisor turning scores into decayed counts)"""
+    half_lives = (now - _DECAY_EPOCH).total_seconds() / (settings.WARM_POPULARITY_HALF_LIFE_HOURS * 3600)
+    return 2.0 ** half_lives
+
+
+def _key(params: Dict) -> str:
+    encoded = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+
+
+async def record(params: Dict):
+    """Count one request for the parameter tuple (best effort)"""
+    now = datetime.utcnow()
+    try:
+        await db.generation_stats.update_one(
+            {"_id": _key(params)},
+            {
+                "$inc": {"count": 1, "score": _weight(now)},
+                "$set": {"last_requested": now},
+                "$setOnInsert": {"params": params}
+            },
+            upsert=True
+        )
+    except Exception as e:
+        print(f"⚠️ Generation stats update failed: {str(e)}")
+
+
+async def get(params: Dict) -> Optional[Dict]:
+    """
+    Cached result for the parameters, if one is fresh
+
+    Returns:
+        A copy of the generation result with a "warm" key
+        ({"generated_at", "model"}), or None
+    """
+    try:
+        entry = await db.warm_results.find_one({"_id": _key(params), "expires_at": {"$gt": datetime.utcnow()}})
+    except Exception as e:
+        print(f"⚠️ Warm cache read failed: {str(e)}")
+        return None
+    if entry is None:
+        return None
+    result = copy.deepcopy(entry["result"])
+    result["warm"] = {"generated_at": entry["created_at"], "model": entry.get("model")}
+    print(f"🔥 Serving pre-generated {params['character_name']} / {params['topic_mode']} ({params['total_duration']}s)")
+    return result
+
+
+async def warm(params: Dict) -> Dict:
+    """Generate and store a result for the parameters"""
+    from app.character.service import character_dialogue_generator
+
+    languages = params["languages"]
+    with track_usage() as usage:
+        result = await character_dialogue_generator.generate_character_dialogue(
+            character_name=params["character_name"],
+            content_type=params["content_type"],
+            voice_tone=params["voice_tone"],
+            topic_mode=params["topic_mode"],
+            visual_style=params["visual_style"],
+            language=languages[0],
+            total_duration=params["total_duration"],
+            languages=languages
+        )
+    now = datetime.utcnow()
+    await db.warm_results.replace_one(
+        {"_id": _key(params)},
+        {
+            "params": params,
+            "result": result,
+            "model": usage["model"],
+            "token_usage": {key: usage[key] for key in ("input_tokens", "output_tokens", "total_tokens")},
+            "created_at": now,
+            "expires_at": now + timedelta(hours=settings.WARM_CACHE_TTL_HOURS)
+        },
+        upsert=True
+    )
+    return result
+
+
+def in_off_peak(now: Optional[datetime] = None) -> bool:
+    """True inside [WARM_OFFPEAK_START_HOUR, WARM_OFFPEAK_END_HOUR) UTC (may wrap midnight)"""
+    hour = (now or datetime.utcnow()).hour
+    start, end = settings.WARM_OFFPEAK_START_HOUR, settings.WARM_OFFPEAK_END_HOUR
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+async def hottest(limit: int) -> List[Dict]:
+    """Parameter tuples with the highest decayed request count that have no fresh cached result"""
+    now = datetime.utcnow()
+    # Decayed count rounded to whole requests: WARM_MIN_REQUESTS requests made
+    # just now have already decayed a little
+    candidates = await db.generation_stats.find(
+        {"score": {"$gte": (settings.WARM_MIN_REQUESTS - 0.5) * _weight(now)}}
+    ).sort("score", -1).to_list(limit)
+    if not candidates:
+        return []
+
+    fresh = set()
+    async for entry in db.warm_results.find(
+        {"_id": {"$in": [candidate["_id"] for candidate in candidates]}, "expires_at": {"$gt": now}},
+        {"_id": 1}
+    ):
+        fresh.add(entry["_id"])
+    return [candidate["params"] for candidate in candidates if candidate["_id"] not in fresh]
+
+
+async def _claim(params: Dict) -> bool:
+    """
+    Lease a tuple for pre-generation, so only one worker generates it
+
+    The lease is kept after a failure too: the other workers would hit the
+    same error (usually the quota).
+    """
+    now = datetime.utcnow()
+    claimed = await db.generation_stats.find_one_and_update(
+        {
+            "_id": _key(params),
+            "$or": [{"warming_until": {"$exists": False}}, {"warming_until": {"$lt": now}}]
+        },
+        {"$set": {"warming_until": now + timedelta(seconds=settings.WARM_LEASE_SECONDS)}}
+    )
+    if claimed is None:
+        return False
+    # The candidate list may be older than another worker's finished result
+    fresh = await db.warm_results.find_one({"_id": _key(params), "expires_at": {"$gt": now}}, {"_id": 1})
+    return fresh is None
+
+
+async def warm_round() -> int:
+    """
+    Generate the hottest stale combinations, one at a time
+
+    Stops at the first quota error: the quota is what this is meant to spare.
+    Every worker runs a warmer; each tuple is leased (_claim) so it is
+    generated once, not once per worker.
+
+    Returns:
+        Number of results generated
+    """
+    generated = 0
+    for params in await hottest(settings.WARM_TOP_COMBINATIONS):
+        if not in_off_peak() or not task_registry.accepting:
+            break
+        if not await _claim(params):
+            continue  # Another worker is generating it
+        try:
+            # Registered like a request, so a shutdown lets it finish
+            async with task_registry.generation():
+                await warm(params)
+            generated += 1
+            print(f"🔥 Pre-generated {params['character_name']} / {params['topic_mode']} ({params['total_duration']}s)")
+        except Exception as e:
+            error = str(e).lower()
+            print(f"⚠️ Pre-generation failed for {params['character_name']}: {str(e)}")
+            if "429" in error or "resource_exhausted" in error:
+                break
+        await asyncio.sleep(settings.WARM_CALL_SPACING_SECONDS)
+    return generated
+
+
+async def run_warmer():
+    """Background loop: warm a round whenever the off-peak window is open"""
+    print(f"🔥 Warmer started (off-peak {settings.WARM_OFFPEAK_START_HOUR}:00-{settings.WARM_OFFPEAK_END_HOUR}:00 UTC)")
+    while True:
+        if in_off_peak():
+            try:
+                await warm_round()
+            except Exception as e:
+                print(f"⚠️ Warm round failed: {str(e)}")
+        await asyncio.sleep(settings.WARM_INTERVAL_SECONDS)
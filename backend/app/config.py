@@ -5,7 +5,9 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = "your-secret-key"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # Stateless (not revocable), so short; clients refresh
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30  # Each rotation issues a new token valid this long
+    REFRESH_REUSE_GRACE_SECONDS: int = 30  # Reuse this soon after rotation (concurrent tabs) does not revoke the session
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "veo_db"
     
@@ -15,6 +17,90 @@ class Settings(BaseSettings):
     # Hugging Face Inference API Configuration
     HUGGINGFACE_API_KEY: str = ""  # Get from: https://huggingface.co/settings/tokens
 
+    # Script breaking (map-reduce mode for long scripts)
+    SCRIPT_WINDOW_CHARS: int = 6000  # Scripts longer than this are broken window by window
+    SCRIPT_WINDOW_OVERLAP_CHARS: int = 600  # Trailing context carried into the next window
+    SCRIPT_MAX_CONCURRENT_WINDOWS: int = 4
+    SCRIPT_WINDOW_MAX_OUTPUT_TOKENS: int = 16384  # Per window call; windows shrink so their scenes fit in it
+    SCRIPT_OUTLINE_DIGEST_CHARS: int = 12000  # Script excerpt the shared outline is built from
+
+    # Character dialogue pacing (local duration estimator)
+    PACING_REBALANCE: bool = True  # Move clauses between adjacent scenes when off 8-second target
+
+    # Prompt storage (deduplicated blocks in prompt_blobs)
+    PROMPT_COMPRESS_MIN_BYTES: int = 512  # Smaller blocks are stored uncompressed
+    PROMPT_BLOB_GRACE_SECONDS: int = 300  # Blocks packed this recently are never reclaimed (insert may be pending)
+    PROMPT_BLOB_SWEEP_HOURS: int = 24  # Full sweep of unreferenced blocks; 0 disables
+
+    # Media storage (character images)
+    MEDIA_BACKEND: str = "gridfs"  # "gridfs" | "local"
+    MEDIA_LOCAL_ROOT: str = "media"  # Directory for the local backend
+    MEDIA_URL_PREFIX: str = "/media"
+    IMAGE_WORKERS: int = 2  # Processes decoding images / building thumbnails
+    IMAGE_MAX_BYTES: int = 10 * 1024 * 1024
+
+    # Scene version history
+    SCENE_VERSION_RETENTION: int = 10  # Versions kept per project; older ones are garbage-collected
+
+    # Bulk NDJSON import (app.projects.importer)
+    IMPORT_BATCH_SIZE: int = 500  # Documents per bulk write; progress is checkpointed per batch of projects
+    IMPORT_MAX_LINE_BYTES: int = 16 * 1024 * 1024  # Lines may carry base64 character images
+
+    # Pre-generation of popular food character requests (app.character.warm_cache)
+    WARM_CACHE_ENABLED: bool = True
+    WARM_CACHE_TTL_HOURS: int = 24  # Cached results are served until they expire
+    WARM_OFFPEAK_START_HOUR: int = 1  # UTC; the warmer only calls the LLM inside this window
+    WARM_OFFPEAK_END_HOUR: int = 6
+    WARM_TOP_COMBINATIONS: int = 20  # Hottest parameter tuples considered per round
+    WARM_MIN_REQUESTS: int = 3  # Tuples with a lower decayed request count are never pre-generated
+    WARM_POPULARITY_HALF_LIFE_HOURS: int = 72  # A request counts half as much after this long
+    WARM_INTERVAL_SECONDS: int = 900
+    WARM_CALL_SPACING_SECONDS: float = 5.0  # Pause between pre-generation calls
+    WARM_LEASE_SECONDS: int = 600  # A worker's claim on a tuple; others skip it meanwhile
+
+    # Idempotency-Key handling for generation endpoints (app.idempotency)
+    IDEMPOTENCY_TTL_HOURS: int = 24  # Completed responses are replayed for this long
+    IDEMPOTENCY_LEASE_SECONDS: int = 600  # An unfinished claim older than this is taken over
+    IDEMPOTENCY_WAIT_SECONDS: int = 300  # Max time a retry waits for the original request
+
+    # Admission control for generation endpoints (app.admission), per worker.
+    # The queue also sheds requests expected to wait over ADMISSION_MAX_QUEUE_SECONDS,
+    # so it only fills up to ~ MAX_QUEUE_SECONDS * MAX_CONCURRENT / (avg generation
+    # seconds, ~20); keep ADMISSION_MAX_QUEUE near that or it never applies.
+    ADMISSION_MAX_CONCURRENT: int = 8  # Generations calling Gemini at once
+    ADMISSION_MAX_QUEUE: int = 24  # Requests waiting for a slot; more are rejected with 503
+    ADMISSION_PER_USER: int = 2  # Generations one user may have running or queued
+    ADMISSION_MAX_QUEUE_SECONDS: float = 60.0  # Shed requests expected to (or that do) wait longer
+
+    # Graceful shutdown (app.lifecycle); keep the drain below the pod's termination grace period
+    SHUTDOWN_DRAIN_SECONDS: int = 25  # In-flight generations may finish for this long after SIGTERM
+    SHUTDOWN_PERSIST_SECONDS: int = 10  # Extra time for scene writes that already started
+    SHUTDOWN_RETRY_AFTER_SECONDS: int = 5  # Retry-After of generations rejected or interrupted by the drain
+
+    # Password hashing (app.auth.utils); changing scheme or cost re-hashes on next login
+    PASSWORD_SCHEME: str = "bcrypt"  # "bcrypt" | "argon2" (needs argon2-cffi)
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # ~100-250ms per hash; +1 doubles it
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_MEMORY_KB: int = 65536
+    PASSWORD_HASH_WORKERS: int = 4  # Threads hashing at once; keep at or below the worker's CPU cores
+
+    # Per-user rate limits (app.rate_limit), sliding window
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (single process) | "mongo" (shared by all workers)
+    RATE_LIMIT_API: int = 600  # Any authenticated project / character call
+    RATE_LIMIT_API_WINDOW_SECONDS: int = 60
+    RATE_LIMIT_GENERATION: int = 30  # LLM generations (break-script, character dialogue)
+    RATE_LIMIT_GENERATION_WINDOW_SECONDS: int = 3600
+
+    # Admin endpoints (/admin): comma-separated emails of users allowed to call them
+    ADMIN_EMAILS: str = ""
+
+    # Event-loop diagnostics (app.loop_monitor), reported at GET /admin/event-loop
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_MONITOR_INTERVAL_MS: int = 50  # Heartbeat period; lag = how late it wakes up
+    LOOP_BLOCK_THRESHOLD_MS: int = 100  # Stalls longer than this are stack-sampled and reported
+    LOOP_LAG_WINDOW: int = 2400  # Heartbeats kept for lag percentiles (~2 minutes)
+
     
     class Config:
         env_file = ".env"
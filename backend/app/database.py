@@ -6,3 +6,32 @@ db = client[settings.DATABASE_NAME]
 
 async def get_database():
     return db
+
+async def ensure_indexes():
+    """Create indexes needed by the application (idempotent)"""
+    await db.media_images.create_index("original_id")
+    if "phash_1" in await db.media_images.index_information():
+        await db.media_images.drop_index("phash_1")  # Perceptual hashes are no longer stored
+    for scenes in (db.scenes, db.character_scenes):
+        await scenes.create_index([("project_id", 1), ("generations", 1), ("scene_number", 1)])
+        await scenes.create_index([("project_id", 1), ("content_hash", 1)])
+    # Prompt block reclamation (app.prompts.store.release)
+    await db.scenes.create_index("generated_prompt_blocks", sparse=True)
+    await db.character_scenes.create_index("generated_prompt_blocks", sparse=True)
+    await db.character_scenes.create_index("prompt_template_blocks", sparse=True)
+    # Project lists (dashboard)
+    await db.projects.create_index([("user_id", 1), ("created_at", -1)])
+    await db.character_projects.create_index([("user_id", 1), ("last_updated", -1)])
+    await db.project_index.create_index([("user_id", 1), ("last_updated", -1), ("_id", -1)])
+    # Food character pre-generation
+    await db.generation_stats.create_index([("score", -1)])
+    if "count_-1" in await db.generation_stats.index_information():
+        await db.generation_stats.drop_index("count_-1")  # Ranked by decayed score now
+    await db.warm_results.create_index("expires_at", expireAfterSeconds=0)
+    await db.idempotency_keys.create_index("expires_at", expireAfterSeconds=0)
+    # Shared rate-limit counters (RATE_LIMIT_BACKEND=mongo)
+    await db.rate_limits.create_index("expires_at", expireAfterSeconds=0)
+    # Refresh token rotation
+    await db.refresh_tokens.create_index("expires_at", expireAfterSeconds=0)
+    await db.refresh_tokens.create_index("family")
+    await db.refresh_tokens.create_index("user_id")
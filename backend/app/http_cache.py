@@ -0,0 +1,73 @@
+# app/http_cache.py
+# Conditional GET helpers (ETag / If-None-Match)
+#
+# Project reads are tagged from fields every project write already updates:
+# `last_updated` and the `active_generation` of its scenes (scene sets are
+# immutable per generation). Writes that must not touch last_updated - the
+# migrations in app.migrations, which would otherwise reorder every dashboard -
+# $inc the project's `revision` instead (see bump_revision()). Routes read just
+# those fields with a projection, answer 304 when the client's copy is
+# current, and only otherwise load and serialize the full documents.
+
+import hashlib
+from typing import Dict
+
+from fastapi import Request, Response, status
+
+# Clients may keep a copy but must revalidate it on every use
+REVALIDATE = "private, no-cache"
+
+# Fields needed to compute a project ETag
+ETAG_PROJECTION = {"last_updated": 1, "active_generation": 1, "revision": 1}
+
+
+def bump_revision(update: Dict) -> Dict:
+    """Add the ETag revision bump to a project update document (in place)"""
+    update.setdefault("$inc", {})["revision"] = 1
+    return update
+
+
+def project_etag(project: Dict, view: str) -> str:
+    """
+    Strong ETag for one representation (`view`) of a project
+
+    Args:
+        project: Project document holding at least ETAG_PROJECTION fields
+        view: Name of the representation, so different endpoints never share tags
+    """
+    last_updated = project.get("last_updated")
+    version = "|".join([
+        view,
+        str(project["_id"]),
+        last_updated.isoformat() if last_updated else "",
+        str(project.get("active_generation") or ""),
+        str(project.get("revision") or 0)
+    ])
+    return f'"{hashlib.sha256(version.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match matches etag (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def etag_headers(etag: str, cache_control: str = REVALIDATE) -> Dict[str, str]:
+    """Headers for a 200 response built directly (e.g. FastJSONResponse)"""
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def set_etag(response: Response, etag: str, cache_control: str = REVALIDATE):
+    response.headers.update(etag_headers(etag, cache_control))
@@ -0,0 +1,195 @@
+# app/idempotency.py
+# Idempotency-Key support for expensive POST endpoints
+#
+# A client that retries a generation request after a timeout sends the same
+# `Idempotency-Key` header. The first request claims the key in the
+# `idempotency_keys` collection (unique _id) and runs; its response is stored
+# there and replayed to every retry. Retries that arrive while it is still
+# running wait for it instead of starting a second generation. Failed
+# requests release the key, so the next retry runs again.
+#
+# Keys are scoped per user and endpoint. Completed records expire after
+# IDEMPOTENCY_TTL_HOURS (TTL index); an in-progress claim is a lease of
+# IDEMPOTENCY_LEASE_SECONDS, so a crashed worker does not block a key forever.
+
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.database import db
+from app.responses import FastJSONResponse, dumps
+
+HEADER = "Idempotency-Key"
+
+# Wakes waiters in this process as soon as the original finishes;
+# waiters in other workers poll
+_finished: Dict[str, asyncio.Event] = {}
+
+
+def _record_id(user_id: str, scope: str, key: str) -> str:
+    return hashlib.sha256(f"{user_id}:{scope}:{key}".encode("utf-8")).hexdigest()
+
+
+def _fingerprint(payload: Any) -> str:
+    return hashlib.sha256(dumps(payload)).hexdigest()
+
+
+def _replay(record: Dict) -> Response:
+    return Response(
+        content=record["body"],
+        status_code=record["status_code"],
+        media_type=record.get("media_type") or "application/json",
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+async def _claim(record_id: str, fingerprint: str) -> Optional[Dict]:
+    """
+    Claim the key for this request
+
+    Returns:
+        None if claimed, otherwise the existing record
+    """
+    now = datetime.utcnow()
+    lease = now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+    try:
+        await db.idempotency_keys.insert_one({
+            "_id": record_id,
+            "status": "in_progress",
+            "fingerprint": fingerprint,
+            "created_at": now,
+            "expires_at": lease
+        })
+        return None
+    except DuplicateKeyError:
+        pass
+
+    # Take over a claim whose worker died (lease ran out before completion)
+    taken = await db.idempotency_keys.find_one_and_update(
+        {"_id": record_id, "status": "in_progress", "expires_at": {"$lte": now}},
+        {"$set": {"fingerprint": fingerprint, "created_at": now, "expires_at": lease}}
+    )
+    if taken is not None:
+        return None
+    return await db.idempotency_keys.find_one({"_id": record_id})
+
+
+async def _wait(record_id: str) -> Optional[Dict]:
+    """
+    Wait for the request holding the key
+
+    Returns:
+        The completed record, or None if the key was released (the original failed)
+
+    Raises:
+        HTTPException 409: If the original is still running after IDEMPOTENCY_WAIT_SECONDS
+    """
+    deadline = asyncio.get_running_loop().time() + settings.IDEMPOTENCY_WAIT_SECONDS
+    interval = 0.25
+    while True:
+        record = await db.idempotency_keys.find_one({"_id": record_id})
+        if record is None or record["status"] == "completed":
+            return record
+        if record["expires_at"] <= datetime.utcnow():
+            return None  # Abandoned: let the caller claim it
+
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress"
+            )
+        event = _finished.get(record_id)
+        try:
+            if event is not None:
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, 5))
+            else:
+                await asyncio.sleep(min(interval, remaining))
+                interval = min(interval * 2, 2)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def idempotent(
+    request: Request,
+    user_id: str,
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Run handler at most once per Idempotency-Key
+
+    Without the header the handler just runs. With it, the first request
+    runs the handler and stores its response; retries get that response
+    (with `Idempotent-Replayed: true`) or wait for it while it is running.
+
+    Args:
+        request: Incoming request (for the header)
+        user_id: Keys are scoped per user
+        scope: Endpoint name, e.g. "break_script"
+        payload: Request parameters; a retry with different parameters is rejected
+        handler: Produces the response (a Response or JSON-serializable content)
+
+    Raises:
+        HTTPException 422: If the key was used with different parameters
+        HTTPException 409: If the original request is still running after IDEMPOTENCY_WAIT_SECONDS
+    """
+    key = request.headers.get(HEADER)
+    if not key:
+        return await handler()
+    if len(key) > 255:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{HEADER} must be at most 255 characters"
+        )
+
+    record_id = _record_id(str(user_id), scope, key)
+    fingerprint = _fingerprint(payload)
+
+    while True:
+        existing = await _claim(record_id, fingerprint)
+        if existing is None:
+            break
+        if existing["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=422,  # Unprocessable: same key, different request
+                detail=f"{HEADER} was already used with different parameters"
+            )
+        if existing["status"] == "completed":
+            return _replay(existing)
+        print(f"⏳ Waiting for the original request of idempotency key {key[:40]}")
+        completed = await _wait(record_id)
+        if completed is not None:
+            return _replay(completed)
+        # Released or abandoned: try to claim it ourselves
+
+    event = _finished[record_id] = asyncio.Event()
+    try:
+        result = await handler()
+    except BaseException:
+        # Failures are not replayed: the next retry runs again
+        await db.idempotency_keys.delete_one({"_id": record_id, "status": "in_progress"})
+        raise
+    else:
+        response = result if isinstance(result, Response) else FastJSONResponse(result)
+        await db.idempotency_keys.update_one(
+            {"_id": record_id},
+            {"$set": {
+                "status": "completed",
+                "status_code": response.status_code,
+                "media_type": response.media_type,
+                "body": bytes(response.body),
+                "completed_at": datetime.utcnow(),
+                "expires_at": datetime.utcnow() + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+            }}
+        )
+        return response
+    finally:
+        event.set()
+        _finished.pop(record_id, None)
@@ -0,0 +1,171 @@
+# app/lifecycle.py
+# Task registry for graceful shutdown
+#
+# When a pod is rolled, in-flight generations used to be killed mid-LLM call
+# (quota spent, nothing saved) or in the middle of writing their scene set.
+# Generations now run inside `task_registry.generation()` (entered by the
+# admission controller) and their database writes inside
+# `task_registry.persist()`. On SIGTERM the registry stops admitting new
+# generations (503 + Retry-After), lets running ones finish for up to
+# SHUTDOWN_DRAIN_SECONDS, and then interrupts the rest with a 503 so clients
+# retry on another worker (an Idempotency-Key is released for that retry).
+# Writes that already started are never interrupted: they are shielded from
+# cancellation and awaited before the process exits.
+#
+# Long-running background services (the warm-cache loop) are started through
+# the registry and cancelled at shutdown. Give the server a graceful timeout
+# above the drain deadline (uvicorn --timeout-graceful-shutdown) so responses
+# of drained requests are still delivered.
+#
+# Draining early on SIGTERM relies on uvicorn's signal handling, verified
+# against the version pinned in requirements.txt. Without a handler to chain
+# onto, the drain runs from the lifespan shutdown (after the server has waited
+# for open connections), which always lets the process exit.
+
+import asyncio
+import signal
+from contextlib import asynccontextmanager
+from typing import Awaitable, Dict, Optional, Set, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class TaskRegistry:
+    """Tracks generations, their writes and background services of this worker"""
+
+    def __init__(self):
+        self.accepting = True
+        self._generations: Set[asyncio.Task] = set()
+        self._saving: Set[asyncio.Task] = set()
+        self._writes: Set[asyncio.Task] = set()
+        self._interrupted: Set[asyncio.Task] = set()
+        self._services: Dict[str, asyncio.Task] = {}
+        self._drain: Optional[asyncio.Task] = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._generations)
+
+    def start(self, name: str, coro: Awaitable) -> asyncio.Task:
+        """Run a background service until shutdown"""
+        task = asyncio.ensure_future(coro)
+        self._services[name] = task
+        return task
+
+    @asynccontextmanager
+    async def generation(self):
+        """
+        Register the current request as an in-flight generation
+
+        Raises:
+            HTTPException 503: If the worker is shutting down, or the generation
+                was interrupted at the drain deadline (with Retry-After)
+        """
+        if not self.accepting:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is restarting, please retry",
+                headers={"Retry-After": str(settings.SHUTDOWN_RETRY_AFTER_SECONDS)}
+            )
+        task = asyncio.current_task()
+        self._generations.add(task)
+        try:
+            yield
+        except asyncio.CancelledError:
+            if task not in self._interrupted:
+                raise
+            # Interrupted by the drain: answer so the client retries elsewhere
+            task.uncancel()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server restarted during generation, please retry",
+                headers={"Retry-After": str(settings.SHUTDOWN_RETRY_AFTER_SECONDS)}
+            )
+        finally:
+            self._generations.discard(task)
+            self._interrupted.discard(task)
+
+    async def persist(self, coro: Awaitable[T]) -> T:
+        """
+        Run a database write to completion, even if the request is cancelled
+
+        The drain does not interrupt a generation while it is saving, and
+        shutdown waits for every write still running.
+        """
+        current = asyncio.current_task()
+        write = asyncio.ensure_future(coro)
+        self._writes.add(write)
+        write.add_done_callback(self._writes.discard)
+        self._saving.add(current)
+        try:
+            return await asyncio.shield(write)
+        finally:
+            self._saving.discard(current)
+
+    def begin_drain(self):
+        """Stop admitting generations and start the drain deadline (idempotent)"""
+        if self._drain is None:
+            self.accepting = False
+            self._drain = asyncio.ensure_future(self._run_drain())
+
+    async def _run_drain(self):
+        deadline = settings.SHUTDOWN_DRAIN_SECONDS
+        if self._generations:
+            print(f"🛑 Draining {len(self._generations)} in-flight generations (up to {deadline}s)")
+            await asyncio.wait(set(self._generations), timeout=deadline)
+
+        # Generations that are saving finish; the rest are interrupted
+        interrupted = [task for task in self._generations if task not in self._saving]
+        for task in interrupted:
+            self._interrupted.add(task)
+            task.cancel()
+        if interrupted:
+            print(f"🛑 Interrupted {len(interrupted)} generations at the drain deadline")
+
+    async def shutdown(self):
+        """Drain generations, wait for writes and stop background services"""
+        self.begin_drain()
+        await self._drain
+
+        for task in self._services.values():
+            task.cancel()
+        await asyncio.gather(*self._services.values(), return_exceptions=True)
+
+        pending = set(self._generations) | set(self._writes)
+        if pending:
+            print(f"⏳ Waiting for {len(pending)} generations and scene writes to finish")
+            _, still_running = await asyncio.wait(pending, timeout=settings.SHUTDOWN_PERSIST_SECONDS)
+            if still_running:
+                print(f"⚠️ {len(still_running)} tasks still running at shutdown")
+        print("🛑 Task registry stopped")
+
+    def install_signal_handler(self):
+        """
+        Begin draining on SIGTERM, before the server waits for open connections
+
+        Only chains onto a Python-level handler the server installed (uvicorn
+        0.54 captures signals with signal.signal and exits from its own
+        handler). If there is none - the default action, SIG_IGN, or a server
+        not verified here - SIGTERM is left alone and the drain starts at
+        lifespan shutdown instead, so the process always exits.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            previous = signal.getsignal(signal.SIGTERM)
+            if not callable(previous):
+                return  # SIG_DFL / SIG_IGN / installed outside Python
+
+            def on_sigterm(signum, frame):
+                loop.call_soon_threadsafe(self.begin_drain)
+                previous(signum, frame)
+
+            signal.signal(signal.SIGTERM, on_sigterm)
+        except ValueError:
+            pass  # Not the main thread: the drain starts at lifespan shutdown
+
+# Create singleton instance
+task_registry = TaskRegistry()
@@ -0,0 +1,184 @@
+# app/loop_monitor.py
+# Event-loop lag and blocking-call detector (diagnostics mode)
+#
+# Synchronous work on the event loop (regex over large LLM outputs, Pydantic
+# parsing, password hashing...) stalls every other request. With
+# LOOP_MONITOR_ENABLED a heartbeat coroutine measures how late the loop wakes
+# it up (lag), and a watchdog thread samples the loop thread's stack while the
+# heartbeat is overdue by more than LOOP_BLOCK_THRESHOLD_MS. Stalls are grouped
+# by the function that was running (file:function), so GET /admin/event-loop
+# lists the top offenders with their blocked time and a sample stack.
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+# Frames of the app itself are preferred as the offender's location
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Frames kept per sample
+_STACK_DEPTH = 12
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LoopMonitor:
+    """
+    Heartbeat lag measurement + watchdog stack sampling
+
+    Start with `task_registry.start("loop_monitor", loop_monitor.run())`.
+    """
+
+    def __init__(self, interval_ms: int, threshold_ms: int, window: int):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self._lags = deque(maxlen=window)
+        self._offenders: Dict[str, Dict] = {}
+        self._samples: List[List[str]] = []
+        self._lock = threading.Lock()
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self.stalls = 0
+        self.started_at: Optional[datetime] = None
+
+    async def run(self):
+        """Heartbeat loop; runs the watchdog thread while active"""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self.started_at = datetime.utcnow()
+        watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        watchdog.start()
+        print(f"🩺 Event loop monitor started (blocking threshold {self.threshold * 1000:.0f}ms)")
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self._beat = now
+                lag = max(0.0, now - expected)
+                self._lags.append(lag)
+                if lag >= self.threshold:
+                    self._record_stall(lag)
+                elif self._samples:
+                    with self._lock:
+                        self._samples.clear()  # Sampled at the edge of a stall that stayed under threshold
+        finally:
+            self._stop.set()
+
+    def _watch(self):
+        """Watchdog thread: sample the loop's stack while the heartbeat is overdue"""
+        poll = max(self.threshold / 2, 0.005)
+        while not self._stop.wait(poll):
+            overdue = time.monotonic() - self._beat - self.interval
+            if overdue < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            entries = traceback.extract_stack(frame)
+            # Drop the event loop's own frames above the running callback
+            for i in range(len(entries) - 1, -1, -1):
+                if entries[i].name == "_run" and entries[i].filename.endswith(os.path.join("asyncio", "events.py")):
+                    entries = entries[i + 1:]
+                    break
+            stack = [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in entries[-_STACK_DEPTH:]]
+            with self._lock:
+                self._samples.append(stack)
+
+    def _record_stall(self, lag: float):
+        """Attribute a finished stall to the stack seen most often while it lasted"""
+        with self._lock:
+            samples, self._samples = self._samples, []
+        self.stalls += 1
+
+        if samples:
+            counts = Counter(tuple(stack) for stack in samples)
+            stack = list(counts.most_common(1)[0][0])
+        else:
+            stack = []  # Shorter than the watchdog could catch
+        location = self._location(stack)
+
+        offender = self._offenders.setdefault(location, {
+            "location": location,
+            "stalls": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "stack": stack
+        })
+        offender["stalls"] += 1
+        offender["total_ms"] += lag * 1000
+        offender["max_ms"] = max(offender["max_ms"], lag * 1000)
+        offender["last_seen"] = datetime.utcnow()
+        if stack:
+            offender["stack"] = stack
+        print(f"🐢 Event loop blocked for {lag * 1000:.0f}ms in {location}")
+
+    @staticmethod
+    def _location(stack: List[str]) -> str:
+        """
+        Innermost frame in app code, else the innermost frame, as file:function
+
+        Line numbers are left out so stalls anywhere in one function (a loop,
+        different inputs) add up to a single offender; the sample stack keeps them.
+        """
+        if not stack:
+            return "unknown (stall shorter than a watchdog poll)"
+        frame = stack[-1]
+        for entry in reversed(stack):
+            if entry.startswith(_APP_DIR) and not entry.startswith(__file__):
+                frame = entry
+                break
+        position, _, function = frame.rpartition(" in ")
+        filename = position.rpartition(":")[0]
+        if filename.startswith(_APP_DIR):
+            filename = os.path.relpath(filename, os.path.dirname(_APP_DIR))
+        return f"{filename}:{function}"
+
+    def report(self, top: int = 20) -> Dict:
+        """Lag percentiles and the top offenders by total blocked time"""
+        lags_ms = [lag * 1000 for lag in self._lags]
+        offenders = sorted(self._offenders.values(), key=lambda o: o["total_ms"], reverse=True)[:top]
+        return {
+            "enabled": self._loop_thread is not None and not self._stop.is_set(),
+            "started_at": self.started_at,
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": {
+                "samples": len(lags_ms),
+                "p50": round(_percentile(lags_ms, 0.50), 2),
+                "p99": round(_percentile(lags_ms, 0.99), 2),
+                "max": round(max(lags_ms, default=0.0), 2)
+            },
+            "stalls": self.stalls,
+            "offenders": [
+                {**offender, "total_ms": round(offender["total_ms"], 1), "max_ms": round(offender["max_ms"], 1)}
+                for offender in offenders
+            ]
+        }
+
+    def reset(self):
+        self._lags.clear()
+        self._offenders.clear()
+        self.stalls = 0
+
+
+# Create singleton instance
+loop_monitor = LoopMonitor(
+    interval_ms=settings.LOOP_MONITOR_INTERVAL_MS,
+    threshold_ms=settings.LOOP_BLOCK_THRESHOLD_MS,
+    window=settings.LOOP_LAG_WINDOW
+)
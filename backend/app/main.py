@@ -1,12 +1,42 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.auth.routes import router as auth_router
 from app.users.routes import router as users_router
 from app.scenes.routes import router as scenes_router
 from app.projects.routes import router as projects_router
 from app.character.routes import router as character_router
+from app.media.routes import router as media_router
+from app.admin.routes import router as admin_router
+from app.media.images import shutdown_image_pool
+from app.auth.utils import shutdown_hash_pool
+from app.database import ensure_indexes
+from app.character.warm_cache import run_warmer
+from app.prompts.store import run_sweeper
+from app.config import settings
+from app.admission import admission
+from app.auth.dependencies import get_admin_user
+from app.lifecycle import task_registry
+from app.loop_monitor import loop_monitor
+from app.rate_limit import rate_limit, rate_limit_headers
+from contextlib import asynccontextmanager
 
-app = FastAPI(title="Veo Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ensure_indexes()
+    task_registry.install_signal_handler()
+    if settings.WARM_CACHE_ENABLED:
+        task_registry.start("warmer", run_warmer())
+    if settings.LOOP_MONITOR_ENABLED:
+        task_registry.start("loop_monitor", loop_monitor.run())
+    if settings.PROMPT_BLOB_SWEEP_HOURS > 0:
+        task_registry.start("prompt_sweeper", run_sweeper())
+    yield
+    # Drain in-flight generations before the process exits
+    await task_registry.shutdown()
+    shutdown_image_pool()
+    shutdown_hash_pool()
+
+app = FastAPI(title="Veo Backend", lifespan=lifespan)
 
 # CORS Configuration
 origins = [
@@ -27,13 +57,29 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+@app.middleware("http")
+async def add_rate_limit_headers(request: Request, call_next):
+    response = await call_next(request)
+    result = getattr(request.state, "rate_limit", None)
+    if result is not None:
+        for name, value in rate_limit_headers(result).items():
+            response.headers.setdefault(name, value)
+    return response
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
 
+@app.get("/metrics/admission", dependencies=[Depends(get_admin_user)])
+async def admission_metrics():
+    """Generation queue depth, slot usage and rejection counts of this worker (admins only)"""
+    return admission.metrics()
+
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 app.include_router(users_router, prefix="/users", tags=["Users"])
-app.include_router(projects_router, prefix="/projects", tags=["Projects"])
+app.include_router(projects_router, prefix="/projects", tags=["Projects"], dependencies=[Depends(rate_limit("api"))])
 app.include_router(scenes_router, prefix="/scenes", tags=["Scenes"])
-app.include_router(character_router, prefix="/gemini", tags=["Gemini AI"])
+app.include_router(character_router, prefix="/gemini", tags=["Gemini AI"], dependencies=[Depends(rate_limit("api"))])
+app.include_router(media_router, prefix="/media", tags=["Media"])
+app.include_router(admin_router, prefix="/admin", tags=["Admin"])
 
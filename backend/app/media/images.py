@@ -0,0 +1,177 @@
+# app/media/images.py
+# Image processing pipeline for character reference images
+#
+# Uploads are decoded once in a process pool (off the event loop) to produce
+# fixed-size thumbnails. Identical images (same SHA-256) are stored once across
+# all projects and reference counted in `media_images`. Near-duplicates
+# (re-encoded or resized copies) are deliberately stored separately: matching
+# them would hand one user's upload to another whenever two different images
+# look alike.
+
+import asyncio
+import hashlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.database import db
+from app.media.store import media_store, media_url
+
+try:  # Optional: without Pillow originals are stored but no thumbnails are made
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# Square thumbnails, cropped to fill
+THUMBNAIL_SIZES = {"sm": 128, "md": 512}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class InvalidImageError(ValueError):
+    """Raised when uploaded bytes cannot be decoded as an image"""
+
+
+def _process(data: bytes) -> Dict:
+    """Decode once, then derive thumbnails (runs in a worker process)"""
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception as e:
+        raise InvalidImageError(f"Not a valid image: {str(e)}")
+
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    result = {
+        "width": image.width,
+        "height": image.height,
+        "format": (image.format or "").lower(),
+        "thumbnails": {}
+    }
+
+    for name, size in THUMBNAIL_SIZES.items():
+        thumb = ImageOps.fit(image.convert("RGBA" if has_alpha else "RGB"), (size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        if has_alpha:
+            thumb.save(buffer, format="PNG", optimize=True)
+            result["thumbnails"][name] = (buffer.getvalue(), "image/png")
+        else:
+            thumb.save(buffer, format="JPEG", quality=85, optimize=True)
+            result["thumbnails"][name] = (buffer.getvalue(), "image/jpeg")
+    return result
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _executor
+
+
+def shutdown_image_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def image_urls(record: Dict) -> Dict:
+    """Character fields referencing a stored image record"""
+    return {
+        "image_id": record["original_id"],
+        "image_url": media_url(record["original_id"]),
+        "thumbnail_urls": {name: media_url(file_id) for name, file_id in record.get("thumbnail_ids", {}).items()}
+    }
+
+
+async def store_image(data: bytes, content_type: str, metadata: Optional[Dict] = None) -> Dict:
+    """
+    Store an image once, with thumbnails
+
+    A duplicate of an already stored image only increments its reference
+    count - no decoding and no storage writes.
+
+    Args:
+        data: Raw image bytes
+        content_type: MIME type of the upload
+        metadata: Stored with the original (e.g. first project/role)
+
+    Returns:
+        The media_images record ({"_id": sha256, "original_id", "thumbnail_ids", ...})
+
+    Raises:
+        InvalidImageError: If Pillow is available and cannot decode the data
+    """
+    if len(data) > settings.IMAGE_MAX_BYTES:
+        raise InvalidImageError(f"Image exceeds {settings.IMAGE_MAX_BYTES} bytes")
+
+    # hashlib releases the GIL for large buffers
+    sha256 = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+
+    existing = await db.media_images.find_one_and_update(
+        {"_id": sha256},
+        {"$inc": {"ref_count": 1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if existing:
+        return existing
+
+    processed = {"thumbnails": {}}
+    if Image is not None:
+        loop = asyncio.get_running_loop()
+        processed = await loop.run_in_executor(_get_executor(), _process, data)
+
+    original_id = await media_store.put(data, filename=sha256, content_type=content_type, metadata=metadata)
+    thumbnail_ids = {}
+    for name, (thumb_data, thumb_type) in processed["thumbnails"].items():
+        thumbnail_ids[name] = await media_store.put(
+            thumb_data, filename=f"{sha256}_{name}", content_type=thumb_type, metadata={"thumbnail_of": original_id}
+        )
+
+    record = {
+        "_id": sha256,
+        "original_id": original_id,
+        "thumbnail_ids": thumbnail_ids,
+        "width": processed.get("width"),
+        "height": processed.get("height"),
+        "content_type": content_type,
+        "size": len(data),
+        "ref_count": 1,
+        "created_at": datetime.utcnow()
+    }
+    try:
+        await db.media_images.insert_one(record)
+    except DuplicateKeyError:
+        # Same image uploaded concurrently: keep the winner, drop our copies
+        for file_id in [original_id, *thumbnail_ids.values()]:
+            await media_store.delete(file_id)
+        return await db.media_images.find_one_and_update(
+            {"_id": sha256},
+            {"$inc": {"ref_count": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+    return record
+
+
+async def release_image(image_id: str):
+    """Drop one reference to an image; files are deleted with the last reference"""
+    record = await db.media_images.find_one_and_update(
+        {"original_id": image_id},
+        {"$inc": {"ref_count": -1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if record is None:
+        # Not tracked (stored before deduplication)
+        await media_store.delete(image_id)
+        return
+    if record["ref_count"] <= 0:
+        deleted = await db.media_images.delete_one({"_id": record["_id"], "ref_count": {"$lte": 0}})
+        if deleted.deleted_count == 0:
+            return  # Re-referenced concurrently
+        for file_id in [record["original_id"], *record.get("thumbnail_ids", {}).values()]:
+            await media_store.delete(file_id)
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from app.media.store import media_store
+from app.http_cache import if_none_match
+import re
+
+router = APIRouter()
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Media is immutable (new upload = new id), so browsers may cache it indefinitely
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def _parse_range(header: str, length: int):
+    """Parse a single "bytes=start-end" range; returns (start, end) or None if unsatisfiable"""
+    match = _RANGE_RE.match(header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    if not match.group(1):
+        # Suffix range: last N bytes
+        suffix = int(match.group(2))
+        if suffix == 0:
+            return None
+        return max(0, length - suffix), length - 1
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else length - 1
+    if start >= length or end < start:
+        return None
+    return start, min(end, length - 1)
+
+
+@router.get("/{file_id}")
+async def get_media(file_id: str, request: Request):
+    """
+    Stream a stored media file
+
+    Supports single byte ranges (206), If-None-Match (304) and long-lived
+    caching. File ids are unguessable, so the URL itself grants access and
+    can be used directly in <img> tags.
+    """
+    try:
+        info = await media_store.get_info(file_id)
+    except FileNotFoundError:
+        info = None
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Media not found"
+        )
+
+    etag = f'"{info["sha256"] or file_id}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "Last-Modified": info["upload_date"].strftime("%a, %d %b %Y %H:%M:%S GMT")
+    }
+
+    if if_none_match(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    length = info["length"]
+    start, end = 0, length - 1
+    status_code = status.HTTP_200_OK
+
+    range_header = request.headers.get("range")
+    if range_header and length > 0:
+        byte_range = _parse_range(range_header, length)
+        if byte_range is None:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{length}"}
+            )
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+
+    headers["Content-Length"] = str(max(0, end - start + 1))
+    body = media_store.open_range(file_id, start, end) if length > 0 else iter([b""])
+    return StreamingResponse(
+        body,
+        status_code=status_code,
+        media_type=info["content_type"],
+        headers=headers
+    )
@@ -0,0 +1,211 @@
+# app/media/store.py
+# Chunked binary storage for character images and other media
+#
+# Keeps large binaries out of project documents. GridFS is used in
+# deployments; the local-filesystem backend is for tests and development.
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Union
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+from app.config import settings
+from app.database import db
+
+CHUNK_SIZE = 255 * 1024  # GridFS default chunk size
+
+Source = Union[bytes, AsyncIterator[bytes]]
+
+
+async def _iterate(source: Source) -> AsyncIterator[bytes]:
+    if isinstance(source, (bytes, bytearray)):
+        for offset in range(0, len(source), CHUNK_SIZE):
+            yield bytes(source[offset:offset + CHUNK_SIZE])
+    else:
+        async for chunk in source:
+            if chunk:
+                yield chunk
+
+
+def decode_base64_image(value: str) -> tuple[bytes, str]:
+    """
+    Decode a base64 image, accepting data URLs ("data:image/png;base64,...")
+
+    Returns:
+        (raw bytes, content type)
+    """
+    content_type = "application/octet-stream"
+    if value.startswith("data:") and "," in value:
+        header, value = value.split(",", 1)
+        content_type = header[5:].split(";", 1)[0] or content_type
+    return base64.b64decode(value), content_type
+
+
+def media_url(file_id: str) -> str:
+    return f"{settings.MEDIA_URL_PREFIX}/{file_id}"
+
+
+class MediaStore:
+    """
+    Interface for media backends
+
+    File ids are random hex strings, so media URLs are not guessable.
+    Stored files are immutable; the ETag is the content SHA-256.
+    """
+
+    async def put(self, source: Source, filename: str, content_type: str, metadata: Optional[Dict] = None) -> str:
+        raise NotImplementedError
+
+    async def get_info(self, file_id: str) -> Optional[Dict]:
+        """Returns {"length", "content_type", "sha256", "upload_date", "metadata"} or None"""
+        raise NotImplementedError
+
+    def open_range(self, file_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Stream bytes start..end (inclusive)"""
+        raise NotImplementedError
+
+    async def delete(self, file_id: str):
+        raise NotImplementedError
+
+    async def read(self, file_id: str) -> bytes:
+        info = await self.get_info(file_id)
+        if info is None:
+            raise FileNotFoundError(file_id)
+        parts = [chunk async for chunk in self.open_range(file_id, 0, info["length"] - 1)]
+        return b"".join(parts)
+
+
+class GridFSMediaStore(MediaStore):
+    """MongoDB GridFS backend (bucket "media")"""
+
+    def __init__(self, bucket_name: str = "media"):
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name, chunk_size_bytes=CHUNK_SIZE)
+        self.files = db[f"{bucket_name}.files"]
+
+    async def put(self, source: Source, filename: str, content_type: str, metadata: Optional[Dict] = None) -> str:
+        file_id = uuid.uuid4().hex
+        digest = hashlib.sha256()
+        grid_in = self.bucket.open_upload_stream_with_id(
+            file_id,
+            filename,
+            metadata={**(metadata or {}), "content_type": content_type}
+        )
+        try:
+            async for chunk in _iterate(source):
+                digest.update(chunk)
+                await grid_in.write(chunk)
+        except BaseException:
+            await grid_in.abort()
+            raise
+        await grid_in.close()
+        # The hash is only known once the stream is consumed
+        await self.files.update_one({"_id": file_id}, {"$set": {"metadata.sha256": digest.hexdigest()}})
+        return file_id
+
+    async def get_info(self, file_id: str) -> Optional[Dict]:
+        doc = await self.files.find_one({"_id": file_id})
+        if doc is None:
+            return None
+        metadata = doc.get("metadata") or {}
+        return {
+            "length": doc["length"],
+            "content_type": metadata.get("content_type", "application/octet-stream"),
+            "sha256": metadata.get("sha256", ""),
+            "upload_date": doc["uploadDate"],
+            "metadata": metadata
+        }
+
+    async def open_range(self, file_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        grid_out = await self.bucket.open_download_stream(file_id)
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete(self, file_id: str):
+        try:
+            await self.bucket.delete(file_id)
+        except Exception as e:
+            print(f"⚠️ Media delete failed for {file_id}: {str(e)}")
+
+
+class LocalMediaStore(MediaStore):
+    """Local filesystem backend: <root>/<id> plus a <root>/<id>.json sidecar"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, file_id: str) -> str:
+        if not file_id.isalnum():
+            raise FileNotFoundError(file_id)
+        return os.path.join(self.root, file_id)
+
+    async def put(self, source: Source, filename: str, content_type: str, metadata: Optional[Dict] = None) -> str:
+        file_id = uuid.uuid4().hex
+        path = self._path(file_id)
+        digest = hashlib.sha256()
+        length = 0
+        with open(path, "wb") as handle:
+            async for chunk in _iterate(source):
+                digest.update(chunk)
+                length += len(chunk)
+                await asyncio.to_thread(handle.write, chunk)
+        info = {
+            "filename": filename,
+            "length": length,
+            "content_type": content_type,
+            "sha256": digest.hexdigest(),
+            "upload_date": datetime.utcnow().isoformat(),
+            "metadata": metadata or {}
+        }
+        with open(path + ".json", "w") as handle:
+            json.dump(info, handle)
+        return file_id
+
+    async def get_info(self, file_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(file_id) + ".json") as handle:
+                info = json.load(handle)
+        except FileNotFoundError:
+            return None
+        info["upload_date"] = datetime.fromisoformat(info["upload_date"])
+        return info
+
+    async def open_range(self, file_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        with open(self._path(file_id), "rb") as handle:
+            handle.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(handle.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    async def delete(self, file_id: str):
+        for path in (self._path(file_id), self._path(file_id) + ".json"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _create_store() -> MediaStore:
+    if settings.MEDIA_BACKEND == "local":
+        return LocalMediaStore(settings.MEDIA_LOCAL_ROOT)
+    return GridFSMediaStore()
+
+
+# Singleton instance
+media_store = _create_store()
@@ -0,0 +1,63 @@
+# app/migrations/compress_prompts.py
+# Move existing inline prompt strings into the deduplicated prompt_blobs store
+#
+# Usage: python -m app.migrations.compress_prompts
+# Safe to re-run: documents already packed are skipped and blobs are upserted.
+
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.database import db
+from app.prompts.store import PACKED_FIELDS, prompt_store
+
+BATCH_SIZE = 500
+
+# (collection, field) pairs holding large prompt text
+TARGETS = PACKED_FIELDS
+
+
+async def migrate_field(collection_name: str, field: str) -> int:
+    """Pack every inline `field` of a collection, BATCH_SIZE documents at a time"""
+    collection = db[collection_name]
+    cursor = collection.find(
+        {field: {"$type": "string"}},
+        {field: 1}
+    )
+    migrated = 0
+    batch = []
+
+    async def flush():
+        nonlocal migrated
+        await prompt_store.pack(batch, field)
+        await collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {field: None, f"{field}_blocks": doc[f"{field}_blocks"]}}
+                )
+                for doc in batch
+            ],
+            ordered=False
+        )
+        migrated += len(batch)
+        batch.clear()
+
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    return migrated
+
+
+async def main():
+    for collection_name, field in TARGETS:
+        count = await migrate_field(collection_name, field)
+        print(f"✅ {collection_name}.{field}: packed {count} documents")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+# app/migrations/extract_character_images.py
+# Move inline characters.<role>.image_base64 out of project documents into the media store
+# (deduplicated, with thumbnails - see app.media.images)
+#
+# Usage: python -m app.migrations.extract_character_images
+# Safe to re-run: only characters still holding image_base64 are touched.
+
+import asyncio
+
+from app.database import db
+from app.http_cache import bump_revision
+from app.media.store import decode_base64_image
+from app.media.images import store_image, image_urls
+
+
+async def main():
+    migrated = 0
+    failed = 0
+    # Projection keeps the cursor to the characters map only
+    async for project in db.projects.find({"characters": {"$ne": {}}}, {"characters": 1}):
+        for role_key, character in (project.get("characters") or {}).items():
+            if not isinstance(character, dict) or not character.get("image_base64"):
+                continue
+            try:
+                data, content_type = decode_base64_image(character["image_base64"])
+                record = await store_image(
+                    data,
+                    content_type=content_type,
+                    metadata={"project_id": str(project["_id"]), "role": role_key}
+                )
+            except Exception as e:
+                failed += 1
+                print(f"⚠️ {project['_id']} / {role_key}: {str(e)}")
+                continue
+
+            await db.projects.update_one(
+                {"_id": project["_id"]},
+                bump_revision({
+                    "$set": {
+                        f"characters.{role_key}.{field}": value
+                        for field, value in image_urls(record).items()
+                    },
+                    "$unset": {f"characters.{role_key}.image_base64": ""}
+                })
+            )
+            migrated += 1
+
+    print(f"✅ Moved {migrated} character images to the media store ({failed} failed)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+# app/migrations/project_index.py
+# (Re)build the unified project_index from projects and character_projects
+#
+# Usage: python -m app.migrations.project_index
+# Safe to re-run: entries are upserted from the source documents and entries
+# whose project no longer exists are removed.
+
+import asyncio
+
+from app.database import db
+from app.projects.summary import index_upsert, STORY_SOURCE, CHARACTER_SOURCE, INDEX_FIELDS
+
+BATCH_SIZE = 500
+
+
+async def rebuild(source: str) -> int:
+    collection = db[source]
+    projection = {field: 1 for field in (*INDEX_FIELDS, "user_id")}
+    seen = []
+    batch = []
+
+    async def flush():
+        await db.project_index.bulk_write(batch, ordered=False)
+        batch.clear()
+
+    async for project in collection.find({}, projection):
+        key = f"{source}:{project['_id']}"
+        seen.append(key)
+        batch.append(index_upsert(source, project))
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    stale = await db.project_index.delete_many({"source": source, "_id": {"$nin": seen}})
+    if stale.deleted_count:
+        print(f"🧹 {source}: removed {stale.deleted_count} stale index entries")
+    return len(seen)
+
+
+async def main():
+    for source in (STORY_SOURCE, CHARACTER_SOURCE):
+        count = await rebuild(source)
+        print(f"✅ {source}: indexed {count} projects")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
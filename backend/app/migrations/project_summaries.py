@@ -0,0 +1,53 @@
+# app/migrations/project_summaries.py
+# Backfill the dashboard summary fields of projects written before they existed
+#
+# total_scenes / scenes_duration are computed from each project's active
+# scenes and thumbnail_url from its characters. Token spend and model are
+# unknown for past generations and start counting from the next one.
+# scenes_duration is summed clip seconds; character projects generated before
+# that stored the pacing estimate there, in the version history too, so the
+# history summaries are recomputed as well (rollback restores them).
+#
+# Usage: python -m app.migrations.project_summaries
+# Safe to re-run: values are recomputed from the scenes.
+
+import asyncio
+
+from app.database import db
+from app.http_cache import bump_revision
+from app.projects.summary import project_thumbnail
+from app.scenes.generations import story_scene_versions, character_scene_versions
+
+
+async def backfill(versions, with_thumbnail: bool) -> int:
+    updated = 0
+    projection = {"active_generation": 1, "characters": 1, "scene_versions": 1, "language": 1}
+    async for project in versions.projects.find({}, projection):
+        totals = await versions.scenes.aggregate([
+            {"$match": versions.summary_filter(project, project.get("active_generation"))},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "duration": {"$sum": {"$ifNull": ["$duration", 0]}}}}
+        ]).to_list(1)
+        summary = {
+            "total_scenes": totals[0]["count"] if totals else 0,
+            "scenes_duration": totals[0]["duration"] if totals else 0
+        }
+        if with_thumbnail:
+            summary["thumbnail_url"] = project_thumbnail(project.get("characters") or {})
+        for i, entry in enumerate(project.get("scene_versions") or []):
+            if entry.get("summary"):
+                recomputed = await versions.summarize(project, entry)
+                summary[f"scene_versions.{i}.summary.scenes_duration"] = recomputed["scenes_duration"]
+        await versions.projects.update_one({"_id": project["_id"]}, bump_revision({"$set": summary}))
+        updated += 1
+    return updated
+
+
+async def main():
+    count = await backfill(story_scene_versions, with_thumbnail=True)
+    print(f"✅ projects: summarized {count}")
+    count = await backfill(character_scene_versions, with_thumbnail=False)
+    print(f"✅ character_projects: summarized {count}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+# app/migrations/scene_generations.py
+# Put scenes saved before versioning into a first scene version
+#
+# Without this, the legacy scene set of a project is discarded (not kept in
+# history) the next time its scenes are regenerated.
+#
+# Usage: python -m app.migrations.scene_generations
+# Safe to re-run: only projects without an active_generation are touched.
+
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.http_cache import bump_revision
+from app.scenes.generations import story_scene_versions, character_scene_versions
+
+
+async def migrate(versions) -> int:
+    migrated = 0
+    async for project in versions.projects.find({"active_generation": None}, {"_id": 1}):
+        project_key = versions.scene_project_key(project["_id"])
+        generation = ObjectId()
+        result = await versions.scenes.update_many(
+            {"project_id": project_key, "generations": None},
+            {"$set": {"generations": [generation]}}
+        )
+        if result.modified_count == 0:
+            continue
+        await versions.projects.update_one(
+            {"_id": project["_id"], "active_generation": None},
+            bump_revision({
+                "$set": {"active_generation": generation},
+                "$push": {"scene_versions": {
+                    "generation": generation,
+                    "created_at": datetime.utcnow(),
+                    "source": "migration",
+                    "scene_count": result.modified_count,
+                    "reused_scenes": 0
+                }}
+            })
+        )
+        migrated += 1
+    return migrated
+
+
+async def main():
+    for name, versions in (("projects", story_scene_versions), ("character_projects", character_scene_versions)):
+        count = await migrate(versions)
+        print(f"✅ {name}: versioned scenes of {count} projects")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,25 @@
+# app/migrations/sweep_prompt_blobs.py
+# Delete prompt blocks that no scene references any more
+#
+# Deleting projects and collecting old scene versions release their blocks
+# as they go, and the server sweeps every PROMPT_BLOB_SWEEP_HOURS; this runs
+# the same full sweep on demand (e.g. once after upgrading, for blocks left
+# behind by deletions made before blocks were reclaimed).
+#
+# Usage: python -m app.migrations.sweep_prompt_blobs
+# Safe to re-run.
+
+import asyncio
+
+from app.database import db
+from app.prompts.store import prompt_store
+
+
+async def main():
+    before = await db.prompt_blobs.count_documents({})
+    deleted = await prompt_store.sweep()
+    print(f"✅ prompt_blobs: deleted {deleted} of {before} blocks")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
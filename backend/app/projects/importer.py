@@ -0,0 +1,480 @@
+# app/projects/importer.py
+# Bulk import of projects, scenes and characters from NDJSON
+#
+# One JSON object per line, in the layout written by the NDJSON export
+# (app.scenes.export):
+#
+#   {"type": "project", "kind": "storytelling", "project_name": ..., "raw_script": ..., "characters": {...}}
+#   {"type": "character", "role": "lead", "name": ..., "image_base64": ...}   (storytelling only)
+#   {"type": "scene", "scene_number": 1, "description": ..., "generated_prompt": ...}
+#   {"type": "project", "kind": "character", "character_name": ..., ...}
+#   ...
+#
+# Scenes and characters belong to the project line before them. The file is
+# read line by line and written with ordered bulk writes of at most
+# `batch_size` documents, so memory stays constant whatever its size.
+#
+# Every document id is derived from (job id, line number), and each write is
+# an upsert, so re-running a job rewrites the same documents instead of
+# duplicating them. A project document - with its active_generation, version
+# history entry and summary fields - is only written after all of its scenes,
+# so a project never appears with a partial scene set. Progress is
+# checkpointed in `import_jobs` after each batch of projects; resuming a job
+# skips every line up to the last checkpoint. Lines after it are read again,
+# so the image reference a character line takes is recorded on the job
+# (`image_refs`, by line number) and reused instead of taken twice.
+#
+# Usage: python -m app.projects.importer scripts.ndjson --user-email me@example.com [--job-id ID] [--batch-size 500]
+
+import argparse
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId
+from pydantic import BaseModel, ValidationError
+from pymongo import ReplaceOne, ReturnDocument
+
+from app.config import settings
+from app.database import db
+from app.media.images import store_image, image_urls, InvalidImageError
+from app.media.store import decode_base64_image
+from app.projects.summary import project_thumbnail, index_upsert, STORY_SOURCE, CHARACTER_SOURCE
+from app.prompts.store import prompt_store
+from app.scenes.generations import content_hash
+from app.scenes.models import SceneBase
+
+# Errors kept on the job document (the most recent ones)
+MAX_JOB_ERRORS = 100
+
+
+class ImportJobError(Exception):
+    """Raised when a job cannot be started or resumed"""
+
+
+# ---------------------------------------------------------------------------
+# Line models (unknown fields - exported ids, summaries - are ignored)
+# ---------------------------------------------------------------------------
+
+class StoryProjectLine(BaseModel):
+    project_name: str
+    project_type: str = "storytelling"
+    settings: Dict[str, Any] = {}
+    raw_script: Optional[str] = None
+    characters: Dict[str, Any] = {}
+    created_at: Optional[datetime] = None
+
+
+class CharacterProjectLine(BaseModel):
+    project_name: str
+    character_name: str
+    content_type: str = "food"
+    voice_tone: str = ""
+    topic_mode: str = ""
+    scenario: Optional[str] = None
+    visual_style: str = "3D Animation Style"
+    language: str = "hindi"
+    languages: List[str] = []
+    total_duration: int = 8
+    created_at: Optional[datetime] = None
+
+
+class StorySceneLine(SceneBase):
+    characters: List[str] = []  # Roles in the scene, as written by break-script
+
+
+class CharacterSceneLine(BaseModel):
+    scene_number: int
+    dialogue: str = ""
+    emotion: str = ""
+    teaching_point: str = ""
+    language: Optional[str] = None
+    generated_prompt: Optional[str] = None
+    duration: int = 8
+
+
+class CharacterLine(BaseModel):
+    role: str
+    name: str
+    description: Optional[str] = None
+    voice_type: Optional[str] = None
+    voice_tone: Optional[str] = None
+    image_base64: Optional[str] = None
+
+
+def _line_id(job_id: str, line_number: int, salt: str) -> ObjectId:
+    """Deterministic ObjectId, so re-imported lines overwrite their earlier copy"""
+    return ObjectId(hashlib.sha256(f"{job_id}:{line_number}:{salt}".encode("utf-8")).hexdigest()[:24])
+
+
+def _is_character_project(line: Dict) -> bool:
+    kind = line.get("kind") or line.get("project_type")
+    return kind == "character" or (kind is None and "character_name" in line)
+
+
+class _PendingProject:
+    """The project being read: its document is written once its last scene is"""
+
+    def __init__(self, source: str, doc: Dict, first_line: int):
+        self.source = source
+        self.doc = doc
+        self.first_line = first_line
+        self.scene_count = 0
+        self.summary_scenes = 0
+        self.duration = 0
+        self.character_count = 0
+
+
+# ---------------------------------------------------------------------------
+# Importer
+# ---------------------------------------------------------------------------
+
+class ProjectImporter:
+    """
+    One import job for one user
+
+    Args:
+        user_id: Owner of the imported projects
+        job_id: Checkpoint key; pass the id of an earlier job to resume it
+        batch_size: Documents per bulk write (default IMPORT_BATCH_SIZE)
+    """
+
+    def __init__(self, user_id: str, job_id: Optional[str] = None, batch_size: Optional[int] = None):
+        self.user_id = str(user_id)
+        self.job_id = job_id or str(ObjectId())
+        self.batch_size = max(1, batch_size or settings.IMPORT_BATCH_SIZE)
+        self.resume_after = 0
+
+        self.project: Optional[_PendingProject] = None
+        self.scene_batch: Dict[str, List[Dict]] = {STORY_SOURCE: [], CHARACTER_SOURCE: []}
+        self.project_batch: List[_PendingProject] = []
+        self.errors: List[Dict] = []
+        self.counts = {"projects": 0, "scenes": 0, "characters": 0, "skipped": 0}
+
+    async def start(self) -> Dict:
+        """Create the job document, or load the checkpoint of the job being resumed"""
+        now = datetime.utcnow()
+        job = await db.import_jobs.find_one({"_id": self.job_id})
+        if job is None:
+            job = {
+                "_id": self.job_id,
+                "user_id": self.user_id,
+                "status": "running",
+                "committed_line": 0,
+                "counts": {key: 0 for key in self.counts},
+                "errors": [],
+                "created_at": now,
+                "updated_at": now
+            }
+            await db.import_jobs.insert_one(job)
+            return job
+
+        if job["user_id"] != self.user_id:
+            raise ImportJobError(f"Import job {self.job_id} belongs to another user")
+        if job["status"] == "completed":
+            raise ImportJobError(f"Import job {self.job_id} is already completed")
+        self.resume_after = job["committed_line"]
+        await db.import_jobs.update_one({"_id": self.job_id}, {"$set": {"status": "running", "updated_at": now}})
+        print(f"🔁 Resuming import {self.job_id} after line {self.resume_after}")
+        return job
+
+    async def run(self, lines: AsyncIterator[bytes]) -> Dict:
+        """
+        Import every line, checkpointing after each batch of projects
+
+        Returns:
+            The job document after the last checkpoint
+        """
+        await self.start()
+        line_number = 0
+        try:
+            async for raw in lines:
+                line_number += 1
+                if line_number <= self.resume_after or not raw.strip():
+                    continue
+                await self._read_line(line_number, raw)
+            await self._finish_project(line_number)
+            await self._commit(line_number)
+        except Exception as e:
+            await db.import_jobs.update_one(
+                {"_id": self.job_id},
+                {"$set": {"status": "failed", "last_error": str(e), "updated_at": datetime.utcnow()}}
+            )
+            raise
+
+        return await db.import_jobs.find_one_and_update(
+            {"_id": self.job_id},
+            {"$set": {"status": "completed", "updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    # -- Parsing ------------------------------------------------------------
+
+    async def _read_line(self, line_number: int, raw: bytes):
+        try:
+            line = json.loads(raw)
+            if not isinstance(line, dict):
+                raise ValueError("Expected a JSON object")
+            line_type = line.get("type") or "scene"
+            if line_type == "project":
+                await self._finish_project(line_number - 1)
+                self._start_project(line_number, line)
+            elif self.project is None:
+                raise ValueError(f"{line_type} line without a valid project line before it")
+            elif line_type == "scene":
+                await self._add_scene(line_number, line)
+            elif line_type == "character":
+                await self._add_character(line_number, line)
+            else:
+                raise ValueError(f"Unknown line type: {line_type}")
+        except ValidationError as e:
+            self._skip(line_number, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ))
+        except (ValueError, InvalidImageError) as e:
+            self._skip(line_number, str(e))
+
+    def _skip(self, line_number: int, error: str):
+        self.counts["skipped"] += 1
+        self.errors.append({"line": line_number, "error": error[:500]})
+
+    def _start_project(self, line_number: int, line: Dict):
+        now = datetime.utcnow()
+        project_id = _line_id(self.job_id, line_number, "project")
+
+        if _is_character_project(line):
+            data = CharacterProjectLine.model_validate(line).model_dump()
+            doc = {**data, "user_id": self.user_id, "project_type": "character"}
+            source = CHARACTER_SOURCE
+        else:
+            data = StoryProjectLine.model_validate(line).model_dump()
+            # Images of the source environment are not carried over; use character lines
+            characters = {
+                role: {**character, "image_id": None, "image_url": None, "thumbnail_urls": {}}
+                for role, character in data["characters"].items()
+                if isinstance(character, dict)
+            }
+            doc = {
+                **data,
+                "user_id": ObjectId(self.user_id),
+                "characters": characters,
+                "settings": data["settings"] or {"visual_style": "Cinematic Photorealism", "default_duration": 8},
+                "script_broken": False
+            }
+            source = STORY_SOURCE
+
+        doc.update({
+            "_id": project_id,
+            "created_at": data["created_at"] or now,
+            "last_updated": now,
+            "active_generation": _line_id(self.job_id, line_number, "generation")
+        })
+        self.project = _PendingProject(source, doc, line_number)
+
+    async def _add_scene(self, line_number: int, line: Dict):
+        project = self.project
+        project_key = project.doc["_id"] if project.source == STORY_SOURCE else str(project.doc["_id"])
+        now = datetime.utcnow()
+
+        if project.source == STORY_SOURCE:
+            scene = StorySceneLine.model_validate(line).model_dump()
+            visual_description = scene.pop("visual_description")
+            scene["generated_prompt"] = scene["generated_prompt"] or visual_description
+            scene["user_id"] = ObjectId(self.user_id)
+        else:
+            scene = CharacterSceneLine.model_validate(line).model_dump()
+            scene["user_id"] = self.user_id
+
+        scene.update({
+            "_id": _line_id(self.job_id, line_number, "scene"),
+            "project_id": project_key,
+            "created_at": now,
+            "updated_at": now
+        })
+        scene["content_hash"] = content_hash(scene)
+        scene["generations"] = [project.doc["active_generation"]]
+
+        project.scene_count += 1
+        if scene.get("language") in (None, project.doc.get("language")):
+            # Summaries describe the primary language (see SceneVersions.summary_filter)
+            project.summary_scenes += 1
+            project.duration += scene.get("duration") or 0
+        batch = self.scene_batch[project.source]
+        batch.append(scene)
+        if len(batch) >= self.batch_size:
+            await self._flush_scenes(project.source)
+
+    async def _add_character(self, line_number: int, line: Dict):
+        project = self.project
+        if project.source != STORY_SOURCE:
+            raise ValueError("Character lines are only supported on storytelling projects")
+
+        character = CharacterLine.model_validate(line).model_dump()
+        image_base64 = character.pop("image_base64")
+        role_key = character.pop("role").lower().replace(" ", "_")
+        character.update({"image_id": None, "image_url": None, "thumbnail_urls": {}})
+        if image_base64:
+            try:
+                image_data, content_type = decode_base64_image(image_base64)
+            except Exception:
+                raise ValueError("Invalid base64 image data")
+            record = await self._store_image(line_number, image_data, content_type, {
+                "project_id": str(project.doc["_id"]),
+                "role": role_key
+            })
+            character.update(image_urls(record))
+
+        project.doc["characters"][role_key] = character
+        project.character_count += 1
+
+    async def _store_image(self, line_number: int, data: bytes, content_type: str, metadata: Dict) -> Dict:
+        """Take one image reference per line, however often the line is re-read after a resume"""
+        job = await db.import_jobs.find_one({"_id": self.job_id}, {f"image_refs.{line_number}": 1})
+        sha256 = ((job or {}).get("image_refs") or {}).get(str(line_number))
+        if sha256:
+            record = await db.media_images.find_one({"_id": sha256})
+            if record:
+                return record
+        record = await store_image(data, content_type=content_type, metadata=metadata)
+        await db.import_jobs.update_one(
+            {"_id": self.job_id},
+            {"$set": {f"image_refs.{line_number}": record["_id"]}}
+        )
+        return record
+
+    async def _finish_project(self, last_line: int):
+        """Queue the project being read; its scenes are already queued"""
+        project = self.project
+        if project is None:
+            return
+        self.project = None
+
+        doc = project.doc
+        summary = {"total_scenes": project.summary_scenes, "scenes_duration": project.duration}
+        if project.source == STORY_SOURCE:
+            summary["thumbnail_url"] = project_thumbnail(doc["characters"])
+            doc["script_broken"] = project.scene_count > 0
+        doc.update(summary)
+        doc["scene_versions"] = [{
+            "generation": doc["active_generation"],
+            "created_at": doc["last_updated"],
+            "source": "import",
+            "scene_count": project.scene_count,
+            "reused_scenes": 0,
+            "summary": summary
+        }]
+        self.project_batch.append(project)
+
+        self.counts["projects"] += 1
+        self.counts["scenes"] += project.scene_count
+        self.counts["characters"] += project.character_count
+        if len(self.project_batch) >= self.batch_size:
+            await self._commit(last_line)
+
+    # -- Writes -------------------------------------------------------------
+
+    async def _flush_scenes(self, source: str):
+        batch = self.scene_batch[source]
+        if not batch:
+            return
+        self.scene_batch[source] = []
+        await prompt_store.pack(batch, "generated_prompt")
+        collection = db.scenes if source == STORY_SOURCE else db.character_scenes
+        await collection.bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in batch], ordered=True)
+
+    async def _commit(self, last_line: int):
+        """
+        Write queued projects (after every scene they reference) and checkpoint
+
+        The checkpoint stops before the project still being read, whose
+        scenes may be partly written: resuming re-reads it from its first line.
+        """
+        for source in (STORY_SOURCE, CHARACTER_SOURCE):
+            await self._flush_scenes(source)
+
+        projects, self.project_batch = self.project_batch, []
+        for source in (STORY_SOURCE, CHARACTER_SOURCE):
+            docs = [project.doc for project in projects if project.source == source]
+            if docs:
+                await db[source].bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs], ordered=True)
+                await db.project_index.bulk_write([index_upsert(source, doc) for doc in docs], ordered=True)
+
+        committed_line = self.project.first_line - 1 if self.project else last_line
+        errors = [error for error in self.errors if error["line"] <= committed_line]
+        self.errors = [error for error in self.errors if error["line"] > committed_line]
+        counts, self.counts = self.counts, {key: 0 for key in self.counts}
+        # Lines skipped inside the project still being read are counted when it is
+        if self.project:
+            counts["skipped"] -= len(self.errors)
+            self.counts["skipped"] = len(self.errors)
+
+        await db.import_jobs.update_one(
+            {"_id": self.job_id},
+            {
+                "$set": {"committed_line": committed_line, "updated_at": datetime.utcnow()},
+                "$inc": {f"counts.{key}": value for key, value in counts.items()},
+                "$push": {"errors": {"$each": errors, "$slice": -MAX_JOB_ERRORS}}
+            }
+        )
+        print(f"📥 Import {self.job_id}: committed through line {committed_line} ({len(projects)} projects)")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Split a byte stream into lines without buffering more than one line
+
+    Raises:
+        ValueError: If a line exceeds IMPORT_MAX_LINE_BYTES
+    """
+    buffer = bytearray()
+    scanned = 0  # Bytes of buffer already searched for a newline
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            end = buffer.find(b"\n", scanned)
+            if end < 0:
+                break
+            if end > settings.IMPORT_MAX_LINE_BYTES:
+                raise ValueError(f"Line exceeds {settings.IMPORT_MAX_LINE_BYTES} bytes")
+            line = bytes(buffer[:end])
+            del buffer[:end + 1]  # Cheap: bytearray drops a prefix without copying the rest
+            scanned = 0
+            yield line
+        scanned = len(buffer)
+        if scanned > settings.IMPORT_MAX_LINE_BYTES:
+            raise ValueError(f"Line exceeds {settings.IMPORT_MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _read_file(path: str, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    with open(path, "rb") as handle:
+        while True:
+            chunk = await asyncio.to_thread(handle.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def main(path: str, user_email: str, job_id: Optional[str], batch_size: Optional[int]):
+    user = await db.users.find_one({"email": user_email}, {"_id": 1})
+    if user is None:
+        raise SystemExit(f"❌ No user with email {user_email}")
+    importer = ProjectImporter(str(user["_id"]), job_id=job_id, batch_size=batch_size)
+    print(f"📥 Importing {path} as job {importer.job_id}")
+    job = await importer.run(iter_lines(_read_file(path)))
+    print(f"✅ Import {job['_id']} completed: {job['counts']}")
+    for error in job["errors"]:
+        print(f"⚠️ Line {error['line']}: {error['error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import projects and scenes from NDJSON")
+    parser.add_argument("path", help="NDJSON file (e.g. a project export)")
+    parser.add_argument("--user-email", required=True, help="Owner of the imported projects")
+    parser.add_argument("--job-id", help="Resume this job from its last checkpoint")
+    parser.add_argument("--batch-size", type=int, help=f"Documents per bulk write (default {settings.IMPORT_BATCH_SIZE})")
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.user_email, args.job_id, args.batch_size))
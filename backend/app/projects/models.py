@@ -13,10 +13,24 @@ class ProjectBase(BaseModel):
 class ProjectCreate(ProjectBase):
     pass
 
+class ProjectCharacter(BaseModel):
+    """A project character; its image lives in the media store (upload with POST /{id}/characters)"""
+    name: str
+    base_description: Optional[str] = None
+    voice_type: Optional[str] = None
+    voice_tone: Optional[str] = None
+    added_at: Optional[datetime] = None
+    image_id: Optional[str] = None
+    image_url: Optional[str] = None
+    thumbnail_urls: Dict[str, str] = Field(default_factory=dict)
+
+    class Config:
+        extra = "forbid"  # Inline image data (image_base64) is rejected
+
 class ProjectUpdate(BaseModel):
     project_name: Optional[str] = None
     settings: Optional[Dict[str, Any]] = None
-    characters: Optional[Dict[str, Any]] = None
+    characters: Optional[Dict[str, ProjectCharacter]] = None
 
 class Project(ProjectBase):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
@@ -28,6 +42,12 @@ class Project(ProjectBase):
     raw_script: Optional[str] = None
     script_broken: bool = False
     total_scenes: int = 0
+    active_generation: Optional[PyObjectId] = None
+    # Summary maintained on write (see ProjectListItem)
+    scenes_duration: float = 0  # Seconds, summed over the active scenes
+    last_model: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    token_usage: Dict[str, int] = Field(default_factory=dict)
 
     class Config:
         populate_by_name = True
@@ -39,7 +59,14 @@ class ProjectListItem(BaseModel):
     project_name: str
     project_type: str
     created_at: datetime
-    total_scenes: int
+    last_updated: Optional[datetime] = None
+    # Summary fields written together with the scenes, so the dashboard
+    # needs no per-project scene queries
+    total_scenes: int = 0
+    scenes_duration: float = 0
+    last_model: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    token_usage: Dict[str, int] = Field(default_factory=dict)
 
     class Config:
         populate_by_name = True
@@ -1,13 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status, File, Form, UploadFile
+from typing import List, Optional
 from app.database import db
 from app.projects.models import Project, ProjectCreate, ProjectUpdate, ProjectListItem
+from app.projects.summary import (
+    project_thumbnail, index_project, update_project_index, unindex_project, list_project_index, STORY_SOURCE
+)
 from app.users.models import User
 from app.auth.dependencies import get_current_user
 from bson import ObjectId
 from datetime import datetime
 from pydantic import BaseModel
 from app.services.script_breaker import script_breaker
+from app.services.usage import track_usage, usage_increments
+from app.prompts.store import prompt_store
+from app.scenes.generations import story_scene_versions, SceneSetConflict, SceneVersionNotFound
+from app.media.store import decode_base64_image
+from app.media.images import store_image, release_image, image_urls, InvalidImageError
+from app.config import settings
+from app.http_cache import ETAG_PROJECTION, project_etag, if_none_match, not_modified, set_etag, etag_headers
+from app.responses import FastJSONResponse, fill_defaults, model_projection
+from app.scenes.export import export_response
+from app.projects.importer import ProjectImporter, ImportJobError, iter_lines
+from app.idempotency import idempotent
+from app.admission import admission
+from app.rate_limit import enforce_rate_limit
+from app.lifecycle import task_registry
 
 router = APIRouter()
 
@@ -15,16 +32,45 @@ router = APIRouter()
 class ScriptBreakRequest(BaseModel):
     script: str
 
+# Projection for the project list: summary fields only, no characters/script
+LIST_PROJECTION = model_projection(ProjectListItem)
+
 
 @router.get("/", response_model=List[ProjectListItem])
 async def get_user_projects(current_user: User = Depends(get_current_user)):
     """Get all projects for the current user"""
     try:
         projects = await db.projects.find(
-            {"user_id": ObjectId(current_user.id)}
+            {"user_id": ObjectId(current_user.id)},
+            LIST_PROJECTION
         ).sort("created_at", -1).to_list(100)
         
-        return [ProjectListItem(**project) for project in projects]
+        # Projected to ProjectListItem's fields and defaults; no per-document validation
+        return FastJSONResponse(fill_defaults(projects, ProjectListItem))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch projects: {str(e)}"
+        )
+
+@router.get("/all")
+async def get_all_user_projects(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List storytelling and character projects together, most recently updated first
+
+    Paginated with an opaque cursor: pass `next_cursor` from the previous page.
+    """
+    try:
+        return FastJSONResponse(await list_project_index(str(current_user.id), limit, cursor))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -51,6 +97,7 @@ async def create_project(
         project_dict["script_broken"] = False
         
         result = await db.projects.insert_one(project_dict)
+        await index_project(STORY_SOURCE, project_dict)
         created_project = await db.projects.find_one({"_id": result.inserted_id})
         
         return Project(**created_project)
@@ -60,24 +107,77 @@ async def create_project(
             detail=f"Failed to create project: {str(e)}"
         )
 
+@router.post("/import")
+async def import_projects(
+    request: Request,
+    batch_size: Optional[int] = Query(None, ge=1, le=5000),
+    job_id: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Bulk import projects, characters and scenes from an NDJSON request body
+
+    The body is read as a stream and written in batches (see
+    app.projects.importer). If the upload is interrupted, send the same file
+    again with the returned job_id to resume from the last checkpoint.
+    """
+    importer = ProjectImporter(str(current_user.id), job_id=job_id, batch_size=batch_size)
+    try:
+        job = await importer.run(iter_lines(request.stream()))
+    except ImportJobError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{str(e)} (resume with job_id={importer.job_id})"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Import failed: {str(e)} (resume with job_id={importer.job_id})"
+        )
+    return FastJSONResponse({
+        "job_id": job["_id"],
+        "status": job["status"],
+        "counts": job["counts"],
+        "errors": job["errors"]
+    })
+
 @router.get("/{project_id}", response_model=Project)
 async def get_project(
     project_id: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user)
 ):
-    """Get a specific project by ID"""
+    """Get a specific project by ID (supports If-None-Match)"""
     try:
-        project = await db.projects.find_one({
-            "_id": ObjectId(project_id),
-            "user_id": ObjectId(current_user.id)
-        })
+        # Cheap projection first: unchanged projects are answered with 304
+        stamp = await db.projects.find_one(
+            {"_id": ObjectId(project_id), "user_id": ObjectId(current_user.id)},
+            ETAG_PROJECTION
+        )
         
-        if not project:
+        if not stamp:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
         
+        etag = project_etag(stamp, "project")
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        
+        project = await db.projects.find_one({"_id": stamp["_id"]})
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+        set_etag(response, project_etag(project, "project"))
         return Project(**project)
     except HTTPException:
         raise
@@ -87,6 +187,51 @@ async def get_project(
             detail=f"Failed to fetch project: {str(e)}"
         )
 
+def _rebind_character_images(project: dict, characters: dict) -> List[str]:
+    """
+    Check the images of replacement characters against the project's current ones
+
+    A character may only keep an image the project already references (new
+    images are uploaded with POST /{id}/characters, which takes the media
+    reference); its URLs are copied from the stored character.
+
+    Returns:
+        Image ids referenced fewer times than before, once per reference to release
+
+    Raises:
+        HTTPException 400: If a character references an image the project does not hold
+    """
+    current = {}
+    held = {}
+    for character in (project.get("characters") or {}).values():
+        if isinstance(character, dict) and character.get("image_id"):
+            current[character["image_id"]] = character
+            held[character["image_id"]] = held.get(character["image_id"], 0) + 1
+
+    kept = {}
+    for character in characters.values():
+        image_id = character.get("image_id")
+        if not image_id:
+            character.update({"image_id": None, "image_url": None, "thumbnail_urls": {}})
+            continue
+        kept[image_id] = kept.get(image_id, 0) + 1
+        if kept[image_id] > held.get(image_id, 0):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Image {image_id} is not an image of this project; upload it with POST /projects/{{id}}/characters"
+            )
+        stored = current[image_id]
+        character.update({
+            "image_url": stored.get("image_url"),
+            "thumbnail_urls": stored.get("thumbnail_urls") or {}
+        })
+
+    return [
+        image_id
+        for image_id, count in held.items()
+        for _ in range(count - kept.get(image_id, 0))
+    ]
+
 @router.put("/{project_id}", response_model=Project)
 async def update_project(
     project_id: str,
@@ -109,15 +254,31 @@ async def update_project(
         
         # Build update dict
         update_data = {k: v for k, v in project_update.model_dump(exclude_unset=True).items()}
+        released_images = []
+        if "characters" in update_data:
+            update_data["characters"] = update_data["characters"] or {}
+            released_images = _rebind_character_images(existing_project, update_data["characters"])
+            update_data["thumbnail_url"] = project_thumbnail(update_data["characters"])
         if update_data:
             update_data["last_updated"] = datetime.utcnow()
             
-            await db.projects.update_one(
-                {"_id": ObjectId(project_id)},
-                {"$set": update_data}
-            )
+            query = {"_id": ObjectId(project_id)}
+            if "characters" in update_data:
+                # Only replace the characters whose images were checked (and will be released)
+                query["characters"] = existing_project.get("characters")
+            result = await db.projects.update_one(query, {"$set": update_data})
+            if result.matched_count == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Project characters were modified concurrently, please retry"
+                )
+        
+        # Images of removed or replaced characters
+        for image_id in released_images:
+            await release_image(image_id)
         
         updated_project = await db.projects.find_one({"_id": ObjectId(project_id)})
+        await index_project(STORY_SOURCE, updated_project)
         return Project(**updated_project)
     except HTTPException:
         raise
@@ -146,11 +307,20 @@ async def delete_project(
                 detail="Project not found"
             )
         
-        # Delete all scenes for this project
-        await db.scenes.delete_many({"project_id": ObjectId(project_id)})
+        # Delete all scenes for this project, then the prompt blocks only they used
+        scene_query = {"project_id": ObjectId(project_id)}
+        prompt_blocks = await prompt_store.referenced_blocks("scenes", scene_query)
+        await db.scenes.delete_many(scene_query)
+        await prompt_store.release(prompt_blocks)
+        
+        # Release character images (shared images survive while referenced elsewhere)
+        for character in (project.get("characters") or {}).values():
+            if isinstance(character, dict) and character.get("image_id"):
+                await release_image(character["image_id"])
         
         # Delete the project
         await db.projects.delete_one({"_id": ObjectId(project_id)})
+        await unindex_project(STORY_SOURCE, project_id)
         
         return None
     except HTTPException:
@@ -165,6 +335,8 @@ async def delete_project(
 async def break_script(
     project_id: str,
     request: ScriptBreakRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -172,7 +344,28 @@ async def break_script(
     
     This endpoint uses LangChain with Gemini to intelligently break down
     a story script into optimal 8-second video scenes.
+    
+    Send an Idempotency-Key header to make retries safe: a retry gets the
+    first request's response instead of a second generation. Under load the
+    request may be rejected with 503 (or 429 per user) and a Retry-After header.
     """
+    async def generate():
+        # Charged only here: Idempotency-Key replays do not count against the limit
+        await enforce_rate_limit(http_request, current_user.id, "generation")
+        return await admission.run(
+            current_user.id, lambda: _break_script(project_id, request, background_tasks, current_user)
+        )
+
+    return await idempotent(
+        http_request, current_user.id, f"break_script:{project_id}", request.model_dump(), generate
+    )
+
+async def _break_script(
+    project_id: str,
+    request: ScriptBreakRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User
+):
     try:
         # Verify project exists and belongs to user
         project = await db.projects.find_one({
@@ -195,17 +388,15 @@ async def break_script(
         
         # Break script using AI
         try:
-            result = await script_breaker.break_script(request.script)
+            with track_usage() as usage:
+                result = await script_breaker.break_script(request.script)
         except Exception as ai_error:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"AI processing failed: {str(ai_error)}"
             )
         
-        # 1. Delete existing scenes for this project (clean slate)
-        await db.scenes.delete_many({"project_id": ObjectId(project_id)})
-
-        # 2. Prepare new scenes for batch insertion
+        # Prepare the new scene set
         new_scenes = []
         for scene_data in result["scenes"]:
             scene_doc = scene_data.copy()
@@ -220,39 +411,61 @@ async def break_script(
                 scene_doc["generated_prompt"] = scene_doc.pop("visual_description")
             
             new_scenes.append(scene_doc)
-            
-        if new_scenes:
-            await db.scenes.insert_many(new_scenes)
 
-        # Update project with script and scene count
+        # Keep the prompt text for the response; packing replaces it with block ids
+        prompts = [scene.get("generated_prompt") for scene in new_scenes]
+
+        # Write the new version (unchanged scenes are shared) and make it active;
+        # the dashboard summary and token spend change in the same update
         update_data = {
             "raw_script": request.script,
             "script_broken": True,
-            "total_scenes": result["total_scenes"],
             "last_updated": datetime.utcnow()
         }
+        summary = {
+            "total_scenes": len(new_scenes),
+            "scenes_duration": sum(scene.get("duration") or 0 for scene in new_scenes),
+            "last_model": usage["model"]
+        }
+        async def save():
+            version = await story_scene_versions.replace(
+                project, new_scenes, source="break_script",
+                prompt_field="generated_prompt", project_updates=update_data,
+                summary=summary, project_inc=usage_increments(usage)
+            )
+            await update_project_index(
+                STORY_SOURCE, project["_id"],
+                {**summary, "last_updated": update_data["last_updated"]},
+                inc=usage_increments(usage)
+            )
+            return version
+
+        # A shutdown never cuts the write short (see app.lifecycle)
+        try:
+            version = await task_registry.persist(save())
+        except SceneSetConflict as conflict:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(conflict)
+            )
+
+        # Versions beyond the retention limit are dropped after responding
+        background_tasks.add_task(story_scene_versions.collect, project["_id"], version["dropped"])
         
-        await db.projects.update_one(
-            {"_id": ObjectId(project_id)},
-            {"$set": update_data}
-        )
-        
-        # Fetch the created scenes to return them with IDs
-        created_scenes = await db.scenes.find(
-            {"project_id": ObjectId(project_id)}
-        ).sort("scene_number", 1).to_list(100)
+        # Every scene now has its _id, so the written documents are the response
+        for scene, prompt in zip(new_scenes, prompts):
+            scene["generated_prompt"] = prompt
+            for field in ("generated_prompt_blocks", "generations", "content_hash"):
+                scene.pop(field, None)
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "project_id": project_id,
-            "scenes": [
-                {**scene, "_id": str(scene["_id"]), "project_id": str(scene["project_id"]), "user_id": str(scene["user_id"])} 
-                for scene in created_scenes
-            ],
-            "total_scenes": result["total_scenes"],
+            "scenes": new_scenes,
+            "total_scenes": len(new_scenes),
             "story_summary": result.get("story_summary", ""),
-            "message": f"Successfully broke script into {result['total_scenes']} scenes and saved to database"
-        }
+            "message": f"Successfully broke script into {len(new_scenes)} scenes and saved to database"
+        })
         
     except HTTPException:
         raise
@@ -270,46 +483,101 @@ class CharacterRequest(BaseModel):
     voice_tone: str | None = None
     image_base64: str | None = None
 
+async def _save_project_character(
+    project_id: str,
+    current_user: User,
+    role: str,
+    char_data: dict,
+    image_data: Optional[bytes] = None,
+    image_content_type: str = "application/octet-stream"
+) -> str:
+    """
+    Store a character on the project, with its image in the media store
+    
+    Identical images are stored once across projects; the character keeps
+    the original's id and URL plus thumbnail URLs.
+    
+    Returns:
+        The normalized role key
+    """
+    # Verify project existence
+    project = await db.projects.find_one(
+        {"_id": ObjectId(project_id), "user_id": ObjectId(current_user.id)},
+        {"characters": 1}
+    )
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    # Normalize role key (e.g., "Supporting 1" -> "supporting_1")
+    role_key = role.lower().replace(" ", "_")
+    
+    # The image lives in the media store; the project only keeps references
+    char_data.update({"image_id": None, "image_url": None, "thumbnail_urls": {}})
+    if image_data:
+        try:
+            record = await store_image(
+                image_data,
+                content_type=image_content_type,
+                metadata={"project_id": project_id, "role": role_key}
+            )
+        except InvalidImageError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        char_data.update(image_urls(record))
+    
+    # Update project using MongoDB dot notation for nested objects; the
+    # dashboard thumbnail is kept in step in the same write
+    characters = {**(project.get("characters") or {}), role_key: char_data}
+    summary = {"thumbnail_url": project_thumbnail(characters), "last_updated": datetime.utcnow()}
+    await db.projects.update_one(
+        {"_id": ObjectId(project_id)},
+        {"$set": {f"characters.{role_key}": char_data, **summary}}
+    )
+    await update_project_index(STORY_SOURCE, project_id, summary)
+    
+    # Release the image of the character being replaced
+    previous_image = (project.get("characters", {}).get(role_key) or {}).get("image_id")
+    if previous_image:
+        await release_image(previous_image)
+    
+    return role_key
+
 @router.post("/{project_id}/characters")
 async def add_project_character(
     project_id: str,
     character: CharacterRequest,
     current_user: User = Depends(get_current_user)
 ):
-    """Add a new character to the project"""
+    """Add a new character to the project (image as base64, stored in the media store)"""
     try:
-        # Verify project existence
-        project = await db.projects.find_one({
-            "_id": ObjectId(project_id),
-            "user_id": ObjectId(current_user.id)
-        })
-        
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
-            
         # Create character object
         char_data = {
             "name": character.name,
             "base_description": character.description,
             "voice_type": character.voice_type,
             "voice_tone": character.voice_tone,
-            "image_base64": character.image_base64,
             "added_at": datetime.utcnow()
         }
         
-        # Normalize role key (e.g., "Supporting 1" -> "supporting_1")
-        role_key = character.role.lower().replace(" ", "_")
+        image_data = None
+        image_content_type = "application/octet-stream"
+        if character.image_base64:
+            try:
+                image_data, image_content_type = decode_base64_image(character.image_base64)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="image_base64 is not valid base64"
+                )
         
-        # Update project using MongoDB dot notation for nested objects
-        await db.projects.update_one(
-            {"_id": ObjectId(project_id)},
-            {"$set": {
-                f"characters.{role_key}": char_data,
-                "last_updated": datetime.utcnow()
-            }}
+        role_key = await _save_project_character(
+            project_id, current_user, character.role, char_data, image_data, image_content_type
         )
         
         return {
@@ -321,15 +589,61 @@ async def add_project_character(
             }
         }
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to add character: {str(e)}"
+        )
+
+@router.post("/{project_id}/characters/upload")
+async def upload_project_character(
+    project_id: str,
+    role: str = Form(...),
+    name: str = Form(...),
+    description: Optional[str] = Form(None),
+    voice_type: Optional[str] = Form(None),
+    voice_tone: Optional[str] = Form(None),
+    image: Optional[UploadFile] = File(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Add a new character to the project with its image as a multipart file"""
+    try:
+        char_data = {
+            "name": name,
+            "base_description": description,
+            "voice_type": voice_type,
+            "voice_tone": voice_tone,
+            "added_at": datetime.utcnow()
+        }
+        
+        image_data = None
+        if image is not None:
+            # Read at most one byte past the limit so oversized uploads are rejected without buffering them
+            image_data = await image.read(settings.IMAGE_MAX_BYTES + 1)
+            if len(image_data) > settings.IMAGE_MAX_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Image exceeds {settings.IMAGE_MAX_BYTES} bytes"
+                )
+        
+        role_key = await _save_project_character(
+            project_id, current_user, role, char_data, image_data,
+            image.content_type if image is not None and image.content_type else "application/octet-stream"
+        )
+        
         return {
-            "success": True, 
-            "message": f"Character '{character.name}' added as {character.role}",
+            "success": True,
+            "message": f"Character '{name}' added as {role}",
             "character": {
                 "role": role_key,
                 **char_data
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -339,32 +653,38 @@ async def add_project_character(
 @router.get("/{project_id}/scenes")
 async def get_project_scenes(
     project_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    """Get all scenes for a specific project"""
+    """Get all scenes for a specific project (supports If-None-Match)"""
     try:
-        # Verify project existence
-        project = await db.projects.find_one({
-            "_id": ObjectId(project_id),
-            "user_id": ObjectId(current_user.id)
-        })
+        # Verify project existence; the version fields are all the ETag needs
+        project = await db.projects.find_one(
+            {"_id": ObjectId(project_id), "user_id": ObjectId(current_user.id)},
+            ETAG_PROJECTION
+        )
         
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
+        
+        etag = project_etag(project, "scenes")
+        if if_none_match(request, etag):
+            return not_modified(etag)
             
         scenes = await db.scenes.find(
-            {"project_id": ObjectId(project_id)}
-        ).sort("scene_number", 1).to_list(1000)
+            story_scene_versions.active_filter(project),
+            {"generations": 0, "content_hash": 0}
+        ).sort("scene_number", 1).to_list(None)
+        await prompt_store.unpack(scenes, "generated_prompt")
         
-        # Convert ObjectId to str for response
-        return [
-            {**scene, "_id": str(scene["_id"]), "project_id": str(scene["project_id"]), "user_id": str(scene["user_id"])} 
-            for scene in scenes
-        ]
+        # Raw documents straight to JSON (ObjectIds/datetimes handled by the encoder)
+        return FastJSONResponse(scenes, headers=etag_headers(etag))
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -372,4 +692,104 @@ async def get_project_scenes(
         )
 
 
+@router.get("/{project_id}/export")
+async def export_project(
+    project_id: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|txt|zip)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download the project's scenes as NDJSON, a plain-text prompt sheet, or a
+    ZIP with prompts and character images (streamed, scene by scene)
+    """
+    project = await db.projects.find_one(
+        {"_id": ObjectId(project_id), "user_id": ObjectId(current_user.id)},
+        {"raw_script": 0, "scene_versions": 0}
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    return export_response(
+        story_scene_versions, project, "storytelling", export_format,
+        prompt_fields=["generated_prompt"],
+        header_fields=[
+            "project_name", "project_type", "settings", "characters",
+            "total_scenes", "scenes_duration", "created_at", "last_updated"
+        ]
+    )
 
+async def _get_owned_project(project_id: str, current_user: User) -> dict:
+    project = await db.projects.find_one({
+        "_id": ObjectId(project_id),
+        "user_id": ObjectId(current_user.id)
+    })
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    return project
+
+@router.get("/{project_id}/versions")
+async def get_scene_versions(
+    project_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """List the retained scene versions of a project, newest first"""
+    project = await _get_owned_project(project_id, current_user)
+    return {
+        "project_id": project_id,
+        "active_generation": str(project["active_generation"]) if project.get("active_generation") else None,
+        "versions": story_scene_versions.list_versions(project)
+    }
+
+@router.get("/{project_id}/versions/diff")
+async def diff_scene_versions(
+    project_id: str,
+    base: str,
+    target: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Compare two scene versions (added/removed/changed scene numbers)"""
+    project = await _get_owned_project(project_id, current_user)
+    try:
+        return await story_scene_versions.diff(project, base, target)
+    except SceneVersionNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+@router.post("/{project_id}/versions/{generation}/rollback")
+async def rollback_scene_version(
+    project_id: str,
+    generation: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Make a previous scene version active again (no AI call)"""
+    project = await _get_owned_project(project_id, current_user)
+    try:
+        entry = await story_scene_versions.rollback(project, generation)
+    except SceneVersionNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except SceneSetConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    await update_project_index(
+        STORY_SOURCE, project["_id"],
+        {**entry.get("summary", {}), "last_updated": datetime.utcnow()}
+    )
+    
+    return {
+        "success": True,
+        "project_id": project_id,
+        "active_generation": generation,
+        "total_scenes": entry["scene_count"]
+    }
@@ -0,0 +1,130 @@
+# app/projects/summary.py
+# Helpers for the project summary fields shown on the dashboard
+
+from datetime import datetime
+from typing import Optional
+
+from pymongo import UpdateOne
+
+from app.database import db
+
+
+def project_thumbnail(characters: dict) -> Optional[str]:
+    """Small image of the first character that has one"""
+    for character in characters.values():
+        if isinstance(character, dict) and character.get("image_url"):
+            return (character.get("thumbnail_urls") or {}).get("sm") or character["image_url"]
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Unified project index
+#
+# Storytelling projects (`projects`, ObjectId user ids) and character projects
+# (`character_projects`, string user ids) are mirrored into `project_index`
+# with string user ids and the dashboard summary fields, so one indexed,
+# sorted query lists both. Entries are keyed "<source>:<project id>" because
+# the two collections are independent id spaces.
+# ---------------------------------------------------------------------------
+
+STORY_SOURCE = "projects"
+CHARACTER_SOURCE = "character_projects"
+
+INDEX_FIELDS = (
+    "project_name", "project_type", "content_type", "created_at", "last_updated",
+    "total_scenes", "scenes_duration", "last_model", "thumbnail_url", "token_usage"
+)
+
+
+def _index_key(source: str, project_id) -> str:
+    return f"{source}:{project_id}"
+
+
+def index_fields(source: str, project: dict) -> dict:
+    """Index fields present on a project document"""
+    fields = {field: project[field] for field in INDEX_FIELDS if field in project}
+    if "user_id" in project:
+        fields["user_id"] = str(project["user_id"])
+    if not fields.get("last_updated") and project.get("created_at"):
+        fields["last_updated"] = project["created_at"]
+    if source == CHARACTER_SOURCE and not fields.get("project_type"):
+        fields["project_type"] = "character"
+    return fields
+
+
+async def update_project_index(source: str, project_id, fields: dict, inc: Optional[dict] = None, upsert: bool = False):
+    """
+    Mirror changed project fields into the index
+
+    Index writes are best effort: the index is derived data and
+    app.migrations.project_index rebuilds it.
+    """
+    update = {
+        "$set": fields,
+        "$setOnInsert": {"source": source, "project_id": str(project_id)}
+    }
+    if inc:
+        update["$inc"] = inc
+    try:
+        await db.project_index.update_one({"_id": _index_key(source, project_id)}, update, upsert=upsert)
+    except Exception as e:
+        print(f"⚠️ Project index update failed for {source}/{project_id}: {str(e)}")
+
+
+def index_upsert(source: str, project: dict) -> UpdateOne:
+    """Bulk-write operation mirroring a whole project document into the index"""
+    return UpdateOne(
+        {"_id": _index_key(source, project["_id"])},
+        {"$set": {**index_fields(source, project), "source": source, "project_id": str(project["_id"])}},
+        upsert=True
+    )
+
+
+async def index_project(source: str, project: dict):
+    """Mirror a whole project document into the index"""
+    await update_project_index(source, project["_id"], index_fields(source, project), upsert=True)
+
+
+async def unindex_project(source: str, project_id):
+    await db.project_index.delete_one({"_id": _index_key(source, project_id)})
+
+
+def _encode_cursor(entry: dict) -> str:
+    return f"{entry['last_updated'].isoformat()}|{entry['_id']}"
+
+
+def _decode_cursor(cursor: str) -> dict:
+    timestamp, key = cursor.split("|", 1)
+    last_updated = datetime.fromisoformat(timestamp)
+    return {"$or": [
+        {"last_updated": {"$lt": last_updated}},
+        {"last_updated": last_updated, "_id": {"$lt": key}}
+    ]}
+
+
+async def list_project_index(user_id: str, limit: int, cursor: Optional[str] = None) -> dict:
+    """
+    One page of a user's projects of every type, most recently updated first
+
+    Keyset pagination on (last_updated, _id), served by the
+    (user_id, last_updated, _id) index.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = {"user_id": str(user_id)}
+    if cursor:
+        query.update(_decode_cursor(cursor))
+
+    entries = await db.project_index.find(query).sort(
+        [("last_updated", -1), ("_id", -1)]
+    ).to_list(limit + 1)
+
+    next_cursor = _encode_cursor(entries[limit - 1]) if len(entries) > limit else None
+    projects = []
+    for entry in entries[:limit]:
+        entry.pop("user_id", None)
+        key = entry.pop("_id")
+        entry["_id"] = entry.pop("project_id", key.split(":", 1)[-1])
+        projects.append(entry)
+    return {"projects": projects, "next_cursor": next_cursor}
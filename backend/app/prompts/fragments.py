@@ -0,0 +1,99 @@
+# app/prompts/fragments.py
+# Per-project library of reusable prompt fragments
+#
+# Scene prompts repeat the same character look, style, voice anchor and audio
+# signature in every scene. These are stored once per project in
+# `prompt_fragments` and scenes keep a template with {{fragment:<id>}}
+# placeholders that is rendered back into the full Veo prompt on read.
+
+import hashlib
+import re
+from datetime import datetime
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+from app.database import db
+
+# Fragments shorter than this are left inline - not worth a reference
+MIN_FRAGMENT_LENGTH = 20
+
+_TOKEN_RE = re.compile(r"\{\{fragment:([0-9a-f]+)\}\}")
+
+
+def fragment_id(project_id: str, kind: str, text: str) -> str:
+    """Content-addressed id, so saving the same fragment twice is a no-op"""
+    return hashlib.sha1(f"{project_id}:{kind}:{text}".encode("utf-8")).hexdigest()[:20]
+
+
+async def save_fragments(project_id: str, fragments: Dict[str, str]) -> Dict[str, str]:
+    """
+    Store a project's fragments once
+
+    Args:
+        project_id: Owning project id
+        fragments: Mapping of kind (e.g. "character_look", "voice_anchor") to text
+
+    Returns:
+        Mapping of kind to fragment id for every fragment that was stored
+    """
+    ids = {}
+    operations = []
+    for kind, text in fragments.items():
+        if not text or len(text) < MIN_FRAGMENT_LENGTH:
+            continue
+        fid = fragment_id(project_id, kind, text)
+        ids[kind] = fid
+        operations.append(UpdateOne(
+            {"_id": fid},
+            {"$setOnInsert": {
+                "project_id": project_id,
+                "kind": kind,
+                "text": text,
+                "created_at": datetime.utcnow()
+            }},
+            upsert=True
+        ))
+
+    if operations:
+        await db.prompt_fragments.bulk_write(operations, ordered=False)
+    return ids
+
+
+def templatize(prompt: str, fragments: Dict[str, str], ids: Dict[str, str]) -> str:
+    """Replace every occurrence of a stored fragment's text with its placeholder"""
+    # Longest first so a fragment contained in another one does not split it
+    for kind in sorted(ids, key=lambda k: len(fragments[k]), reverse=True):
+        prompt = prompt.replace(fragments[kind], "{{fragment:%s}}" % ids[kind])
+    return prompt
+
+
+async def render_scenes(scenes: List[dict]) -> List[dict]:
+    """
+    Assemble generated_prompt for scenes stored as fragment templates
+
+    Fetches every referenced fragment in a single query. Scenes that still
+    carry a plain generated_prompt are returned unchanged.
+    """
+    templated = [scene for scene in scenes if scene.get("prompt_template")]
+    if not templated:
+        return scenes
+
+    ids = set()
+    for scene in templated:
+        ids.update(_TOKEN_RE.findall(scene["prompt_template"]))
+
+    texts = {}
+    if ids:
+        async for fragment in db.prompt_fragments.find({"_id": {"$in": list(ids)}}):
+            texts[fragment["_id"]] = fragment["text"]
+
+    for scene in templated:
+        template = scene.pop("prompt_template")
+        scene["generated_prompt"] = _TOKEN_RE.sub(lambda m: texts.get(m.group(1), ""), template)
+    return scenes
+
+
+async def delete_project_fragments(project_id: str):
+    """Remove a project's fragment library"""
+    await db.prompt_fragments.delete_many({"project_id": project_id})
@@ -0,0 +1,218 @@
+# app/prompts/store.py
+# Deduplicated, compressed storage for large prompt text fields
+#
+# Generated prompts are split into blocks at blank lines. Each block is stored
+# once in `prompt_blobs`, keyed by its SHA-256, and compressed when large, so
+# the METADATA / SPEAKER / AUDIO SETTINGS blocks repeated across scenes and
+# projects cost a single copy. Documents keep only the list of block ids in
+# `<field>_blocks`; pack()/unpack() convert transparently on write/read.
+#
+# Blocks are reclaimed by mark-and-sweep rather than reference counts (a count
+# drifts whenever a write between pack and insert fails): paths that delete
+# packed documents pass their block ids to release(), which deletes the ones
+# no document in PACKED_FIELDS still references. sweep() does the same for the
+# whole store, every PROMPT_BLOB_SWEEP_HOURS (run_sweeper()). Every pack stamps its blocks with `packed_at`, and blocks
+# stamped within PROMPT_BLOB_GRACE_SECONDS are never deleted, so a block
+# packed for a document that is not inserted yet survives.
+
+import asyncio
+import hashlib
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Set
+
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import db
+
+try:  # Optional: zstd compresses prompt text better and faster than zlib
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOCK_SEPARATOR = "\n\n"
+
+# (collection, field) pairs whose documents reference prompt blocks
+PACKED_FIELDS = [
+    ("scenes", "generated_prompt"),
+    ("character_scenes", "generated_prompt"),
+    ("character_scenes", "prompt_template"),
+]
+
+# Block ids per delete_many in sweep()
+_DELETE_BATCH = 1000
+
+
+def _block_id(block: str) -> str:
+    return hashlib.sha256(block.encode("utf-8")).hexdigest()[:32]
+
+
+def _encode(block: str) -> Dict:
+    raw = block.encode("utf-8")
+    if len(raw) < settings.PROMPT_COMPRESS_MIN_BYTES:
+        return {"codec": "raw", "text": block}
+    if zstandard is not None:
+        return {"codec": "zstd", "data": zstandard.ZstdCompressor(level=10).compress(raw)}
+    return {"codec": "zlib", "data": zlib.compress(raw, 9)}
+
+
+def _decode(blob: Dict) -> str:
+    codec = blob.get("codec", "raw")
+    if codec == "raw":
+        return blob["text"]
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Prompt blob is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob["data"]).decode("utf-8")
+    return zlib.decompress(blob["data"]).decode("utf-8")
+
+
+class PromptStore:
+    """Content-addressed block store for prompt text fields"""
+
+    async def pack(self, docs: List[dict], field: str) -> List[dict]:
+        """
+        Move docs[field] into the blob store (in place)
+
+        Writes every new block across all docs in one unordered bulk write,
+        then replaces the field with None and sets `<field>_blocks`.
+
+        Args:
+            docs: Documents about to be written
+            field: Text field to pack, e.g. "generated_prompt"
+
+        Returns:
+            The same documents
+        """
+        blocks = {}
+        for doc in docs:
+            text = doc.get(field)
+            if not isinstance(text, str):
+                continue
+            ids = []
+            for block in text.split(BLOCK_SEPARATOR):
+                block_id = _block_id(block)
+                blocks[block_id] = block
+                ids.append(block_id)
+            doc[field] = None
+            doc[f"{field}_blocks"] = ids
+
+        if blocks:
+            now = datetime.utcnow()
+            await db.prompt_blobs.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": block_id},
+                        {"$setOnInsert": _encode(block), "$set": {"packed_at": now}},
+                        upsert=True
+                    )
+                    for block_id, block in blocks.items()
+                ],
+                ordered=False
+            )
+        return docs
+
+    async def unpack(self, docs: List[dict], field: str) -> List[dict]:
+        """
+        Restore docs[field] from the blob store (in place)
+
+        All referenced blocks are fetched in a single query. Documents that
+        were never packed are left unchanged.
+        """
+        key = f"{field}_blocks"
+        packed = [doc for doc in docs if doc.get(key)]
+        if not packed:
+            return docs
+
+        ids = {block_id for doc in packed for block_id in doc[key]}
+        blocks = {}
+        async for blob in db.prompt_blobs.find({"_id": {"$in": list(ids)}}):
+            blocks[blob["_id"]] = _decode(blob)
+
+        for doc in packed:
+            doc[field] = BLOCK_SEPARATOR.join(blocks.get(block_id, "") for block_id in doc.pop(key))
+        return docs
+
+    async def referenced_blocks(self, collection: str, query: Dict) -> Set[str]:
+        """Block ids referenced by the documents of a collection matching query (read before deleting them)"""
+        fields = [f"{field}_blocks" for name, field in PACKED_FIELDS if name == collection]
+        block_ids = set()
+        if not fields:
+            return block_ids
+        async for doc in db[collection].find(query, {field: 1 for field in fields}):
+            for field in fields:
+                block_ids.update(doc.get(field) or [])
+        return block_ids
+
+    @staticmethod
+    def _reclaimable() -> Dict:
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.PROMPT_BLOB_GRACE_SECONDS)
+        # Blocks packed before packed_at was recorded count as old
+        return {"$or": [{"packed_at": {"$lt": cutoff}}, {"packed_at": {"$exists": False}}]}
+
+    async def release(self, block_ids: Iterable[str]) -> int:
+        """
+        Delete the given blocks unless a packed document still references them
+
+        Call after deleting the documents that referenced them. Only the
+        candidates are checked, through the `<field>_blocks` indexes.
+
+        Returns:
+            Number of blocks deleted
+        """
+        candidates = set(block_ids)
+        for collection, field in PACKED_FIELDS:
+            if not candidates:
+                return 0
+            key = f"{field}_blocks"
+            async for doc in db[collection].find({key: {"$in": list(candidates)}}, {key: 1}):
+                candidates.difference_update(doc[key])
+        if not candidates:
+            return 0
+        result = await db.prompt_blobs.delete_many({"_id": {"$in": list(candidates)}, **self._reclaimable()})
+        return result.deleted_count
+
+    async def sweep(self) -> int:
+        """
+        Delete every block no packed document references (full mark-and-sweep)
+
+        Catches blocks whose release() was missed (crash between the delete
+        and the release, or still within the grace period at the time).
+
+        Returns:
+            Number of blocks deleted
+        """
+        referenced = set()
+        for collection, field in PACKED_FIELDS:
+            key = f"{field}_blocks"
+            async for doc in db[collection].find({key: {"$type": "array"}}, {key: 1}):
+                referenced.update(doc[key])
+
+        deleted = 0
+        batch = []
+        async for blob in db.prompt_blobs.find(self._reclaimable(), {"_id": 1}):
+            if blob["_id"] not in referenced:
+                batch.append(blob["_id"])
+            if len(batch) >= _DELETE_BATCH:
+                deleted += (await db.prompt_blobs.delete_many({"_id": {"$in": batch}, **self._reclaimable()})).deleted_count
+                batch = []
+        if batch:
+            deleted += (await db.prompt_blobs.delete_many({"_id": {"$in": batch}, **self._reclaimable()})).deleted_count
+        return deleted
+
+
+# Singleton instance
+prompt_store = PromptStore()
+
+
+async def run_sweeper():
+    """Background loop: sweep unreferenced blocks every PROMPT_BLOB_SWEEP_HOURS"""
+    while True:
+        await asyncio.sleep(settings.PROMPT_BLOB_SWEEP_HOURS * 3600)
+        try:
+            deleted = await prompt_store.sweep()
+            if deleted:
+                print(f"🧹 Swept {deleted} unreferenced prompt blocks")
+        except Exception as e:
+            print(f"⚠️ Prompt block sweep failed: {str(e)}")
@@ -0,0 +1,205 @@
+# app/rate_limit.py
+# Per-user rate limiting with a sliding window
+#
+# Every authenticated API call counts against the user's "api" limit. LLM
+# generations also count against the much smaller "generation" limit, which
+# protects the shared Gemini quota from a single scripted client. That one is
+# charged only when a generation actually runs (see enforce_rate_limit()), not
+# for Idempotency-Key replays. Limits use
+# the sliding-window counter: the current fixed window's count plus the
+# previous window's count weighted by how much of it still overlaps the
+# sliding window. Two counters per user and class, no per-request log.
+#
+# Counters live in memory (single-process deployments) or in Mongo
+# (`rate_limits`, TTL-expired; shared by all workers), per RATE_LIMIT_BACKEND.
+# Another shared store can be plugged in by assigning `rate_limiter.backend`.
+# Responses carry RateLimit-Limit / -Remaining / -Reset / -Policy headers for
+# the tightest limit of the request (see rate_limit_headers()); 429 responses
+# add Retry-After.
+
+import math
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from pymongo import ReturnDocument
+
+from app.auth.dependencies import get_current_user
+from app.config import settings
+from app.database import db
+
+
+class RateLimitBackend:
+    """Counter store: per key, one counter per fixed window"""
+
+    async def hit(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        """
+        Count one request in the window
+
+        Returns:
+            (current window count including this request, previous window count)
+        """
+        raise NotImplementedError
+
+    async def undo(self, key: str, window_index: int, window: int):
+        """Take back a hit that was rejected (rejected requests do not count)"""
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """Counters in this process (one worker only)"""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[int, int]] = {}
+
+    async def hit(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        windows = self._counters.setdefault(key, {})
+        for index in [index for index in windows if index < window_index - 1]:
+            del windows[index]
+        windows[window_index] = windows.get(window_index, 0) + 1
+        return windows[window_index], windows.get(window_index - 1, 0)
+
+    async def undo(self, key: str, window_index: int, window: int):
+        windows = self._counters.get(key, {})
+        if windows.get(window_index):
+            windows[window_index] -= 1
+
+
+class MongoBackend(RateLimitBackend):
+    """Counters in the rate_limits collection, shared by every worker"""
+
+    async def hit(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        current = await db.rate_limits.find_one_and_update(
+            {"_id": f"{key}:{window_index}"},
+            {
+                "$inc": {"count": 1},
+                # Kept until the window can no longer overlap a sliding window
+                "$setOnInsert": {"expires_at": datetime.utcfromtimestamp((window_index + 2) * window)}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        previous = await db.rate_limits.find_one({"_id": f"{key}:{window_index - 1}"}, {"count": 1})
+        return current["count"], (previous or {}).get("count", 0)
+
+    async def undo(self, key: str, window_index: int, window: int):
+        await db.rate_limits.update_one({"_id": f"{key}:{window_index}"}, {"$inc": {"count": -1}})
+
+
+def _backend(name: str) -> RateLimitBackend:
+    if name == "mongo":
+        return MongoBackend()
+    return MemoryBackend()
+
+
+class RateLimiter:
+    """Sliding-window limits per user and route class"""
+
+    def __init__(self, backend: RateLimitBackend, limits: Dict[str, Tuple[int, int]]):
+        self.backend = backend
+        self.limits = limits  # route class -> (requests, window seconds)
+
+    async def check(self, user_id: str, route_class: str, now: Optional[float] = None) -> Dict:
+        """
+        Count a request and decide whether it is allowed
+
+        Returns:
+            {"allowed", "limit", "remaining", "reset", "window"}; reset is
+            the number of seconds until a request is allowed again (rejections)
+            or until the current window ends
+        """
+        limit, window = self.limits[route_class]
+        now = time.time() if now is None else now
+        window_index = int(now // window)
+        key = f"{route_class}:{user_id}"
+
+        current, previous = await self.backend.hit(key, window_index, window)
+        elapsed = now - window_index * window
+        overlap = 1 - elapsed / window
+        estimate = current + previous * overlap
+
+        window_end = (window_index + 1) * window - now
+        if estimate <= limit:
+            return {
+                "allowed": True,
+                "limit": limit,
+                "remaining": max(0, math.floor(limit - estimate)),
+                "reset": math.ceil(window_end),
+                "window": window
+            }
+
+        await self.backend.undo(key, window_index, window)
+        # Room frees up as the previous window slides out; otherwise at the next window
+        current -= 1
+        if previous and current < limit:
+            wait = (current + previous * overlap - limit + 1) / previous * window
+            retry_after = min(window_end, max(1.0, wait))
+        else:
+            retry_after = window_end
+        return {
+            "allowed": False,
+            "limit": limit,
+            "remaining": 0,
+            "reset": max(1, math.ceil(retry_after)),
+            "window": window
+        }
+
+
+async def enforce_rate_limit(request: Request, user_id: str, route_class: str):
+    """
+    Count a request against the route class limit of the user
+
+    Generation routes call this inside their idempotent() handler, so an
+    Idempotency-Key replay (or a warm-cache hit) is not charged.
+
+    Raises:
+        HTTPException 429: If the limit is exceeded (with Retry-After)
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    result = await rate_limiter.check(str(user_id), route_class)
+
+    # Headers describe the tightest limit this request is subject to
+    tightest = getattr(request.state, "rate_limit", None)
+    if tightest is None or result["remaining"] / result["limit"] <= tightest["remaining"] / tightest["limit"]:
+        request.state.rate_limit = result
+
+    if not result["allowed"]:
+        print(f"🚫 Rate limit ({route_class}) exceeded by user {user_id}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Rate limit exceeded: {result['limit']} {route_class} requests per {result['window']}s",
+            headers={"Retry-After": str(result["reset"]), **rate_limit_headers(result)}
+        )
+
+
+def rate_limit(route_class: str):
+    """
+    Dependency enforcing the route class limit for the current user
+
+    Raises:
+        HTTPException 429: If the limit is exceeded (with Retry-After)
+    """
+    async def dependency(request: Request, current_user=Depends(get_current_user)):
+        await enforce_rate_limit(request, current_user.id, route_class)
+    return dependency
+
+
+def rate_limit_headers(result: Dict) -> Dict[str, str]:
+    return {
+        "RateLimit-Limit": str(result["limit"]),
+        "RateLimit-Remaining": str(result["remaining"]),
+        "RateLimit-Reset": str(result["reset"]),
+        "RateLimit-Policy": f"{result['limit']};w={result['window']}"
+    }
+
+
+# Create singleton instance
+rate_limiter = RateLimiter(
+    backend=_backend(settings.RATE_LIMIT_BACKEND),
+    limits={
+        "api": (settings.RATE_LIMIT_API, settings.RATE_LIMIT_API_WINDOW_SECONDS),
+        "generation": (settings.RATE_LIMIT_GENERATION, settings.RATE_LIMIT_GENERATION_WINDOW_SECONDS)
+    }
+)
@@ -0,0 +1,78 @@
+# app/responses.py
+# Fast JSON responses for trusted database reads
+#
+# Large scene lists were built document by document through Pydantic models
+# (or ObjectId-to-str loops) and then run through FastAPI's generic encoder.
+# FastJSONResponse serializes raw Mongo documents directly: ObjectId and
+# datetime are handled by the encoder, and no per-document validation runs.
+# Only use it for documents read from our own collections.
+#
+# Routes declaring a response_model read with model_projection (the model's
+# keys) and fill_defaults (the model's defaults for keys older documents lack),
+# so the raw body has the shape the model documents.
+
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, List, Type
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:  # Optional: orjson is several times faster than the stdlib encoder
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize raw documents (ObjectId -> str, datetime -> ISO 8601)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse for raw Mongo documents, skipping model validation"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_projection(model: Type[BaseModel], extra: Iterable[str] = ()) -> dict:
+    """
+    Mongo projection limited to a model's fields (by alias)
+
+    Lets a raw read return the same keys the response model would,
+    without constructing the model.
+    """
+    fields = [field.alias or name for name, field in model.model_fields.items()]
+    return {field: 1 for field in [*fields, *extra]}
+
+
+def fill_defaults(documents: List[dict], model: Type[BaseModel]) -> List[dict]:
+    """
+    Set the model's defaults for fields missing from raw documents (in place)
+
+    Documents written before a field existed then serialize as the model
+    would have returned them. Only missing keys are touched; values are not
+    validated.
+    """
+    optional = [(field.alias or name, field) for name, field in model.model_fields.items() if not field.is_required()]
+    for document in documents:
+        for key, field in optional:
+            if key not in document:
+                document[key] = field.get_default(call_default_factory=True)
+    return documents
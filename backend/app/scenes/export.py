@@ -0,0 +1,229 @@
+# app/scenes/export.py
+# Streaming export of a project's active scenes
+#
+# Scenes are read from a cursor in small batches (prompts unpacked and
+# rendered per batch) and encoded as they arrive, so exporting a project never
+# holds all of its scenes - or its images - in memory at once.
+#
+# Formats:
+#   ndjson - one JSON object per line: a "project" header, then one "scene" per line
+#   txt    - plain prompt sheet, one block per scene
+#   zip    - project.json, scenes.ndjson, prompts/scene_NNN.txt and character images
+
+import io
+import mimetypes
+import re
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List
+
+from fastapi.responses import StreamingResponse
+
+from app.media.store import media_store
+from app.prompts.fragments import render_scenes
+from app.prompts.store import prompt_store
+from app.responses import dumps
+from app.scenes.generations import SceneVersions
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "txt": "text/plain; charset=utf-8",
+    "zip": "application/zip",
+}
+
+BATCH_SIZE = 50
+
+# Fields internal to storage that are not part of an exported scene
+_INTERNAL_FIELDS = {"generations": 0, "content_hash": 0}
+
+
+async def iter_scenes(versions: SceneVersions, project: Dict, prompt_fields: List[str]) -> AsyncIterator[Dict]:
+    """Yield the project's active scenes in order, with prompts assembled"""
+    cursor = versions.scenes.find(
+        versions.active_filter(project), _INTERNAL_FIELDS
+    ).sort("scene_number", 1).batch_size(BATCH_SIZE)
+
+    batch = []
+
+    async def flush():
+        for field in prompt_fields:
+            await prompt_store.unpack(batch, field)
+        return await render_scenes(batch)
+
+    async for scene in cursor:
+        batch.append(scene)
+        if len(batch) >= BATCH_SIZE:
+            for rendered in await flush():
+                yield rendered
+            batch = []
+    if batch:
+        for rendered in await flush():
+            yield rendered
+
+
+def export_filename(project: Dict, export_format: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", project.get("project_name") or "project").strip("_") or "project"
+    return f"{name}.{export_format}"
+
+
+def _project_header(project: Dict, kind: str, fields: List[str]) -> Dict:
+    header = {field: project.get(field) for field in fields if field in project}
+    header["_id"] = project["_id"]
+    header["kind"] = kind
+    header["exported_at"] = datetime.utcnow()
+    return header
+
+
+def _prompt_sheet_entry(scene: Dict) -> str:
+    language = f" ({scene['language']})" if scene.get("language") else ""
+    return (
+        f"=== Scene {scene.get('scene_number')}{language} ===\n"
+        f"{(scene.get('generated_prompt') or '').strip()}\n\n"
+    )
+
+
+async def stream_ndjson(scenes: AsyncIterator[Dict], header: Dict) -> AsyncIterator[bytes]:
+    yield dumps({"type": "project", **header}) + b"\n"
+    async for scene in scenes:
+        yield dumps({"type": "scene", **scene}) + b"\n"
+
+
+async def stream_txt(scenes: AsyncIterator[Dict], header: Dict) -> AsyncIterator[bytes]:
+    yield f"{header.get('project_name') or 'Project'}\n\n".encode("utf-8")
+    async for scene in scenes:
+        yield _prompt_sheet_entry(scene).encode("utf-8")
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, non-seekable sink: ZipFile writes into it, the stream drains it"""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_zip(
+    open_scenes: Callable[[], AsyncIterator[Dict]],
+    header: Dict,
+    images: Dict[str, str]
+) -> AsyncIterator[bytes]:
+    """
+    ZIP bundle written entry by entry
+
+    ZipFile falls back to data descriptors on a non-seekable sink, so every
+    entry can be sent as soon as it is written. Only one entry can be open at
+    a time, so the scenes are read twice (manifest, then prompt files) rather
+    than buffered.
+
+    Args:
+        open_scenes: Returns a fresh scene iterator (see iter_scenes())
+        header: Project header (project.json)
+        images: {archive name without extension: media file id} of images to include
+    """
+    async for chunk in _skip_empty(_write_zip(open_scenes, header, images)):
+        yield chunk
+
+
+async def _skip_empty(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        if chunk:
+            yield chunk
+
+
+async def _write_zip(open_scenes, header: Dict, images: Dict[str, str]) -> AsyncIterator[bytes]:
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    archive.writestr("project.json", dumps(header))
+    yield sink.drain()
+
+    with archive.open("scenes.ndjson", mode="w") as handle:
+        async for scene in open_scenes():
+            handle.write(dumps(scene) + b"\n")
+            yield sink.drain()
+    yield sink.drain()
+
+    async for scene in open_scenes():
+        language = f"_{scene['language']}" if scene.get("language") else ""
+        archive.writestr(f"prompts/scene_{scene.get('scene_number') or 0:03d}{language}.txt", _prompt_sheet_entry(scene))
+        yield sink.drain()
+
+    # Images are already compressed: store them, streaming chunk by chunk
+    for name, file_id in images.items():
+        info = await media_store.get_info(file_id)
+        if info is None or info["length"] == 0:
+            continue
+        extension = mimetypes.guess_extension(info["content_type"]) or ""
+        entry = zipfile.ZipInfo(f"{name}{extension}", date_time=datetime.utcnow().timetuple()[:6])
+        entry.compress_type = zipfile.ZIP_STORED
+        with archive.open(entry, mode="w", force_zip64=info["length"] > 2 ** 31) as handle:
+            async for chunk in media_store.open_range(file_id, 0, info["length"] - 1):
+                handle.write(chunk)
+                yield sink.drain()
+        yield sink.drain()
+
+    archive.close()
+    yield sink.drain()
+
+
+def character_images(project: Dict) -> Dict[str, str]:
+    """Original images of a project's characters, as images/<role>"""
+    return {
+        f"images/{role}": character["image_id"]
+        for role, character in (project.get("characters") or {}).items()
+        if isinstance(character, dict) and character.get("image_id")
+    }
+
+
+def export_response(
+    versions: SceneVersions,
+    project: Dict,
+    kind: str,
+    export_format: str,
+    prompt_fields: List[str],
+    header_fields: List[str]
+) -> StreamingResponse:
+    """
+    Streaming download of a project's active scenes
+
+    Args:
+        versions: Scene versioning of the project's collections
+        project: Project document (must include header_fields and characters, if any)
+        kind: "storytelling" or "character"; lets app.projects.importer read the export back
+        export_format: One of EXPORT_FORMATS
+        prompt_fields: Packed prompt fields to restore on each scene
+        header_fields: Project fields to include in the export header
+    """
+    header = _project_header(project, kind, header_fields)
+
+    def open_scenes():
+        return iter_scenes(versions, project, prompt_fields)
+
+    if export_format == "zip":
+        body = stream_zip(open_scenes, header, character_images(project))
+    elif export_format == "txt":
+        body = stream_txt(open_scenes(), header)
+    else:
+        body = stream_ndjson(open_scenes(), header)
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(project, export_format)}"'}
+    )
@@ -0,0 +1,341 @@
+# app/scenes/generations.py
+# Versioned scene sets with structural sharing
+#
+# A project's scenes are grouped into generations (versions). Each scene
+# document lists every generation it belongs to in `generations`, and the
+# project records its `active_generation` plus a bounded `scene_versions`
+# history. Writing a new version inserts only scenes whose content changed;
+# unchanged scenes (same content_hash) are shared by adding the new generation
+# to them. The project pointer is flipped in a single update, so readers see
+# either the old set or the new one - never an empty or half-written project.
+# Rollback is just another pointer flip.
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+
+from app.config import settings
+from app.database import db
+from app.prompts.store import prompt_store
+
+# Bookkeeping fields that do not count as scene content
+_NON_CONTENT_FIELDS = {"_id", "project_id", "user_id", "created_at", "updated_at", "generations", "content_hash"}
+
+
+class SceneSetConflict(Exception):
+    """Raised when the project's scenes were replaced concurrently"""
+
+
+class SceneVersionNotFound(Exception):
+    """Raised when a generation is not in the project's retained history"""
+
+
+def content_hash(scene: Dict) -> str:
+    """Stable hash of a scene's content (bookkeeping fields excluded)"""
+    content = {k: v for k, v in scene.items() if k not in _NON_CONTENT_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+
+
+class SceneVersions:
+    """
+    Scene versioning for one (projects, scenes) collection pair
+
+    Args:
+        projects: Project collection holding active_generation / scene_versions
+        scenes: Scene collection
+        scene_project_key: Maps a project _id to the project_id value stored on scenes
+    """
+
+    def __init__(self, projects, scenes, scene_project_key: Callable[[ObjectId], Any]):
+        self.projects = projects
+        self.scenes = scenes
+        self.scene_project_key = scene_project_key
+
+    def active_filter(self, project: Dict) -> Dict:
+        """
+        Query for the scenes currently visible on a project
+
+        Projects written before versioning have no active_generation;
+        {"generations": None} then matches their scenes (no generations field).
+        """
+        return {
+            "project_id": self.scene_project_key(project["_id"]),
+            "generations": project.get("active_generation")
+        }
+
+    def summary_filter(self, project: Dict, generation: Optional[ObjectId]) -> Dict:
+        """
+        Query for the scenes a version's summary describes
+
+        For multilingual character projects that is the primary language
+        variant (scenes saved before variants have no language).
+        """
+        query = {"project_id": self.scene_project_key(project["_id"]), "generations": generation}
+        if project.get("language"):
+            query["language"] = {"$in": [project["language"], None]}
+        return query
+
+    def list_versions(self, project: Dict) -> List[Dict]:
+        """Retained versions, newest first"""
+        active = project.get("active_generation")
+        return [
+            {
+                **entry,
+                "generation": str(entry["generation"]),
+                "active": entry["generation"] == active
+            }
+            for entry in reversed(project.get("scene_versions") or [])
+        ]
+
+    def _find_version(self, project: Dict, generation: str) -> Dict:
+        for entry in project.get("scene_versions") or []:
+            if str(entry["generation"]) == generation:
+                return entry
+        raise SceneVersionNotFound(f"Version {generation} not found")
+
+    async def replace(
+        self,
+        project: Dict,
+        scene_docs: List[Dict],
+        source: str,
+        prompt_field: Optional[str] = None,
+        project_updates: Optional[Dict[str, Any]] = None,
+        summary: Optional[Dict[str, Any]] = None,
+        project_inc: Optional[Dict[str, Any]] = None
+    ) -> Dict:
+        """
+        Write scene_docs as a new version and make it active
+
+        Three round trips: look up reusable scenes, one bulk write (inserts for
+        new scenes, $addToSet for shared ones), then the pointer flip. The flip
+        is a compare-and-set on the generation read with `project`, so a
+        concurrent replacement is detected instead of interleaved.
+
+        Args:
+            project: Project document as read by the caller
+            scene_docs: New scenes; `_id`, `generations` and `content_hash` are set in place
+            source: What produced the version (e.g. "break_script"), kept in the history
+            prompt_field: Large text field to move to the prompt store (new scenes only)
+            project_updates: Extra fields $set on the project in the same update
+            summary: Project summary fields describing this version (e.g. total_scenes);
+                $set now and restored by rollback()
+            project_inc: Counters $inc'ed on the project in the same update
+
+        Returns:
+            The history entry of the new version; its "dropped" key lists
+            generations that fell out of retention (pass to collect())
+
+        Raises:
+            SceneSetConflict: If another replacement won the race (our version is discarded)
+        """
+        project_key = self.scene_project_key(project["_id"])
+        history = project.get("scene_versions") or []
+        generation = ObjectId()
+
+        for doc in scene_docs:
+            doc["content_hash"] = content_hash(doc)
+
+        # Unchanged scenes of any retained version are shared, not copied
+        reusable = {}
+        if history:
+            cursor = self.scenes.find(
+                {
+                    "project_id": project_key,
+                    "generations": {"$in": [entry["generation"] for entry in history]},
+                    "content_hash": {"$in": [doc["content_hash"] for doc in scene_docs]}
+                },
+                {"content_hash": 1}
+            )
+            async for existing in cursor:
+                reusable[existing["content_hash"]] = existing["_id"]
+
+        new_docs = []
+        operations = []
+        for doc in scene_docs:
+            doc["generations"] = [generation]
+            existing_id = reusable.get(doc["content_hash"])
+            if existing_id is not None:
+                doc["_id"] = existing_id
+                operations.append(UpdateOne({"_id": existing_id}, {"$addToSet": {"generations": generation}}))
+            else:
+                doc["_id"] = ObjectId()
+                new_docs.append(doc)
+
+        if prompt_field and new_docs:
+            await prompt_store.pack(new_docs, prompt_field)
+        operations.extend(InsertOne(doc) for doc in new_docs)
+        if operations:
+            await self.scenes.bulk_write(operations, ordered=False)
+
+        entry = {
+            "generation": generation,
+            "created_at": datetime.utcnow(),
+            "source": source,
+            "scene_count": len(scene_docs),
+            "reused_scenes": len(scene_docs) - len(new_docs),
+            "summary": summary or {}
+        }
+        retention = max(1, settings.SCENE_VERSION_RETENTION)
+        update = {
+            "$set": {**(project_updates or {}), **(summary or {}), "active_generation": generation},
+            "$push": {"scene_versions": {"$each": [entry], "$slice": -retention}}
+        }
+        if project_inc:
+            update["$inc"] = project_inc
+        result = await self.projects.update_one(
+            {"_id": project["_id"], "active_generation": project.get("active_generation")},
+            update
+        )
+        if result.matched_count == 0:
+            await self.collect(project["_id"], [generation])
+            raise SceneSetConflict("Project scenes were modified concurrently")
+
+        kept = history[-(retention - 1):] if retention > 1 else []
+        dropped = [old["generation"] for old in history if old not in kept]
+        if project.get("active_generation") is None:
+            dropped.append(None)  # Scenes saved before versioning are not kept in history
+        return {**entry, "dropped": dropped}
+
+    async def rollback(self, project: Dict, generation: str) -> Dict:
+        """
+        Make a retained version active again (a single metadata update)
+
+        The version's summary fields are restored in the same update
+        (recomputed from its scenes for versions that did not record them).
+
+        Args:
+            project: Project document as read by the caller
+            generation: Generation id from list_versions()
+
+        Returns:
+            The history entry, with the restored "summary"
+
+        Raises:
+            SceneVersionNotFound: If the generation is not in the retained history
+            SceneSetConflict: If the project changed since it was read
+        """
+        entry = self._find_version(project, generation)
+        summary = entry.get("summary") or await self.summarize(project, entry)
+        updates = {
+            **summary,
+            "active_generation": entry["generation"],
+            "last_updated": datetime.utcnow()
+        }
+        result = await self.projects.update_one(
+            {"_id": project["_id"], "active_generation": project.get("active_generation")},
+            {"$set": updates}
+        )
+        if result.matched_count == 0:
+            raise SceneSetConflict("Project scenes were modified concurrently")
+        return {**entry, "summary": summary}
+
+    async def summarize(self, project: Dict, entry: Dict) -> Dict:
+        """
+        Summary fields of a version, computed from its scenes
+
+        Used for versions written before versions recorded one (migrated
+        histories and early generations only stored scene_count).
+        """
+        totals = await self.scenes.aggregate([
+            {"$match": self.summary_filter(project, entry["generation"])},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "duration": {"$sum": {"$ifNull": ["$duration", 0]}}}}
+        ]).to_list(1)
+        return {
+            "total_scenes": totals[0]["count"] if totals else entry["scene_count"],
+            "scenes_duration": totals[0]["duration"] if totals else 0
+        }
+
+    async def diff(self, project: Dict, base: str, target: str) -> Dict:
+        """
+        Compare two retained versions scene by scene (keyed by scene_number,
+        or "<language>:<scene_number>" for dialogue variants)
+
+        Shared scenes are unchanged by construction; for the rest the differing
+        fields are listed. Packed prompts compare by block ids, so no prompt
+        text is loaded.
+        """
+        base_gen = self._find_version(project, base)["generation"]
+        target_gen = self._find_version(project, target)["generation"]
+
+        base_scenes, target_scenes = {}, {}
+        cursor = self.scenes.find({
+            "project_id": self.scene_project_key(project["_id"]),
+            "generations": {"$in": [base_gen, target_gen]}
+        })
+        async for scene in cursor:
+            key = (scene.get("language") or "", scene["scene_number"])
+            if base_gen in scene["generations"]:
+                base_scenes[key] = scene
+            if target_gen in scene["generations"]:
+                target_scenes[key] = scene
+
+        def label(key):
+            language, number = key
+            return f"{language}:{number}" if language else number
+
+        changed = []
+        unchanged = 0
+        for key in sorted(set(base_scenes) & set(target_scenes)):
+            old, new = base_scenes[key], target_scenes[key]
+            if old["_id"] == new["_id"]:
+                unchanged += 1
+                continue
+            fields = sorted({
+                key[:-len("_blocks")] if key.endswith("_blocks") else key
+                for key in (set(old) | set(new)) - _NON_CONTENT_FIELDS
+                if old.get(key) != new.get(key)
+            })
+            changed.append({"scene_number": label(key), "fields": fields})
+
+        return {
+            "base": base,
+            "target": target,
+            "added": [label(key) for key in sorted(set(target_scenes) - set(base_scenes))],
+            "removed": [label(key) for key in sorted(set(base_scenes) - set(target_scenes))],
+            "changed": changed,
+            "unchanged": unchanged
+        }
+
+    async def collect(self, project_id: ObjectId, generations: List[Optional[ObjectId]]):
+        """
+        Detach dropped generations and delete scenes no version references
+
+        Safe to run as a background task: scenes shared with a retained
+        version keep their other generations and survive.
+        """
+        if not generations:
+            return
+        project_key = self.scene_project_key(project_id)
+        try:
+            removed = 0
+            prompt_blocks = set()
+            if None in generations:
+                legacy_query = {"project_id": project_key, "generations": None}
+                prompt_blocks |= await prompt_store.referenced_blocks(self.scenes.name, legacy_query)
+                legacy = await self.scenes.delete_many(legacy_query)
+                removed += legacy.deleted_count
+            versioned = [g for g in generations if g is not None]
+            if versioned:
+                await self.scenes.update_many(
+                    {"project_id": project_key, "generations": {"$in": versioned}},
+                    {"$pull": {"generations": {"$in": versioned}}}
+                )
+                orphan_query = {"project_id": project_key, "generations": {"$size": 0}}
+                prompt_blocks |= await prompt_store.referenced_blocks(self.scenes.name, orphan_query)
+                orphans = await self.scenes.delete_many(orphan_query)
+                removed += orphans.deleted_count
+            if removed:
+                released = await prompt_store.release(prompt_blocks)
+                print(f"🧹 Removed {removed} superseded scenes ({released} prompt blocks) from project {project_id}")
+        except Exception as e:
+            print(f"⚠️ Scene cleanup failed for project {project_id}: {str(e)}")
+
+
+# Storytelling scenes reference their project by ObjectId, character scenes by string
+story_scene_versions = SceneVersions(db.projects, db.scenes, scene_project_key=lambda project_id: project_id)
+character_scene_versions = SceneVersions(db.character_projects, db.character_scenes, scene_project_key=str)
@@ -2,17 +2,25 @@ from fastapi import APIRouter
 from typing import List
 from app.database import db
 from app.scenes.models import Scene, SceneCreate
+from app.prompts.store import prompt_store
+from app.responses import FastJSONResponse, fill_defaults, model_projection
 
 router = APIRouter()
 
+# Scene fields as exposed by the Scene model, plus packed prompt block ids
+SCENE_PROJECTION = model_projection(Scene, extra=["generated_prompt_blocks"])
+
 @router.post("/", response_model=Scene)
 async def create_scene(scene: SceneCreate):
     scene_dict = scene.dict()
+    await prompt_store.pack([scene_dict], "generated_prompt")
     new_scene = await db.scenes.insert_one(scene_dict)
     created_scene = await db.scenes.find_one({"_id": new_scene.inserted_id})
+    await prompt_store.unpack([created_scene], "generated_prompt")
     return Scene(**created_scene)
 
 @router.get("/", response_model=List[Scene])
 async def read_scenes():
-    scenes = await db.scenes.find().to_list(1000)
-    return [Scene(**scene) for scene in scenes]
+    scenes = await db.scenes.find({}, SCENE_PROJECTION).to_list(1000)
+    await prompt_store.unpack(scenes, "generated_prompt")
+    return FastJSONResponse(fill_defaults(scenes, Scene))
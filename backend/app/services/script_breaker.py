@@ -2,9 +2,17 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from app.config import settings
+from app.services.usage import record_usage
+import asyncio
 import json
+import re
+
+# Output budget per scene: ~8 seconds of narration is ~120 script characters,
+# and a scene's JSON (description, visuals, actions) is up to ~200 tokens
+_CHARS_PER_SCENE = 120
+_OUTPUT_TOKENS_PER_SCENE = 200
 
 
 class SceneBreakdown(BaseModel):
@@ -22,6 +30,11 @@ class StoryScenes(BaseModel):
     total_scenes: int = Field(description="Total number of scenes")
     story_summary: str = Field(description="Brief summary of the overall story")
 
+class StoryOutline(BaseModel):
+    """Model for the shared context used when breaking a long script window by window"""
+    story_summary: str = Field(description="Brief summary of the overall story")
+    characters: List[str] = Field(description="Roles/names of the characters appearing in the story")
+
 class ScriptBreaker:
     """Service class for breaking scripts into scenes using LangChain and Gemini"""
     
@@ -38,6 +51,13 @@ class ScriptBreaker:
             temperature=0.7,
             max_output_tokens=4096
         )
+        # Window calls return many more scenes than a short script
+        self.window_llm = ChatGoogleGenerativeAI(
+            model="gemini-2.5-flash",
+            google_api_key=self.api_key,
+            temperature=0.7,
+            max_output_tokens=settings.SCRIPT_WINDOW_MAX_OUTPUT_TOKENS
+        )
         
         # Setup output parser
         self.parser = PydanticOutputParser(pydantic_object=StoryScenes)
@@ -72,6 +92,49 @@ Remember to create scenes that are:
 - Visually distinct and clear
 - Include character involvement
 - Have detailed visual descriptions for AI generation
+""")
+        ])
+        
+        # Map-reduce mode: one outline call for continuity, then one call per window
+        self.outline_parser = PydanticOutputParser(pydantic_object=StoryOutline)
+        self.outline_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert video production assistant.
+Read the script excerpts (the opening, then samples from every part of the story, then
+the ending) and produce a short story summary and the roster of characters
+(use consistent role names, e.g. "protagonist", "mother", "villain").
+
+{format_instructions}
+"""),
+            ("user", """SCRIPT EXCERPTS:
+{script}
+""")
+        ])
+        self.window_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert video production assistant specializing in breaking down stories into optimal video scenes.
+            
+You are breaking a LONG script one part at a time. This is part {window_number} of {window_count}.
+
+STORY SUMMARY (for continuity):
+{story_summary}
+
+CHARACTER ROSTER (use exactly these role names):
+{character_roster}
+
+Your task is to break ONLY the given part into scenes, where each scene:
+- Should be approximately 8 seconds long when read aloud
+- Contains a clear visual moment or action
+- Has a specific setting and characters
+- Can be effectively visualized in a single AI-generated video clip
+
+Number scenes starting from 1 within this part; they are renumbered after merging.
+
+{format_instructions}
+"""),
+            ("user", """PREVIOUS CONTEXT (already covered by earlier scenes - do NOT create scenes for it):
+{previous_context}
+
+SCRIPT PART TO BREAK DOWN:
+{script}
 """)
         ])
     
@@ -85,6 +148,9 @@ Remember to create scenes that are:
         Returns:
             Dictionary containing scenes and metadata
         """
+        if len(script) > settings.SCRIPT_WINDOW_CHARS:
+            return await self._break_script_windowed(script)
+        
         try:
             # Format the prompt with script and parser instructions
             formatted_prompt = self.prompt.format_messages(
@@ -94,6 +160,7 @@ Remember to create scenes that are:
             
             # Get response from Gemini
             response = await self.llm.ainvoke(formatted_prompt)
+            record_usage(response, self.llm.model)
             
             # Parse the response
             parsed_result = self.parser.parse(response.content)
@@ -112,21 +179,180 @@ Remember to create scenes that are:
             # Fallback to simple sentence-based breaking
             return self._fallback_script_breaking(script)
     
-    def _fallback_script_breaking(self, script: str) -> dict:
+    async def _break_script_windowed(self, script: str) -> dict:
+        """
+        Map-reduce breaking for long scripts
+        
+        Splits the script into overlapping windows, breaks every window
+        concurrently against a shared summary/character roster, then merges
+        the scenes in order and renumbers them.
+        
+        Args:
+            script: The full story script to break down
+            
+        Returns:
+            Dictionary containing scenes and metadata
+        """
+        # A window's scenes must fit in one response
+        budget_chars = settings.SCRIPT_WINDOW_MAX_OUTPUT_TOKENS // _OUTPUT_TOKENS_PER_SCENE * _CHARS_PER_SCENE
+        windows = self._split_into_windows(
+            script,
+            min(settings.SCRIPT_WINDOW_CHARS, budget_chars),
+            settings.SCRIPT_WINDOW_OVERLAP_CHARS
+        )
+        print(f"📚 Long script ({len(script)} chars) → {len(windows)} windows")
+        
+        outline = await self._outline_script(self._digest(windows, settings.SCRIPT_OUTLINE_DIGEST_CHARS))
+        semaphore = asyncio.Semaphore(max(1, settings.SCRIPT_MAX_CONCURRENT_WINDOWS))
+        
+        async def run_window(index: int, window: dict) -> List[dict]:
+            async with semaphore:
+                return await self._break_window(window, index, len(windows), outline)
+        
+        window_scenes = await asyncio.gather(
+            *(run_window(i, window) for i, window in enumerate(windows, 1))
+        )
+        
+        # Merge in script order and renumber
+        scenes = []
+        for part in window_scenes:
+            for scene in part:
+                scene["scene_number"] = len(scenes) + 1
+                scenes.append(scene)
+        
+        return {
+            "scenes": scenes,
+            "total_scenes": len(scenes),
+            "story_summary": outline.story_summary
+        }
+    
+    @staticmethod
+    def _digest(windows: List[dict], max_chars: int) -> str:
+        """
+        Bounded excerpt of the whole script for the outline call
+        
+        Takes an equal share of max_chars from the start of every window, so
+        the outline sees every part of the story while its cost stays fixed
+        however long the script is. The last window also contributes its end.
+        """
+        share = max(1, max_chars // (len(windows) + 1))
+        parts = [window["text"][:share] for window in windows]
+        ending = windows[-1]["text"][share:][-share:]
+        if ending:
+            parts.append(ending)
+        return "\n[...]\n".join(parts)
+    
+    async def _outline_script(self, script: str) -> StoryOutline:
+        """Build the shared story summary and character roster for all windows"""
+        try:
+            formatted_prompt = self.outline_prompt.format_messages(
+                script=script,
+                format_instructions=self.outline_parser.get_format_instructions()
+            )
+            response = await self.llm.ainvoke(formatted_prompt)
+            record_usage(response, self.llm.model)
+            return self.outline_parser.parse(response.content)
+        except Exception as e:
+            print(f"Error outlining script: {str(e)}")
+            return StoryOutline(story_summary=script[:200], characters=["protagonist"])
+    
+    async def _break_window(self, window: dict, index: int, count: int, outline: StoryOutline) -> List[dict]:
+        """Break a single window into scenes, falling back to sentence splitting on failure"""
+        try:
+            formatted_prompt = self.window_prompt.format_messages(
+                window_number=index,
+                window_count=count,
+                story_summary=outline.story_summary,
+                character_roster=", ".join(outline.characters) or "protagonist",
+                previous_context=window["context"] or "(start of the script)",
+                script=window["text"],
+                format_instructions=self.parser.get_format_instructions()
+            )
+            response = await self.window_llm.ainvoke(formatted_prompt)
+            record_usage(response, self.window_llm.model)
+            parsed_result = self.parser.parse(response.content)
+            return [scene.dict() for scene in parsed_result.scenes]
+        except Exception as e:
+            print(f"Error breaking window {index}/{count}: {str(e)}")
+            # Every sentence of the window is kept: dropping any would lose story text
+            return self._fallback_script_breaking(window["text"], max_scenes=None)["scenes"]
+    
+    @staticmethod
+    def _split_into_windows(script: str, window_chars: int, overlap_chars: int) -> List[dict]:
+        """
+        Split a script into windows on paragraph/sentence boundaries
+        
+        Args:
+            script: The script to split
+            window_chars: Maximum characters per window
+            overlap_chars: Maximum characters of trailing text carried over
+                as read-only context for the next window
+            
+        Returns:
+            List of {"text": str, "context": str} dictionaries in script order
+        """
+        # Paragraphs first; oversized paragraphs are split into sentences
+        units = []
+        for paragraph in re.split(r'\n\s*\n', script):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if len(paragraph) <= window_chars:
+                units.append(paragraph)
+                continue
+            for sentence in re.split(r'(?<=[.!?।])\s+', paragraph):
+                # A single sentence longer than a window is hard-cut
+                while len(sentence) > window_chars:
+                    units.append(sentence[:window_chars])
+                    sentence = sentence[window_chars:]
+                if sentence.strip():
+                    units.append(sentence.strip())
+        
+        windows = []
+        current = []
+        current_len = 0
+        for unit in units:
+            if current and current_len + len(unit) > window_chars:
+                windows.append(current)
+                current, current_len = [], 0
+            current.append(unit)
+            current_len += len(unit) + 2
+        if current:
+            windows.append(current)
+        
+        result = []
+        for i, window in enumerate(windows):
+            context = []
+            if i > 0:
+                # Walk back over the previous window's units until the overlap budget is spent
+                budget = overlap_chars
+                for unit in reversed(windows[i - 1]):
+                    if len(unit) > budget:
+                        break
+                    context.insert(0, unit)
+                    budget -= len(unit)
+                if not context and overlap_chars > 0:
+                    context = [windows[i - 1][-1][-overlap_chars:]]
+            result.append({"text": "\n\n".join(window), "context": "\n\n".join(context)})
+        
+        return result
+    
+    def _fallback_script_breaking(self, script: str, max_scenes: Optional[int] = 10) -> dict:
         """
         Fallback method if AI fails - simple sentence-based breaking
         
         Args:
             script: The script to break down
+            max_scenes: Keep only this many scenes (None keeps every sentence)
             
         Returns:
             Dictionary with basic scene breakdown
         """
         # Split by sentences and group them
-        sentences = [s.strip() for s in script.split('.') if s.strip()]
+        sentences = [s.strip() for s in re.split(r'(?<=[.!?।])\s+', script) if s.strip()]
         
         scenes = []
-        for i, sentence in enumerate(sentences[:10], 1):  # Limit to 10 scenes
+        for i, sentence in enumerate(sentences[:max_scenes], 1):
             scenes.append({
                 "scene_number": i,
                 "description": sentence,
@@ -0,0 +1,45 @@
+# app/services/usage.py
+# Per-request accounting of LLM calls (model and token spend)
+#
+# Routes wrap a generation in `with track_usage() as usage:`; services call
+# record_usage() after every LLM response. The accumulator lives in a context
+# variable, so calls made from concurrent tasks (asyncio.gather) are counted
+# without passing it through every function.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+_current_usage: ContextVar[Optional[Dict]] = ContextVar("llm_usage", default=None)
+
+
+def empty_usage() -> Dict:
+    return {"model": None, "calls": 0, "input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+
+@contextmanager
+def track_usage() -> Iterator[Dict]:
+    """Collect usage of every LLM call made inside the block"""
+    usage = empty_usage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_usage(response, model: str):
+    """Add one LLM response (LangChain AIMessage) to the active tracker, if any"""
+    usage = _current_usage.get()
+    if usage is None:
+        return
+    metadata = getattr(response, "usage_metadata", None) or {}
+    usage["model"] = model.removeprefix("models/")
+    usage["calls"] += 1
+    for key in ("input_tokens", "output_tokens", "total_tokens"):
+        usage[key] += int(metadata.get(key) or 0)
+
+
+def usage_increments(usage: Dict) -> Dict:
+    """$inc document adding a request's token spend to a project's running totals"""
+    return {f"token_usage.{key}": usage[key] for key in ("input_tokens", "output_tokens", "total_tokens")}
@@ -18,7 +18,7 @@ async def create_user(user: UserCreate):
         )
 
     user_dict = user.model_dump()
-    user_dict["hashed_password"] = get_password_hash(user_dict.pop("password"))
+    user_dict["hashed_password"] = await get_password_hash(user_dict.pop("password"))
     
     new_user = await db.users.insert_one(user_dict)
     created_user = await db.users.find_one({"_id": new_user.inserted_id})